@@ -0,0 +1,90 @@
+"""JSON encoding straight from Arrow tables, for endpoints that return large tabular results.
+
+``arrow_json_response`` renders a response body without building per-row Python dicts or
+running Pydantic validation: each column is turned into JSON literals with Arrow compute kernels
+and the rows are joined in C++. Endpoints opt in by returning it instead of their response model;
+the body has the same shape the model would have produced.
+"""
+
+import json
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+# JSON needs \uXXXX escapes for these; columns containing any fall back to json.dumps per value.
+_CONTROL_CHARS = r"[\x00-\x1f]"
+_FLOAT_DECIMALS = 10
+
+
+def _dumps(value: Any) -> str:
+    # Same options as starlette's JSONResponse.
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _quoted(text: pa.Array) -> pa.Array:
+    if pc.any(pc.match_substring_regex(text, _CONTROL_CHARS)).as_py():
+        return pa.array([None if value is None else _dumps(value) for value in text.to_pylist()], pa.string())
+    escaped = pc.replace_substring(pc.replace_substring(text, "\\", "\\\\"), '"', '\\"')
+    return pc.binary_join_element_wise('"', escaped, '"', "")
+
+
+def _json_literals(column: pa.Array) -> pa.Array:
+    """Return every value of *column* as a JSON literal; nulls (and NaN/inf) become ``null``."""
+    if pa.types.is_dictionary(column.type):
+        column = column.dictionary_decode()
+    column_type = column.type
+    if pa.types.is_null(column_type):
+        return pa.array(["null"] * len(column), pa.string())
+    if pa.types.is_floating(column_type):
+        finite = pc.if_else(pc.is_finite(column), column, pa.scalar(None, column_type))
+        # 10 decimals, as pandas' to_json() emits on the model path.
+        literals = pc.cast(pc.round(finite, _FLOAT_DECIMALS), pa.string())
+    elif pa.types.is_integer(column_type) or pa.types.is_boolean(column_type) or pa.types.is_decimal(column_type):
+        literals = pc.cast(column, pa.string())
+    elif pa.types.is_timestamp(column_type):
+        # Millisecond precision, like pandas' to_json(date_format="iso") used by the model path.
+        millis = pc.cast(column, pa.timestamp("ms", column_type.tz), safe=False)
+        literals = _quoted(pc.strftime(millis, "%Y-%m-%dT%H:%M:%S"))
+    elif pa.types.is_date(column_type) or pa.types.is_string(column_type) or pa.types.is_large_string(column_type):
+        literals = _quoted(pc.cast(column, pa.string()))
+    else:
+        literals = pa.array([None if value is None else _dumps(value) for value in column.to_pylist()], pa.string())
+    return pc.fill_null(literals, "null")
+
+
+def arrow_rows_json(table: pa.Table) -> str:
+    """Encode *table* as a JSON array of row objects (``orient="records"``)."""
+    if table.num_rows == 0 or table.num_columns == 0:
+        return "[]"
+    table = table.combine_chunks()
+    parts: list = []
+    for index, name in enumerate(table.column_names):
+        parts.append(("{" if index == 0 else ",") + _dumps(name) + ":")
+        parts.append(_json_literals(table.column(index).chunk(0)))
+    parts.append("}")
+    rows = pc.binary_join_element_wise(*parts, "")
+    offsets = pa.array([0, len(rows)], pa.int32())
+    return "[" + pc.binary_join(pa.ListArray.from_arrays(offsets, rows), ",")[0].as_py() + "]"
+
+
+def _encode(value: Any) -> str:
+    if isinstance(value, pa.Table):
+        return arrow_rows_json(value)
+    if isinstance(value, pd.DataFrame):
+        return arrow_rows_json(pa.Table.from_pandas(value, preserve_index=False))
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{_dumps(str(key))}:{_encode(item)}" for key, item in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_encode(item) for item in value) + "]"
+    if isinstance(value, BaseModel):
+        return _dumps(value.model_dump(mode="json"))
+    return _dumps(value)
+
+
+def arrow_json_response(content: Any) -> Response:
+    """Render *content* (dicts/lists of Arrow tables, DataFrames, models and plain values) as JSON."""
+    return Response(content=_encode(content).encode("utf-8"), media_type="application/json")
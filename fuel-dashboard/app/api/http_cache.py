@@ -0,0 +1,62 @@
+"""HTTP validators for responses derived from the in-memory snapshots.
+
+Routes opt in with ``dependencies=[Depends(snapshot_conditional_get)]``, or with
+``trend_conditional_get`` for trends, which have a raw-history fallback. The dependency runs
+before the handler: a request whose ``If-None-Match`` carries the current snapshot ETag is
+answered with 304 straight away, without touching DuckDB. Otherwise the ETag is stashed on
+``request.state`` and ``add_snapshot_cache_headers`` (called from the response middleware in
+``main.py``) puts it on the 200 together with ``Cache-Control``.
+"""
+
+from config import settings
+from fastapi import HTTPException
+from fastapi import Request
+from fastapi.responses import Response
+
+from data.cache import get_snapshot_version
+from data.duckdb_engine import is_zip_code_trend_ready
+
+
+def _snapshot_etag() -> str | None:
+    version = get_snapshot_version()
+    return f'"{version}"' if version else None
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of *etag* against an ``If-None-Match`` header (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def _cache_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={settings.api_cache_max_age_seconds}"}
+
+
+def snapshot_conditional_get(request: Request) -> None:
+    if settings.ui_test_mode:
+        return
+    etag = _snapshot_etag()
+    if etag is None:
+        return
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=_cache_headers(etag))
+    request.state.snapshot_etag = etag
+
+
+def trend_conditional_get(request: Request) -> None:
+    """``snapshot_conditional_get`` once zip-code trends are served from the trend snapshot.
+
+    Before that they are aggregated from the raw daily files, which the snapshot version does not
+    track, so those responses carry no validators.
+    """
+    if is_zip_code_trend_ready():
+        snapshot_conditional_get(request)
+
+
+def add_snapshot_cache_headers(request: Request, response: Response) -> None:
+    etag = getattr(request.state, "snapshot_etag", None)
+    if etag is not None and response.status_code == 200:
+        response.headers.update(_cache_headers(etag))
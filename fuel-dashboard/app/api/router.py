@@ -3,8 +3,12 @@ from datetime import date
 from typing import Any
 
 import ui_test_support as ui_test
+from api.arrow_json import arrow_json_response
+from api.http_cache import snapshot_conditional_get
+from api.http_cache import trend_conditional_get
 from api.schemas import AddressSuggestion
 from api.schemas import AddressSuggestionsResponse
+from api.schemas import BarrioMapResponse
 from api.schemas import BrandCoverageRow
 from api.schemas import BrandHistoricalResponse
 from api.schemas import BrandPriceComparisonRow
@@ -21,6 +25,7 @@ from api.schemas import FuelCatalogResponse
 from api.schemas import FuelGroup
 from api.schemas import FuelType
 from api.schemas import GeocodeResponse
+from api.schemas import GeometryDetail
 from api.schemas import GeoJSONResponse
 from api.schemas import GroupTrendResponse
 from api.schemas import HISTORICAL_PERIOD_DAYS
@@ -45,6 +50,7 @@ from api.schemas import ZoneListResponse
 from config import settings
 from fastapi import APIRouter
 from fastapi import Body
+from fastapi import Depends
 from fastapi import HTTPException
 from fastapi import Query
 from fastapi import Request
@@ -53,9 +59,12 @@ from services.data_quality_service import get_ingestion_stats
 from services.data_quality_service import get_latest_day_stats
 from services.data_quality_service import get_missing_days
 from services.forecast_service import get_historical_forecast
+from services.geo_utils import detail_for_zoom
 from services.geocoding import geocode_address
 from services.geocoding import get_address_suggestions
 from services.routing import get_full_route
+from services.station_service import get_barrio_price_geojson
+from services.station_service import get_barrio_price_map
 from services.station_service import get_best_by_address
 from services.station_service import get_brand_coverage_report
 from services.station_service import get_brand_price_comparison_report
@@ -80,6 +89,7 @@ from services.station_service import get_provinces
 from services.station_service import get_station_labels
 from services.station_service import get_zip_code_price_map_by_municipality
 from services.station_service import get_zip_code_price_map_for_zips
+from services.station_service import get_zip_codes_for_barrio
 from services.station_service import get_zip_codes_for_district
 from services.station_service import get_zone_volatility_ranking
 from services.trip_planner import plan_trip
@@ -101,6 +111,13 @@ def get_real_client_ip(request: Request) -> str:
 limiter = Limiter(key_func=get_real_client_ip)
 router = APIRouter()
 
+# Routes whose response only depends on the query string and the stations/trend snapshots (or static
+# assets): they get an ETag and answer If-None-Match with 304. Routes that geocode, call OSRM or read
+# aggregates loaded on demand are left out. Trend routes are only validated while the zip-code trend
+# snapshot is loaded, not while they fall back to the raw daily files.
+_SNAPSHOT_VALIDATED = [Depends(snapshot_conditional_get)]
+_TREND_VALIDATED = [Depends(trend_conditional_get)]
+
 
 def _rows(df) -> list[dict[str, Any]]:
     if df is None or df.empty:
@@ -108,7 +125,7 @@ def _rows(df) -> list[dict[str, Any]]:
     return json.loads(df.to_json(orient="records", date_format="iso"))
 
 
-@router.get("/stations/cheapest-by-zip", response_model=StationListResponse)
+@router.get("/stations/cheapest-by-zip", response_model=StationListResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def cheapest_by_zip(
     request: Request,
@@ -209,7 +226,7 @@ def best_by_address(
     )
 
 
-@router.get("/zones/cheapest", response_model=ZoneListResponse)
+@router.get("/zones/cheapest", response_model=ZoneListResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def cheapest_zones(
     request: Request,
@@ -220,7 +237,7 @@ def cheapest_zones(
     return ZoneListResponse(zones=zones, province=province, fuel_type=fuel_type.value)
 
 
-@router.get("/trends/price", response_model=TrendResponse)
+@router.get("/trends/price", response_model=TrendResponse, dependencies=_TREND_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def price_trends(
     request: Request,
@@ -235,7 +252,7 @@ def price_trends(
     return TrendResponse(trend=trend, zip_code=zip_code, fuel_type=fuel_type.value, period=period.value)
 
 
-@router.get("/trends/group", response_model=GroupTrendResponse)
+@router.get("/trends/group", response_model=GroupTrendResponse, dependencies=_TREND_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def group_price_trends(
     request: Request,
@@ -246,8 +263,10 @@ def group_price_trends(
 ):
     if settings.ui_test_mode:
         return ui_test.group_trend_response(zip_code, fuel_group, period)
-    series = get_group_price_trends(zip_code, fuel_group, period, province=province)
-    return GroupTrendResponse(series=series, zip_code=zip_code, fuel_group=fuel_group.value, period=period.value)
+    series = get_group_price_trends(zip_code, fuel_group, period, province=province, as_arrow=True)
+    return arrow_json_response(
+        {"series": series, "zip_code": zip_code, "fuel_group": fuel_group.value, "period": period.value}
+    )
 
 
 @router.post("/trip/plan", response_model=TripPlanResponse)
@@ -314,7 +333,7 @@ def route(
     return RouteResponse(coordinates=result["coordinates"])
 
 
-@router.get("/provinces", response_model=ProvincesResponse)
+@router.get("/provinces", response_model=ProvincesResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def provinces(request: Request):
     if settings.ui_test_mode:
@@ -322,7 +341,7 @@ def provinces(request: Request):
     return ProvincesResponse(provinces=get_provinces())
 
 
-@router.get("/labels", response_model=LabelsResponse)
+@router.get("/labels", response_model=LabelsResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def labels(request: Request, top_n: int = Query(25, ge=0, le=200)):
     if settings.ui_test_mode:
@@ -330,14 +349,14 @@ def labels(request: Request, top_n: int = Query(25, ge=0, le=200)):
     return LabelsResponse(labels=get_station_labels(top_n=top_n))
 
 
-@router.get("/stats/national-avg", response_model=NationalAvgResponse)
+@router.get("/stats/national-avg", response_model=NationalAvgResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def national_avg(request: Request, fuel_type: FuelType = Query(...)):
     avg, count = get_national_avg_stats(fuel_type.value)
     return NationalAvgResponse(fuel_type=fuel_type.value, avg_price=avg, station_count=count)
 
 
-@router.get("/fuel/catalog", response_model=FuelCatalogResponse)
+@router.get("/fuel/catalog", response_model=FuelCatalogResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def fuel_catalog(request: Request):
     groups = {g.value: [f.value for f in members] for g, members in FUEL_GROUP_MEMBERS.items()}
@@ -350,6 +369,15 @@ def _period_days(period: HistoricalPeriod) -> int:
     return HISTORICAL_PERIOD_DAYS[period]
 
 
+def _geometry_detail(detail: GeometryDetail | None, zoom: int | None) -> GeometryDetail:
+    """An explicit ``detail`` wins; otherwise the level for the map ``zoom``; otherwise full resolution."""
+    if detail is not None:
+        return detail
+    if zoom is not None:
+        return GeometryDetail(detail_for_zoom(zoom))
+    return GeometryDetail.full
+
+
 @router.get("/zones/provinces", response_model=DataFrameResponse)
 @limiter.limit(settings.rate_limit)
 def zones_provinces(
@@ -359,11 +387,11 @@ def zones_provinces(
 ):
     if settings.ui_test_mode:
         return ui_test.zones_provinces_response()
-    df = get_province_ranking(fuel_type, _period_days(period))
-    return DataFrameResponse(rows=_rows(df))
+    table = get_province_ranking(fuel_type, _period_days(period), as_arrow=True)
+    return arrow_json_response({"rows": table})
 
 
-@router.get("/zones/districts", response_model=DistrictMapResponse)
+@router.get("/zones/districts", response_model=DistrictMapResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def zones_districts(
     request: Request,
@@ -376,7 +404,7 @@ def zones_districts(
     return DistrictMapResponse(items=items, province=province, fuel_type=fuel_type.value)
 
 
-@router.get("/zones/province-map", response_model=ProvinceMapResponse)
+@router.get("/zones/province-map", response_model=ProvinceMapResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def zones_province_map(
     request: Request,
@@ -389,33 +417,67 @@ def zones_province_map(
     return ProvinceMapResponse(items=items, fuel_type=fuel_type.value)
 
 
-@router.get("/zones/province-geojson", response_model=GeoJSONResponse)
+@router.get("/zones/province-geojson", response_model=GeoJSONResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def zones_province_geojson(
     request: Request,
     fuel_type: FuelType = Query(...),
     mainland_only: bool = Query(False),
+    detail: GeometryDetail | None = Query(None),
+    zoom: int | None = Query(None, ge=0, le=22),
 ):
     if settings.ui_test_mode:
         return ui_test.zones_province_geojson_response()
-    geojson = get_province_price_geojson(fuel_type, mainland_only)
+    geojson = get_province_price_geojson(fuel_type, mainland_only, _geometry_detail(detail, zoom))
     return GeoJSONResponse(geojson=geojson)
 
 
-@router.get("/zones/district-geojson", response_model=GeoJSONResponse)
+@router.get("/zones/district-geojson", response_model=GeoJSONResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def zones_district_geojson(
     request: Request,
     province: str = Query(..., min_length=1),
     fuel_type: FuelType = Query(...),
+    detail: GeometryDetail | None = Query(None),
+    zoom: int | None = Query(None, ge=0, le=22),
 ):
     if settings.ui_test_mode:
         return ui_test.zones_district_geojson_response()
-    geojson = get_district_price_geojson(province, fuel_type)
+    geojson = get_district_price_geojson(province, fuel_type, _geometry_detail(detail, zoom))
     return GeoJSONResponse(geojson=geojson)
 
 
-@router.get("/zones/municipalities", response_model=MunicipalitiesResponse)
+@router.get("/zones/barrios", response_model=BarrioMapResponse, dependencies=_SNAPSHOT_VALIDATED)
+@limiter.limit(settings.rate_limit)
+def zones_barrios(
+    request: Request,
+    province: str = Query(..., min_length=1),
+    fuel_type: FuelType = Query(...),
+    district: str | None = Query(None, min_length=1),
+):
+    if settings.ui_test_mode:
+        return ui_test.zones_barrios_response(province, fuel_type, district)
+    items = get_barrio_price_map(province, fuel_type, district)
+    return BarrioMapResponse(items=items, province=province, fuel_type=fuel_type.value, district=district)
+
+
+@router.get("/zones/barrio-geojson", response_model=GeoJSONResponse, dependencies=_SNAPSHOT_VALIDATED)
+@limiter.limit(settings.rate_limit)
+def zones_barrio_geojson(
+    request: Request,
+    province: str = Query(..., min_length=1),
+    fuel_type: FuelType = Query(...),
+    district: str | None = Query(None, min_length=1),
+    detail: GeometryDetail | None = Query(None),
+    zoom: int | None = Query(None, ge=0, le=22),
+):
+    if settings.ui_test_mode:
+        return ui_test.zones_barrio_geojson_response()
+    geojson = get_barrio_price_geojson(province, fuel_type, district, _geometry_detail(detail, zoom))
+    return GeoJSONResponse(geojson=geojson)
+
+
+@router.get("/zones/municipalities", response_model=MunicipalitiesResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def zones_municipalities(
     request: Request,
@@ -427,7 +489,7 @@ def zones_municipalities(
     return MunicipalitiesResponse(province=province, municipalities=municipalities)
 
 
-@router.get("/zones/municipality-zips", response_model=ZoneListResponse)
+@router.get("/zones/municipality-zips", response_model=ZoneListResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def zones_municipality_zips(
     request: Request,
@@ -441,7 +503,7 @@ def zones_municipality_zips(
     return ZoneListResponse(zones=zones, province=province, fuel_type=fuel_type.value)
 
 
-@router.get("/zones/district-zips", response_model=ZoneListResponse)
+@router.get("/zones/district-zips", response_model=ZoneListResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def zones_district_zips(
     request: Request,
@@ -456,16 +518,36 @@ def zones_district_zips(
     return ZoneListResponse(zones=zones, province=province, fuel_type=fuel_type.value)
 
 
-@router.get("/zones/postal-geojson", response_model=GeoJSONResponse)
+@router.get("/zones/barrio-zips", response_model=ZoneListResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
-def zones_postal_geojson(request: Request, zip_codes: list[str] = Query(...)):
+def zones_barrio_zips(
+    request: Request,
+    province: str = Query(..., min_length=1),
+    barrio: str = Query(..., min_length=1),
+    fuel_type: FuelType = Query(...),
+):
+    if settings.ui_test_mode:
+        return ui_test.zones_district_zips_response(province, fuel_type, barrio)
+    zip_codes = get_zip_codes_for_barrio(province, fuel_type, barrio)
+    zones = get_zip_code_price_map_for_zips(province, fuel_type, zip_codes)
+    return ZoneListResponse(zones=zones, province=province, fuel_type=fuel_type.value)
+
+
+@router.get("/zones/postal-geojson", response_model=GeoJSONResponse, dependencies=_SNAPSHOT_VALIDATED)
+@limiter.limit(settings.rate_limit)
+def zones_postal_geojson(
+    request: Request,
+    zip_codes: list[str] = Query(...),
+    detail: GeometryDetail | None = Query(None),
+    zoom: int | None = Query(None, ge=0, le=22),
+):
     if settings.ui_test_mode:
         return ui_test.postal_geojson_response(zip_codes)
-    geo = load_postal_codes_for_zip_list(zip_codes)
+    geo = load_postal_codes_for_zip_list(zip_codes, _geometry_detail(detail, zoom).value)
     return GeoJSONResponse(geojson=geo or {"type": "FeatureCollection", "features": []})
 
 
-@router.get("/zones/zip-boundary", response_model=GeoJSONResponse)
+@router.get("/zones/zip-boundary", response_model=GeoJSONResponse, dependencies=_SNAPSHOT_VALIDATED)
 @limiter.limit(settings.rate_limit)
 def zones_zip_boundary(request: Request, zip_code: str = Query(..., pattern=r"^\d{5}$")):
     if settings.ui_test_mode:
@@ -542,8 +624,8 @@ def historical_volatility(
 ):
     if settings.ui_test_mode:
         return ui_test.historical_volatility_response()
-    df = get_zone_volatility_ranking(fuel_type, _period_days(period), mainland_only)
-    return DataFrameResponse(rows=_rows(df))
+    table = get_zone_volatility_ranking(fuel_type, _period_days(period), mainland_only, as_arrow=True)
+    return arrow_json_response({"rows": table})
 
 
 @router.get("/quality/inventory", response_model=QualityResponse)
@@ -102,6 +102,15 @@ HISTORICAL_PERIOD_DAYS = {
 }
 
 
+class GeometryDetail(str, Enum):
+    """Boundary resolution of the zone GeoJSON endpoints; see ``services.geo_utils.GEOMETRY_DETAIL_LEVELS``."""
+
+    low = "low"
+    medium = "medium"
+    high = "high"
+    full = "full"
+
+
 class StationResult(BaseModel):
     label: str
     address: str
@@ -146,6 +155,13 @@ class DistrictPriceResult(BaseModel):
     station_count: int
 
 
+class BarrioPriceResult(BaseModel):
+    barrio: str
+    district: str
+    avg_price: float
+    station_count: int
+
+
 class TripStop(BaseModel):
     station: StationResult
     route_km: float
@@ -295,6 +311,13 @@ class DistrictMapResponse(BaseModel):
     fuel_type: str
 
 
+class BarrioMapResponse(BaseModel):
+    items: list[BarrioPriceResult]
+    province: str
+    fuel_type: str
+    district: str | None = None
+
+
 class AddressSuggestion(BaseModel):
     display_name: str
     lat: float
@@ -36,9 +36,28 @@ class Settings(BaseSettings):
     cache_ttl_seconds: int = 86400
     parquet_cache_dir: str = "/tmp/parquet_cache"
     parquet_cache_max_age_hours: int = 2
+    # Byte budget for parquet_cache_dir; LRU raw files are evicted (today's file and aggregates are pinned)
+    parquet_cache_max_mb: int = 512
+    # Memory budget for decoded aggregate DataFrames shared across requests
+    aggregate_memory_cache_mb: int = 256
+    # How often to poll aggregates/manifest.json for aggregates changed by the aggregator
+    aggregate_manifest_poll_seconds: int = 300
+    # Aggregates of the enabled insights tabs downloaded and decoded concurrently at startup
+    aggregate_preload_workers: int = 4
+    # Raw-file listings are served from an index refreshed by listing only the newest day prefixes
+    bucket_manifest_refresh_seconds: int = 300
+    bucket_manifest_full_refresh_hours: int = 24
+    # Last good snapshots are persisted here so a restart serves data before the first refresh (empty = off).
+    # Only useful on storage that outlives the container, e.g. a mounted volume; an in-memory /tmp is lost
+    # on every cold start.
+    warm_start_dir: str = ""
+    warm_start_max_age_hours: int = 24
 
     duckdb_threads: int = 2
     duckdb_memory_limit: str = "1GB"
+    # Snapshot-versioned cache of latest_stations / trend query results (see duckdb_engine._snapshot_cached)
+    query_cache_max_entries: int = 2048
+    query_cache_max_mb: int = 64
 
     port: int = 8080
     host: str = "0.0.0.0"
@@ -61,6 +80,10 @@ class Settings(BaseSettings):
     osrm_enabled: bool = True
 
     rate_limit: str = "60/minute"
+    # Cache-Control max-age for snapshot-backed API responses (revalidated with their ETag afterwards)
+    api_cache_max_age_seconds: int = 60
+    # Cache-Control max-age for static images/vendor files; unversioned JS/CSS is always revalidated
+    static_max_age_seconds: int = 86400
 
     realtime_enabled: bool = True
     realtime_refresh_seconds: int = 600
@@ -79,6 +102,11 @@ class Settings(BaseSettings):
     # Override: DASHBOARD_REPORT_BRANDS=ballenoil,repsol,costco,cepsa  (empty = all brands)
     report_brands: list[str] = ["ballenoil", "repsol", "costco"]
 
+    # Prometheus text-format metrics at /metrics (route latency, DuckDB, OSRM/Nominatim, caches, snapshots)
+    metrics_enabled: bool = True
+    # Scrapers must send "Authorization: Bearer <token>"; empty = only loopback clients may read /metrics
+    metrics_token: str = ""
+
     public_url: str = ""
     analytics_enabled: bool = False
     analytics_domain: str = ""
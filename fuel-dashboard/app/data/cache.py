@@ -1,14 +1,32 @@
 import logging
+import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import NamedTuple
 
 from config import settings
 
 from data.duckdb_engine import filter_public_stations
+from data.duckdb_engine import get_aggregate_manifest_version
+from data.duckdb_engine import get_latest_data_timestamp
+from data.duckdb_engine import get_snapshot_generation
+from data.duckdb_engine import get_snapshot_source
+from data.duckdb_engine import is_aggregate_manifest_active
+from data.duckdb_engine import is_zip_code_trend_ready
+from data.duckdb_engine import load_aggregate
+from data.duckdb_engine import load_warm_snapshot
+from data.duckdb_engine import refresh_aggregates_from_manifest
 from data.duckdb_engine import refresh_latest_snapshot
 from data.duckdb_engine import refresh_zip_code_trend_snapshot
 from data.duckdb_engine import replace_latest_stations
+from data.duckdb_engine import save_warm_snapshot
+from data.duckdb_engine import ZIP_CODE_TREND_TABLE
+from data.gcs_client import download_aggregate
 from data.gcs_client import get_aggregate_cache_age_seconds
+from data.gcs_client import get_latest_parquet_file
+from data.gcs_client import PARQUET_PATTERN
 from data.realtime_client import fetch_realtime_stations
 
 logger = logging.getLogger(__name__)
@@ -16,11 +34,62 @@ logger = logging.getLogger(__name__)
 _snapshot_refresh_thread: threading.Thread = None
 _trend_refresh_thread: threading.Thread = None
 _realtime_refresh_thread: threading.Thread = None
+_aggregate_manifest_thread: threading.Thread = None
+_aggregate_preload_thread: threading.Thread = None
+_bucket_file_thread: threading.Thread = None
 _data_ready = threading.Event()
 
 _last_realtime_refresh: float | None = None
 _consecutive_realtime_failures: int = 0
 
+ZIP_CODE_TREND_AGGREGATE = "zip_code_daily_stats.parquet"
+# Aggregates each insights tab reads; the startup preload marks a tab ready once all of its own are loaded.
+INSIGHTS_TAB_AGGREGATES: dict[str, tuple[str, ...]] = {
+    "trends": (ZIP_CODE_TREND_AGGREGATE, "province_daily_stats.parquet"),
+    "zones": (),
+    "historical": (
+        "province_daily_stats.parquet",
+        "day_of_week_stats.parquet",
+        "brand_daily_stats.parquet",
+        ZIP_CODE_TREND_AGGREGATE,
+    ),
+    "reportes": ("reports/brand_win_rate.parquet", "reports/brand_price_comparison.parquet"),
+    "quality": ("daily_ingestion_stats.parquet",),
+}
+# Aggregates queried as DuckDB tables (load_aggregate) rather than as DataFrames (download_aggregate).
+_TABLE_AGGREGATES = frozenset(
+    {"province_daily_stats.parquet", "day_of_week_stats.parquet", "brand_daily_stats.parquet"}
+)
+# Aggregate name -> {"status": "pending" | "loaded" | "missing" | "failed", "load_ms": float | None}
+_aggregate_preload_status: dict[str, dict] = {}
+_aggregate_preload_done = threading.Event()
+
+
+class DataHealth(NamedTuple):
+    """Data state reported by ``/health/data``, computed by the refresh threads.
+
+    A new instance replaces the previous one on every refresh and is never mutated, so probes read it
+    without I/O or locks.
+    """
+
+    # Newest raw file in the bucket (from the bucket manifest), which the stale check compares with today;
+    # None until the first listing.
+    latest_file: str | None
+    # Date of latest_file, else of the served data, else "unknown".
+    file_date: str
+    # GCS file behind the served stations snapshot; None when it was restored by warm start or is real-time.
+    loaded_file: str | None
+    # MAX(timestamp) of the served stations snapshot, or file_date when no snapshot is loaded.
+    data_datetime: str
+    aggregates: dict[str, dict]
+    insights_ready: dict[str, bool]
+    computed_at: float
+
+
+_latest_parquet_file: str | None = None
+_latest_bucket_file: str | None = None
+_data_health: DataHealth | None = None
+
 
 def _is_realtime_active() -> bool:
     if _last_realtime_refresh is None:
@@ -42,33 +111,207 @@ def is_data_ready() -> bool:
     return _data_ready.is_set()
 
 
+def get_snapshot_version() -> str | None:
+    """Return an id of the data behind the stations and trend snapshots, or None before any data.
+
+    It is built from the data alone: the stations feed timestamp, the trend aggregate's blob
+    generation and the applied aggregate manifest version, so every instance serving the same data,
+    before or after a restart, reports the same id. It also changes at midnight, since trend windows
+    are relative to the current date.
+    """
+    if not get_snapshot_generation("latest_stations"):
+        return None
+    stations = re.sub(r"\D", "", str(get_latest_data_timestamp() or "")) or "0"
+    trend = (get_snapshot_source(ZIP_CODE_TREND_TABLE) or "0") if is_zip_code_trend_ready() else "0"
+    return f"{stations}-{trend}-{get_aggregate_manifest_version()}-{date.today():%Y%m%d}"
+
+
+def warm_start() -> bool:
+    """Serve the snapshots persisted by the previous process until the first refresh lands.
+
+    Marks data ready when the stations snapshot was restored; returns True if the zip-code trend was.
+    """
+    loaded = load_warm_snapshot()
+    if "latest_stations" in loaded:
+        _data_ready.set()
+        # /health/data reports the restored snapshot until the first refresh replaces it.
+        _publish_data_health()
+    return ZIP_CODE_TREND_TABLE in loaded
+
+
+def _enabled_insights_tabs() -> list[str]:
+    enabled = {
+        "zones": settings.insights_zones_enabled,
+        "historical": settings.insights_historical_enabled,
+        "reportes": settings.insights_reportes_enabled,
+    }
+    return [tab for tab in INSIGHTS_TAB_AGGREGATES if enabled.get(tab, True)]
+
+
+def _preload_aggregate(name: str) -> None:
+    started = time.perf_counter()
+    try:
+        if name == ZIP_CODE_TREND_AGGREGATE:
+            loaded = is_zip_code_trend_ready()
+            if not loaded and refresh_zip_code_trend_snapshot():
+                save_warm_snapshot(ZIP_CODE_TREND_TABLE)
+                loaded = True
+        elif name in _TABLE_AGGREGATES:
+            loaded = load_aggregate(name) is not None
+        else:
+            loaded = download_aggregate(name) is not None
+        status = "loaded" if loaded else "missing"
+    except Exception:
+        logger.exception("Failed to preload aggregate %s", name)
+        status = "failed"
+    load_ms = round((time.perf_counter() - started) * 1000, 1)
+    _aggregate_preload_status[name] = {"status": status, "load_ms": load_ms}
+    logger.info("Preloaded aggregate %s: %s in %.1f ms", name, status, load_ms)
+    _publish_data_health()
+
+
+def _mark_aggregates_pending() -> list[str]:
+    names = sorted({name for tab in _enabled_insights_tabs() for name in INSIGHTS_TAB_AGGREGATES[tab]})
+    for name in names:
+        _aggregate_preload_status[name] = {"status": "pending", "load_ms": None}
+    return names
+
+
+def preload_aggregates() -> dict[str, dict]:
+    """Download and decode every aggregate read by an enabled insights tab, in parallel.
+
+    At most ``aggregate_preload_workers`` aggregates load at once. Returns the per-aggregate status
+    and load time, also available from ``get_aggregate_preload_status()``.
+    """
+    names = _mark_aggregates_pending()
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max(1, settings.aggregate_preload_workers), thread_name_prefix="aggregate-preload"
+        ) as pool:
+            list(pool.map(_preload_aggregate, names))
+    finally:
+        _aggregate_preload_done.set()
+    logger.info("Preloaded %d aggregates in %.1f ms", len(names), (time.perf_counter() - started) * 1000)
+    return get_aggregate_preload_status()
+
+
+def start_aggregate_preload() -> None:
+    global _aggregate_preload_thread
+
+    if _aggregate_preload_thread is None or not _aggregate_preload_thread.is_alive():
+        _aggregate_preload_done.clear()
+        # Marked before the thread starts so the trend refresh loop knows to wait for it.
+        _mark_aggregates_pending()
+        _aggregate_preload_thread = threading.Thread(target=preload_aggregates, daemon=True)
+        _aggregate_preload_thread.start()
+
+
+def get_aggregate_preload_status() -> dict[str, dict]:
+    return {name: dict(status) for name, status in _aggregate_preload_status.items()}
+
+
+def _is_aggregate_preload_running() -> bool:
+    return any(status["status"] == "pending" for status in _aggregate_preload_status.values())
+
+
+def is_insights_tab_ready(tab: str) -> bool:
+    """False while the startup preload is still loading an aggregate *tab* reads.
+
+    Aggregates that were not preloaded (or failed to) do not block the tab; they load on first use.
+    """
+    return all(
+        _aggregate_preload_status.get(name, {}).get("status") != "pending" for name in INSIGHTS_TAB_AGGREGATES[tab]
+    )
+
+
+def _publish_data_health() -> DataHealth:
+    """Recompute the ``/health/data`` state from what the refresh threads last listed and loaded."""
+    global _data_health
+    latest_file = _latest_bucket_file or _latest_parquet_file
+    match = PARQUET_PATTERN.search(latest_file) if latest_file else None
+    data_datetime = get_latest_data_timestamp()
+    # Before the first listing (warm start, real-time only) the date is the served stations' own.
+    file_date = match.group(1) if match else (str(data_datetime)[:10] if data_datetime else "unknown")
+    _data_health = DataHealth(
+        latest_file=latest_file,
+        file_date=file_date,
+        loaded_file=_latest_parquet_file,
+        data_datetime=data_datetime or file_date,
+        aggregates=get_aggregate_preload_status(),
+        insights_ready={tab: is_insights_tab_ready(tab) for tab in INSIGHTS_TAB_AGGREGATES},
+        computed_at=time.time(),
+    )
+    return _data_health
+
+
+def get_data_health() -> DataHealth | None:
+    """Return the last published data health, or None before the first refresh."""
+    return _data_health
+
+
 def _snapshot_refresh_loop():
+    global _latest_parquet_file
     while True:
         try:
             if _is_realtime_active():
                 logger.info("Skipping GCS refresh — real-time source is active")
             else:
                 logger.info("Refreshing data cache")
-                refresh_latest_snapshot()
+                _latest_parquet_file = refresh_latest_snapshot()
                 _data_ready.set()
+                save_warm_snapshot("latest_stations")
+            _publish_data_health()
         except Exception as e:
             logger.error(f"Error refreshing cache: {e}")
         time.sleep(_snapshot_sleep_seconds())
 
 
+def _bucket_file_loop():
+    """Track the newest raw file in the bucket, which changes long before the next snapshot refresh."""
+    global _latest_bucket_file
+    while True:
+        try:
+            # None only when the bucket is unreachable and nothing is indexed yet; keep the last one seen.
+            _latest_bucket_file = get_latest_parquet_file() or _latest_bucket_file
+            _publish_data_health()
+        except Exception as e:
+            logger.error(f"Error reading the newest bucket file: {e}")
+        time.sleep(settings.bucket_manifest_refresh_seconds)
+
+
 def _trend_refresh_loop(initial_delay_seconds: int = 0):
+    if _is_aggregate_preload_running():
+        # The startup preload loads the trend snapshot itself; schedule the first refresh after it.
+        _aggregate_preload_done.wait()
+        initial_delay_seconds = _initial_trend_refresh_delay_seconds(is_zip_code_trend_ready())
     if initial_delay_seconds > 0:
         time.sleep(initial_delay_seconds)
     refresh_interval_seconds = max(1, settings.parquet_cache_max_age_hours * 3600)
     while True:
         try:
-            logger.info("Refreshing zip-code trend cache")
-            refresh_zip_code_trend_snapshot()
+            if is_aggregate_manifest_active():
+                logger.info("Skipping zip-code trend refresh — kept current by the aggregate manifest")
+            elif refresh_zip_code_trend_snapshot():
+                save_warm_snapshot(ZIP_CODE_TREND_TABLE)
         except Exception as e:
             logger.error(f"Error refreshing zip-code trend cache: {e}")
         time.sleep(refresh_interval_seconds)
 
 
+def _aggregate_manifest_loop():
+    while True:
+        try:
+            changed = refresh_aggregates_from_manifest()
+            if changed is None:
+                logger.debug("No aggregate manifest published; aggregates refresh on their cache TTL")
+            elif "zip_code_daily_stats.parquet" in changed:
+                save_warm_snapshot(ZIP_CODE_TREND_TABLE)
+        except Exception as e:
+            logger.error(f"Error polling aggregate manifest: {e}")
+        time.sleep(settings.aggregate_manifest_poll_seconds)
+
+
 def _initial_trend_refresh_delay_seconds(skip_initial_trend_refresh: bool) -> int:
     if not skip_initial_trend_refresh:
         return 0
@@ -105,6 +348,8 @@ def _realtime_refresh_loop():
                 _consecutive_realtime_failures = 0
                 _data_ready.set()
                 logger.info("Real-time refresh loaded %d stations", count)
+                save_warm_snapshot("latest_stations")
+                _publish_data_health()
             else:
                 _consecutive_realtime_failures += 1
                 logger.warning(
@@ -117,13 +362,19 @@ def _realtime_refresh_loop():
 
 
 def start_cache_refresh(skip_initial_trend_refresh: bool = False):
-    global _snapshot_refresh_thread, _trend_refresh_thread, _realtime_refresh_thread
+    global _snapshot_refresh_thread, _trend_refresh_thread, _realtime_refresh_thread, _aggregate_manifest_thread
+    global _bucket_file_thread
 
     if _snapshot_refresh_thread is None or not _snapshot_refresh_thread.is_alive():
         _snapshot_refresh_thread = threading.Thread(target=_snapshot_refresh_loop, daemon=True)
         _snapshot_refresh_thread.start()
         logger.info(f"Cache refresh started (TTL: {settings.cache_ttl_seconds}s) — initial load in background")
 
+    if _bucket_file_thread is None or not _bucket_file_thread.is_alive():
+        _bucket_file_thread = threading.Thread(target=_bucket_file_loop, daemon=True)
+        _bucket_file_thread.start()
+        logger.info("Newest bucket file polling started (interval: %ss)", settings.bucket_manifest_refresh_seconds)
+
     if _trend_refresh_thread is None or not _trend_refresh_thread.is_alive():
         initial_delay_seconds = _initial_trend_refresh_delay_seconds(skip_initial_trend_refresh)
         _trend_refresh_thread = threading.Thread(
@@ -138,6 +389,11 @@ def start_cache_refresh(skip_initial_trend_refresh: bool = False):
             f" — initial refresh deferred by {initial_delay_seconds}s" if initial_delay_seconds > 0 else "",
         )
 
+    if _aggregate_manifest_thread is None or not _aggregate_manifest_thread.is_alive():
+        _aggregate_manifest_thread = threading.Thread(target=_aggregate_manifest_loop, daemon=True)
+        _aggregate_manifest_thread.start()
+        logger.info("Aggregate manifest polling started (interval: %ss)", settings.aggregate_manifest_poll_seconds)
+
     if settings.realtime_enabled and (_realtime_refresh_thread is None or not _realtime_refresh_thread.is_alive()):
         _realtime_refresh_thread = threading.Thread(target=_realtime_refresh_loop, daemon=True)
         _realtime_refresh_thread.start()
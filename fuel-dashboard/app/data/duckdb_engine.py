@@ -1,18 +1,37 @@
 import functools
+import inspect
+import itertools
+import json
 import logging
 import math
+import os
+import re
+import sys
 import threading
 import time
+from collections import deque
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
 
 import duckdb
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from api.schemas import FuelType
 from config import settings
+from metrics import REGISTRY
 
-from data.gcs_client import download_aggregate
+from data.gcs_client import cached_parquet_paths
+from data.gcs_client import download_aggregate_manifest
+from data.gcs_client import download_aggregate_table
 from data.gcs_client import download_parquet_as_df
-from data.gcs_client import download_parquets_as_df
+from data.gcs_client import get_aggregate_cache_mtime
+from data.gcs_client import get_aggregate_generation
 from data.gcs_client import get_latest_parquet_file
+from data.gcs_client import sync_aggregates_with_manifest
+from data.geojson_loader import load_madrid_barrio_index
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +50,17 @@ def _label_filter_clause(labels: list[str] | None, next_param_idx: int) -> tuple
     return f"AND label = ANY(${next_param_idx}::VARCHAR[])", [labels]
 
 
+def _fetch(result: duckdb.DuckDBPyConnection, as_arrow: bool) -> pd.DataFrame | pa.Table:
+    """Materialise a query result as a DataFrame, or as an Arrow table for the JSON fast path."""
+    return result.fetch_arrow_table() if as_arrow else result.fetchdf()
+
+
+def _empty_result(columns: list[str], as_arrow: bool) -> pd.DataFrame | pa.Table:
+    if as_arrow:
+        return pa.table({column: pa.array([], pa.null()) for column in columns})
+    return pd.DataFrame(columns=columns)
+
+
 def filter_public_stations(df: pd.DataFrame) -> pd.DataFrame:
     if "sale_type" not in df.columns:
         logger.warning("sale_type column missing from parquet; skipping public-only filter")
@@ -38,10 +68,228 @@ def filter_public_stations(df: pd.DataFrame) -> pd.DataFrame:
     return df[df["sale_type"] == "p"]
 
 
+class _ReadWriteLock:
+    """Shared/exclusive lock: any number of readers, or a single writer.
+
+    Writers are preferred — once a writer is waiting, new readers queue behind it so a snapshot
+    swap is never starved by a steady stream of API queries.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class _QueryStats:
+    """Per-query counters: calls, cumulative lock wait / query time and a window of recent latencies."""
+
+    def __init__(self, window: int = 1024):
+        self._window = window
+        self._mutex = threading.Lock()
+        self._stats: dict[str, dict] = {}
+
+    def record(self, name: str, lock_wait_s: float, query_s: float) -> None:
+        with self._mutex:
+            entry = self._stats.get(name)
+            if entry is None:
+                entry = {"count": 0, "lock_wait_s": 0.0, "query_s": 0.0, "recent": deque(maxlen=self._window)}
+                self._stats[name] = entry
+            entry["count"] += 1
+            entry["lock_wait_s"] += lock_wait_s
+            entry["query_s"] += query_s
+            entry["recent"].append(lock_wait_s + query_s)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._mutex:
+            return {
+                name: {
+                    "count": entry["count"],
+                    "lock_wait_ms_total": entry["lock_wait_s"] * 1000,
+                    "query_ms_total": entry["query_s"] * 1000,
+                    "p50_ms": _percentile(entry["recent"], 0.50) * 1000,
+                    "p99_ms": _percentile(entry["recent"], 0.99) * 1000,
+                }
+                for name, entry in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._mutex:
+            self._stats.clear()
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _result_nbytes(value) -> int:
+    """Rough resident size of a cached query result."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pa.Table):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _detached(value):
+    """Return a copy of a cached result that callers may mutate without corrupting the cache."""
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, (dict, list)):
+        return value.copy()
+    return value
+
+
+class _QueryResultCache:
+    """LRU of query results keyed by (function, arguments, snapshot generations), bounded by entries and bytes.
+
+    Entries remember which snapshots they were computed from; ``invalidate(name)`` drops them when
+    that snapshot is swapped. The cache belongs to one DuckDB connection and empties itself if
+    ``get_connection()`` starts returning a different one.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[object, int, tuple[str, ...]]] = OrderedDict()
+        self._bytes = 0
+        self._owner: duckdb.DuckDBPyConnection | None = None
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._per_function: dict[str, dict[str, int]] = {}
+
+    def _check_owner(self, conn) -> None:
+        if self._owner is not conn:
+            self._entries.clear()
+            self._bytes = 0
+            self._owner = conn
+
+    def _count(self, function: str, outcome: str) -> None:
+        self._counters[outcome] += 1
+        per_function = self._per_function.setdefault(function, {"hits": 0, "misses": 0})
+        per_function[outcome] += 1
+
+    def get(self, conn, key: tuple):
+        """Return ``(True, value)`` on a hit, ``(False, None)`` otherwise."""
+        with self._mutex:
+            self._check_owner(conn)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count(key[0], "misses")
+                return False, None
+            self._entries.move_to_end(key)
+            self._count(key[0], "hits")
+            return True, entry[0]
+
+    def put(self, conn, key: tuple, value, tables: tuple[str, ...]) -> None:
+        nbytes = _result_nbytes(value)
+        max_bytes = settings.query_cache_max_mb * 1024 * 1024
+        if nbytes > max_bytes:
+            return
+        with self._mutex:
+            self._check_owner(conn)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, nbytes, tables)
+            self._bytes += nbytes
+            while self._entries and (self._bytes > max_bytes or len(self._entries) > settings.query_cache_max_entries):
+                _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self._counters["evictions"] += 1
+
+    def invalidate(self, name: str) -> None:
+        """Drop every entry computed from snapshot *name*."""
+        with self._mutex:
+            stale = [key for key, (_, _, tables) in self._entries.items() if name in tables]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+            self._counters["invalidations"] += len(stale)
+
+    def snapshot(self) -> dict:
+        with self._mutex:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": self._counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": settings.query_cache_max_entries,
+                "max_bytes": settings.query_cache_max_mb * 1024 * 1024,
+                "functions": {name: dict(counts) for name, counts in self._per_function.items()},
+            }
+
+    def clear(self) -> None:
+        with self._mutex:
+            self._entries.clear()
+            self._bytes = 0
+            self._counters = dict.fromkeys(self._counters, 0)
+            self._per_function.clear()
+
+
 _connection: duckdb.DuckDBPyConnection | None = None
-_lock = threading.Lock()
+_rw_lock = _ReadWriteLock()
+_thread_local = threading.local()
+_query_stats = _QueryStats()
+_query_cache = _QueryResultCache()
+_QUERY_SECONDS = REGISTRY.histogram("duckdb_query_duration_seconds", "Time spent executing DuckDB queries.", ("query",))
+_LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "duckdb_lock_wait_seconds", "Time DuckDB queries waited for the snapshot lock.", ("query",)
+)
+_aggregate_table_stats = REGISTRY.cache("aggregate_tables")
+# Snapshot name -> (row count, time.time() of the swap) for the /metrics gauges.
+_snapshot_info: dict[str, tuple[int, float]] = {}
+_generation_counter = itertools.count(1)
+_snapshot_generations: dict[str, int] = {}
+# Snapshot name -> identity of the data it was built from (the aggregate's blob generation), which
+# unlike the generation is the same in every process serving that data; persisted with warm starts.
+_snapshot_sources: dict[str, str] = {}
 _zip_code_trend_ready = threading.Event()
 _last_successful_trend_refresh: float | None = None
+_warm_start_lock = threading.Lock()
+# Aggregate name -> (loaded_at, local cache mtime at load) for tables managed by load_aggregate().
+_aggregate_versions: dict[str, tuple[float, float | None]] = {}
+_aggregate_locks: dict[str, threading.Lock] = {}
+# Version of the last aggregates/manifest.json applied, and when it was last polled successfully.
+_aggregate_manifest_version = 0
+_aggregate_manifest_polled_at: float | None = None
 
 ZIP_CODE_TREND_TABLE = "zip_code_daily_stats"
 ZIP_CODE_TREND_COLUMNS = (
@@ -55,23 +303,45 @@ ZIP_CODE_TREND_COLUMNS = (
     "station_count",
 )
 
-
-def _normalize_zip_code_trend_aggregate(aggregate_df: pd.DataFrame | None) -> pd.DataFrame | None:
-    if aggregate_df is None:
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GRID_CELL_DEGREES = 0.1
+# Nearest-station search widens its ring by this factor until `limit` stations are found; past the
+# last radius it scans the whole snapshot.
+_KNN_RING_RADII_KM = (5.0, 20.0, 80.0, 320.0)
+
+# Feed columns kept in latest_stations besides the fuel prices; ids, locality and sale_type are never read.
+STATION_COLUMNS = ("timestamp", "zip_code", "label", "address", "municipality", "province", "latitude", "longitude")
+# Prices are published with three decimals: exact in 4 bytes, where DOUBLE takes 8.
+STATION_PRICE_TYPE = "DECIMAL(6, 3)"
+# Polygon each station lies in, assigned once per snapshot by _with_station_polygons(): the Madrid
+# district and barrio names; NULL outside Madrid.
+STATION_POLYGON_COLUMNS = ("district", "barrio")
+
+# Derived per snapshot by replace_latest_stations(): radians, cos(lat) and the grid cell of each station.
+_SPATIAL_INDEX_COLUMNS = f"""
+    RADIANS(latitude) AS lat_rad,
+    RADIANS(longitude) AS lon_rad,
+    COS(RADIANS(latitude)) AS cos_lat,
+    CAST(FLOOR(latitude / {GRID_CELL_DEGREES}) AS INTEGER) AS grid_row,
+    CAST(FLOOR(longitude / {GRID_CELL_DEGREES}) AS INTEGER) AS grid_col
+"""
+
+
+def _normalize_zip_code_trend_aggregate(aggregate: pa.Table | None) -> pa.Table | None:
+    if aggregate is None:
         return None
 
-    if aggregate_df.empty:
-        return aggregate_df
+    if aggregate.num_rows == 0:
+        return aggregate
 
-    if "province" not in aggregate_df.columns:
+    if "province" not in aggregate.column_names:
         legacy_columns = set(ZIP_CODE_TREND_COLUMNS) - {"province"}
-        if legacy_columns.issubset(aggregate_df.columns):
-            normalized_df = aggregate_df.copy()
-            normalized_df["province"] = None
+        if legacy_columns.issubset(aggregate.column_names):
             logger.info("Loaded legacy zip-code trend aggregate without province column; filling province with nulls")
-            return normalized_df
+            return aggregate.append_column("province", pa.nulls(aggregate.num_rows, pa.string()))
 
-    return aggregate_df
+    return aggregate
 
 
 def get_connection() -> duckdb.DuckDBPyConnection:
@@ -87,34 +357,375 @@ def get_connection() -> duckdb.DuckDBPyConnection:
     return _connection
 
 
+def _thread_cursor() -> duckdb.DuckDBPyConnection:
+    """Return this worker thread's cursor on the shared in-memory database.
+
+    A DuckDB connection must not be used from several threads at once, but cursors created
+    from it share the same catalog and can run queries in parallel.
+    """
+    conn = get_connection()
+    if getattr(_thread_local, "owner", None) is not conn:
+        _thread_local.cursor = conn.cursor()
+        _thread_local.owner = conn
+    return _thread_local.cursor
+
+
+def _record_query(name: str, lock_wait_s: float, query_s: float) -> None:
+    _query_stats.record(name, lock_wait_s, query_s)
+    _QUERY_SECONDS.observe(query_s, query=name)
+    _LOCK_WAIT_SECONDS.observe(lock_wait_s, query=name)
+
+
+@contextmanager
+def _reader(name: str):
+    """Run a read query on the thread cursor under the shared lock, recording lock wait and query time."""
+    requested = time.perf_counter()
+    with _rw_lock.read():
+        acquired = time.perf_counter()
+        try:
+            yield _thread_cursor()
+        finally:
+            _record_query(name, acquired - requested, time.perf_counter() - acquired)
+
+
+@contextmanager
+def _writer(name: str):
+    """Like ``_reader`` but holds the exclusive lock, so no query observes a half-swapped snapshot."""
+    requested = time.perf_counter()
+    with _rw_lock.write():
+        acquired = time.perf_counter()
+        try:
+            yield _thread_cursor()
+        finally:
+            _record_query(name, acquired - requested, time.perf_counter() - acquired)
+
+
+def get_query_stats() -> dict[str, dict]:
+    """Return per-query call counts, cumulative lock wait / query time and recent p50/p99 latency (ms)."""
+    return _query_stats.snapshot()
+
+
+def reset_query_stats() -> None:
+    _query_stats.reset()
+
+
+def get_snapshot_generation(name: str) -> int:
+    """Return the generation currently served under *name* (0 if it was never swapped in)."""
+    return _snapshot_generations.get(name, 0)
+
+
+def get_snapshot_source(name: str) -> str | None:
+    """Return the identity of the data served under *name*, or None if it is not tracked."""
+    return _snapshot_sources.get(name)
+
+
+def _aggregate_source(name: str) -> str:
+    """Identity of the local copy of aggregate *name*: its blob generation, else when it was cached."""
+    generation = get_aggregate_generation(name)
+    if generation is not None:
+        return generation
+    return f"t{get_aggregate_cache_mtime(name) or time.time():.0f}"
+
+
+def get_query_cache_stats() -> dict:
+    """Return query result cache counters (hits, misses, evictions, invalidations), size and per-function hits."""
+    return _query_cache.snapshot()
+
+
+def clear_query_cache() -> None:
+    _query_cache.clear()
+
+
+def _snapshot_metrics():
+    now = time.time()
+    info = dict(_snapshot_info)
+    return [
+        (
+            "fuel_dashboard_snapshot_rows",
+            "gauge",
+            "Rows in the snapshot currently served under each name.",
+            [({"snapshot": name}, rows) for name, (rows, _) in sorted(info.items())],
+        ),
+        (
+            "fuel_dashboard_snapshot_age_seconds",
+            "gauge",
+            "Seconds since each snapshot was last swapped in.",
+            [({"snapshot": name}, now - swapped_at) for name, (_, swapped_at) in sorted(info.items())],
+        ),
+        (
+            "fuel_dashboard_query_cache_bytes",
+            "gauge",
+            "Estimated size of the query result cache.",
+            [({}, _query_cache.snapshot()["bytes"])],
+        ),
+    ]
+
+
+def _query_cache_counts() -> tuple[int, int]:
+    stats = _query_cache.snapshot()
+    return stats["hits"], stats["misses"]
+
+
+REGISTRY.register_collector(_snapshot_metrics)
+REGISTRY.register_cache("query_results", _query_cache_counts)
+
+
+def _cache_generation(name: str) -> int:
+    if name == ZIP_CODE_TREND_TABLE and not _zip_code_trend_ready.is_set():
+        return 0
+    return get_snapshot_generation(name)
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
+
+
+def _snapshot_cached(*tables: str):
+    """Memoize a query on its arguments and the current generation of each snapshot in *tables*.
+
+    A new generation of any of them makes older entries unreachable (and ``_swap_snapshot`` drops
+    them). Results are only cached while every table is a published snapshot, so queries against
+    tables created outside ``_swap_snapshot`` always run. Today's date is part of the key because
+    trend queries filter on ``CURRENT_DATE``. Callers receive copies and may mutate them.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            generations = tuple(_cache_generation(name) for name in tables)
+            if not all(generations):
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__name__, _hashable(tuple(bound.arguments.items())), generations, date.today())
+            conn = get_connection()
+            hit, value = _query_cache.get(conn, key)
+            if not hit:
+                value = func(*args, **kwargs)
+                # A swap during the query may have fed it the newer snapshot; don't file that under the old key.
+                if tuple(_cache_generation(name) for name in tables) == generations:
+                    _query_cache.put(conn, key, value, tables)
+            return _detached(value)
+
+        return wrapper
+
+    return decorator
+
+
+def _swap_snapshot(name: str, df: pd.DataFrame | pa.Table, build_sql: str = "SELECT * FROM _snapshot_source") -> int:
+    """Publish *df* (a DataFrame or Arrow table) as a new generation of snapshot *name*; return its row count.
+
+    *build_sql* selects the generation's rows from ``_snapshot_source`` (the registered *df*), so
+    per-snapshot derived columns are computed once at load time.
+
+    The ``{name}_{gen}`` table is built on this thread's cursor without any lock, so readers keep
+    querying the previous generation meanwhile. Only the repoint of the ``{name}`` view and the
+    drop of the old generation take the exclusive lock, which waits for in-flight readers.
+    """
+    return _swap_snapshots({name: (df, build_sql)})[name]
+
+
+def _swap_snapshots(sources: dict[str, tuple[pd.DataFrame | pa.Table | str, str]]) -> dict[str, int]:
+    """Publish new generations of several snapshots at once; return their row counts by name.
+
+    *sources* maps snapshot name -> (data, build_sql) as for ``_swap_snapshot``; *data* may also be
+    the name of an earlier source, whose freshly built table is then ``_snapshot_source``. Every
+    table is built first, then all views are repointed under a single exclusive lock, so no query
+    sees some of the snapshots updated and others not.
+    """
+    cursor = _thread_cursor()
+    built: dict[str, tuple[int, int]] = {}
+    try:
+        for name, (df, build_sql) in sources.items():
+            generation = next(_generation_counter)
+            physical = f"{name}_{generation}"
+            if isinstance(df, str):
+                cursor.execute(f"CREATE TEMP VIEW _snapshot_source AS SELECT * FROM {df}_{built[df][0]}")
+            else:
+                cursor.register("_snapshot_source", df)
+            try:
+                cursor.execute(f"CREATE TABLE {physical} AS {build_sql}")
+                built[name] = (generation, cursor.execute(f"SELECT COUNT(*) FROM {physical}").fetchone()[0])
+            except Exception:
+                cursor.execute(f"DROP TABLE IF EXISTS {physical}")
+                raise
+            finally:
+                if isinstance(df, str):
+                    cursor.execute("DROP VIEW _snapshot_source")
+                else:
+                    cursor.unregister("_snapshot_source")
+    except Exception:
+        for name, (generation, _) in built.items():
+            cursor.execute(f"DROP TABLE IF EXISTS {name}_{generation}")
+        raise
+
+    with _writer("swap_" + "+".join(built)) as conn:
+        swapped_at = time.time()
+        for name, (generation, row_count) in built.items():
+            previous = _snapshot_generations.get(name)
+            # A plain table under the alias (legacy load or test fixture) has to make way for the view.
+            is_table = conn.execute(
+                "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = $1 AND NOT temporary", [name]
+            ).fetchone()[0]
+            if is_table:
+                conn.execute(f"DROP TABLE {name}")
+            conn.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM {name}_{generation}")
+            if previous is not None:
+                conn.execute(f"DROP TABLE IF EXISTS {name}_{previous}")
+            _snapshot_generations[name] = generation
+            _snapshot_info[name] = (row_count, swapped_at)
+    for name in built:
+        _query_cache.invalidate(name)
+    return {name: row_count for name, (_, row_count) in built.items()}
+
+
+def _station_columns_sql(columns) -> str:
+    """Select list that keeps the feed columns the dashboard reads and stores prices as ``STATION_PRICE_TYPE``."""
+    selected = []
+    for column in columns:
+        if column in _VALID_FUEL_COLUMNS:
+            # Out-of-range values (a malformed feed) become NULL instead of failing the whole load.
+            selected.append(f"TRY_CAST({column} AS {STATION_PRICE_TYPE}) AS {column}")
+        elif column in STATION_COLUMNS:
+            selected.append(column)
+        elif column in STATION_POLYGON_COLUMNS:
+            selected.append(f"CAST({column} AS VARCHAR) AS {column}")
+    return ", ".join(selected)
+
+
+def _with_station_polygons(data: pd.DataFrame | pa.Table) -> pd.DataFrame | pa.Table:
+    """Add ``STATION_POLYGON_COLUMNS`` to a stations feed with coordinates, unless it already has them.
+
+    Snapshots restored on warm start carry the columns, so stations are only located once per feed.
+    """
+    columns = list(data.columns) if isinstance(data, pd.DataFrame) else data.column_names
+    if not {"latitude", "longitude"}.issubset(columns) or set(STATION_POLYGON_COLUMNS).issubset(columns):
+        return data
+    if isinstance(data, pd.DataFrame):
+        lats = np.asarray(data["latitude"], dtype=np.float64)
+        lons = np.asarray(data["longitude"], dtype=np.float64)
+    else:
+        lats = np.asarray(data.column("latitude").to_numpy(zero_copy_only=False), dtype=np.float64)
+        lons = np.asarray(data.column("longitude").to_numpy(zero_copy_only=False), dtype=np.float64)
+        data = data.drop_columns([column for column in STATION_POLYGON_COLUMNS if column in columns])
+    districts, barrios = load_madrid_barrio_index().lookup(lats, lons)
+    for column, names in {"district": districts, "barrio": barrios}.items():
+        if isinstance(data, pd.DataFrame):
+            data = data.assign(**{column: names})
+        else:
+            data = data.append_column(column, pa.array(names, type=pa.string()))
+    return data
+
+
+# Per-snapshot rollups of latest_stations, rebuilt with every stations snapshot and published in the
+# same swap, so request-time zone/province/label queries are keyed lookups instead of GROUP BYs.
+# Price rollups: name -> grouping keys; one row per key and fuel type with a positive price.
+STATION_PRICE_ROLLUPS: dict[str, tuple[str, ...]] = {
+    "latest_zip_prices": ("province", "zip_code"),
+    "latest_province_prices": ("province",),
+    "latest_municipality_zip_prices": ("province", "municipality", "zip_code"),
+}
+# Dictionaries: name -> (feed columns required, SELECT over the new stations table).
+STATION_DICTIONARIES: dict[str, tuple[tuple[str, ...], str]] = {
+    "latest_labels": (
+        ("label",),
+        """
+        SELECT label, COUNT(*) AS station_count
+        FROM _snapshot_source
+        WHERE label IS NOT NULL AND label != ''
+        GROUP BY label
+        ORDER BY station_count DESC, label ASC
+        """,
+    ),
+    "latest_provinces": (
+        ("province", "municipality"),
+        """
+        SELECT DISTINCT province, municipality
+        FROM _snapshot_source
+        WHERE province IS NOT NULL
+        ORDER BY province, municipality
+        """,
+    ),
+}
+
+
+def _price_rollup_sql(columns, keys: tuple[str, ...]) -> str:
+    key_list = ", ".join(keys)
+    fuel_columns = [column for column in columns if column in _VALID_FUEL_COLUMNS]
+    if not fuel_columns:
+        return (
+            f"SELECT {key_list}, NULL::VARCHAR AS fuel_type, NULL::DOUBLE AS avg_price, "
+            "NULL::DOUBLE AS min_price, 0::BIGINT AS station_count FROM _snapshot_source WHERE false"
+        )
+    # One GROUP BY per fuel column; cheaper than grouping an UNPIVOT of all of them.
+    selects = [
+        f"""
+        SELECT {key_list}, '{fuel}' AS fuel_type,
+            AVG({fuel}) AS avg_price, MIN({fuel}) AS min_price, COUNT(*) AS station_count
+        FROM _snapshot_source
+        WHERE {fuel} > 0
+        GROUP BY {key_list}
+        """
+        for fuel in fuel_columns
+    ]
+    return f"{' UNION ALL '.join(selects)} ORDER BY {key_list}, fuel_type"
+
+
+def _station_snapshot_sources(data: pd.DataFrame | pa.Table) -> dict[str, tuple[pd.DataFrame | pa.Table | str, str]]:
+    """Build statements for latest_stations and each of its rollups the feed has the columns for."""
+    data = _with_station_polygons(data)
+    columns = list(data.columns) if isinstance(data, pd.DataFrame) else data.column_names
+    build_sql = f"SELECT {_station_columns_sql(columns)} FROM _snapshot_source"
+    if {"latitude", "longitude"}.issubset(columns):
+        build_sql = (
+            f"SELECT {_station_columns_sql(columns)}, {_SPATIAL_INDEX_COLUMNS} "
+            "FROM _snapshot_source ORDER BY grid_row, grid_col"
+        )
+    # The rollups read the stations table built just before them rather than rescanning the feed.
+    sources = {"latest_stations": (data, build_sql)}
+    for name, keys in STATION_PRICE_ROLLUPS.items():
+        if set(keys).issubset(columns):
+            sources[name] = ("latest_stations", _price_rollup_sql(columns, keys))
+    for name, (required, select_sql) in STATION_DICTIONARIES.items():
+        if set(required).issubset(columns):
+            sources[name] = ("latest_stations", select_sql)
+    return sources
+
+
 def replace_latest_stations(df: pd.DataFrame) -> int:
-    """Atomically replace the latest_stations table; return row count."""
-    with _lock:
-        conn = get_connection()
-        conn.execute("DROP TABLE IF EXISTS latest_stations")
-        conn.execute("CREATE TABLE latest_stations AS SELECT * FROM df")
-        count = conn.execute("SELECT COUNT(*) FROM latest_stations").fetchone()[0]
-    query_national_avg_stats.cache_clear()
-    return count
+    """Atomically replace the latest_stations snapshot and its rollups; return the station count.
+
+    Only ``STATION_COLUMNS`` and the fuel price columns are kept, prices as fixed-point decimals.
+    Snapshots with coordinates get the spatial grid columns and are clustered by grid cell.
+    """
+    return _swap_snapshots(_station_snapshot_sources(df))["latest_stations"]
 
 
-def refresh_latest_snapshot() -> None:
+def refresh_latest_snapshot() -> str | None:
+    """Load the newest parquet file into latest_stations; returns its name, or None if the bucket has none."""
     latest_file = get_latest_parquet_file()
     if latest_file is None:
         logger.warning("No parquet files found in GCS bucket")
-        return
+        return None
     logger.info(f"Refreshing latest snapshot from {latest_file}")
     df = download_parquet_as_df(latest_file)
     df = filter_public_stations(df)
     count = replace_latest_stations(df)
     logger.info(f"Loaded {count} stations into latest_stations table")
+    return latest_file
 
 
+@_snapshot_cached("latest_stations")
 def get_latest_data_timestamp() -> str | None:
     """Return the MAX(timestamp) from the loaded stations snapshot, or None if unavailable."""
     try:
-        with _lock:
-            conn = get_connection()
+        with _reader("get_latest_data_timestamp") as conn:
             row = conn.execute("SELECT MAX(timestamp) FROM latest_stations").fetchone()
         return row[0] if row and row[0] else None
     except Exception:
@@ -136,8 +747,8 @@ def refresh_zip_code_trend_snapshot() -> bool:
 
     had_snapshot = _zip_code_trend_ready.is_set()
     started = time.perf_counter()
-    aggregate_df = _normalize_zip_code_trend_aggregate(download_aggregate("zip_code_daily_stats.parquet"))
-    if aggregate_df is None:
+    aggregate = _normalize_zip_code_trend_aggregate(download_aggregate_table("zip_code_daily_stats.parquet"))
+    if aggregate is None:
         if had_snapshot:
             logger.warning("Zip-code trend aggregate unavailable; keeping last good trend snapshot")
             _log_trend_staleness()
@@ -147,26 +758,23 @@ def refresh_zip_code_trend_snapshot() -> bool:
         return False
 
     expected_columns = set(ZIP_CODE_TREND_COLUMNS)
-    if aggregate_df.empty or not expected_columns.issubset(aggregate_df.columns):
+    if aggregate.num_rows == 0 or not expected_columns.issubset(aggregate.column_names):
         if had_snapshot:
             logger.warning(
                 "Zip-code trend aggregate invalid; keeping last good trend snapshot (%s)",
-                sorted(aggregate_df.columns.tolist()),
+                sorted(aggregate.column_names),
             )
             _log_trend_staleness()
         else:
             _zip_code_trend_ready.clear()
             logger.warning(
                 "Zip-code trend aggregate invalid; raw-history fallback will be used (%s)",
-                sorted(aggregate_df.columns.tolist()),
+                sorted(aggregate.column_names),
             )
         return False
 
-    df = aggregate_df  # noqa: F841
-    with _lock:
-        conn = get_connection()
-        conn.execute(f"CREATE OR REPLACE TABLE {ZIP_CODE_TREND_TABLE} AS SELECT * FROM df")
-        row_count = conn.execute(f"SELECT COUNT(*) FROM {ZIP_CODE_TREND_TABLE}").fetchone()[0]
+    row_count = _swap_snapshot(ZIP_CODE_TREND_TABLE, aggregate)
+    _snapshot_sources[ZIP_CODE_TREND_TABLE] = _aggregate_source("zip_code_daily_stats.parquet")
     _zip_code_trend_ready.set()
     _last_successful_trend_refresh = time.time()
     duration_ms = (time.perf_counter() - started) * 1000
@@ -174,13 +782,222 @@ def refresh_zip_code_trend_snapshot() -> bool:
     return True
 
 
+WARM_START_TABLES = ("latest_stations", ZIP_CODE_TREND_TABLE)
+_WARM_START_METADATA_FILE = "metadata.json"
+
+
+def _warm_start_path(filename: str) -> Path:
+    return Path(settings.warm_start_dir) / filename
+
+
+def _read_warm_start_metadata() -> dict:
+    try:
+        return json.loads(_warm_start_path(_WARM_START_METADATA_FILE).read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable warm-start metadata: {e}")
+        return {}
+
+
+def save_warm_snapshot(name: str) -> None:
+    """Persist the generation currently served under *name* as an Arrow IPC file for the next cold start.
+
+    The file holds the table as built (derived columns included) and is written to a temp file and
+    renamed, so a crash mid-write never leaves a truncated snapshot behind.
+    """
+    if not settings.warm_start_dir or get_snapshot_generation(name) == 0:
+        return
+    started = time.perf_counter()
+    try:
+        with _reader(f"save_warm_snapshot_{name}") as conn:
+            table = conn.execute(f"SELECT * FROM {name}").arrow()
+        with _warm_start_lock:
+            path = _warm_start_path(f"{name}.arrow")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".arrow.tmp")
+            with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as ipc_writer:
+                ipc_writer.write_table(table)
+            os.replace(tmp_path, path)
+
+            metadata = _read_warm_start_metadata()
+            metadata[name] = {"saved_at": time.time(), "rows": table.num_rows, "source": _snapshot_sources.get(name)}
+            metadata_path = _warm_start_path(_WARM_START_METADATA_FILE)
+            tmp_metadata_path = metadata_path.with_suffix(".json.tmp")
+            tmp_metadata_path.write_text(json.dumps(metadata))
+            os.replace(tmp_metadata_path, metadata_path)
+    except Exception as e:
+        logger.warning(f"Failed to persist warm-start snapshot {name}: {e}")
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    logger.info("Persisted warm-start snapshot %s (%s rows, %.1f ms)", name, table.num_rows, duration_ms)
+
+
+def load_warm_snapshot() -> list[str]:
+    """Swap in the snapshots persisted by save_warm_snapshot(); return the names that were loaded.
+
+    Files are memory-mapped and handed to DuckDB as Arrow tables, so no pandas decode happens on
+    the startup path. Snapshots older than ``warm_start_max_age_hours`` are ignored.
+    """
+    global _last_successful_trend_refresh
+
+    if not settings.warm_start_dir:
+        return []
+    metadata = _read_warm_start_metadata()
+    loaded = []
+    for name in WARM_START_TABLES:
+        entry = metadata.get(name)
+        path = _warm_start_path(f"{name}.arrow")
+        if entry is None or not path.exists():
+            continue
+        age_seconds = time.time() - entry["saved_at"]
+        if age_seconds > settings.warm_start_max_age_hours * 3600:
+            logger.info("Ignoring warm-start snapshot %s (%.0f s old)", name, age_seconds)
+            continue
+        started = time.perf_counter()
+        try:
+            with pa.memory_map(str(path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+                if name == "latest_stations":
+                    # The rollups are not persisted; derive them from the restored stations.
+                    row_count = _swap_snapshots(_station_snapshot_sources(table))[name]
+                else:
+                    row_count = _swap_snapshot(name, table)
+        except Exception as e:
+            logger.warning(f"Failed to load warm-start snapshot {name}: {e}")
+            continue
+        duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            "Warm-started %s from %s (%s rows, %.0f s old, %.1f ms)", name, path, row_count, age_seconds, duration_ms
+        )
+        if entry.get("source"):
+            _snapshot_sources[name] = entry["source"]
+        loaded.append(name)
+
+    if ZIP_CODE_TREND_TABLE in loaded:
+        _zip_code_trend_ready.set()
+        _last_successful_trend_refresh = metadata[ZIP_CODE_TREND_TABLE]["saved_at"]
+    return loaded
+
+
+# Aggregates whose table is kept current by a dedicated refresh loop rather than by load_aggregate().
+_AGGREGATE_SNAPSHOTS = {"zip_code_daily_stats.parquet": ZIP_CODE_TREND_TABLE}
+
+
+def _aggregate_table_name(name: str) -> str:
+    return "agg_" + re.sub(r"\W", "_", name.removesuffix(".parquet"))
+
+
+def _is_aggregate_current(name: str) -> bool:
+    version = _aggregate_versions.get(name)
+    if version is None:
+        return False
+    loaded_at, cache_mtime = version
+    window_seconds = settings.parquet_cache_max_age_hours * 3600
+    return time.time() - loaded_at < window_seconds and get_aggregate_cache_mtime(name) == cache_mtime
+
+
+def load_aggregate(name: str) -> str | None:
+    """Return the DuckDB table holding ``aggregates/{name}``, or None if it was never available.
+
+    The table is (re)built from download_aggregate_table() at most once per aggregate cache window
+    (``parquet_cache_max_age_hours``), or sooner if the local cache file was refetched meanwhile;
+    in between, queries run against it in place. If a reload fails the previous table keeps serving.
+    """
+    if name in _AGGREGATE_SNAPSHOTS:
+        return _AGGREGATE_SNAPSHOTS[name] if _zip_code_trend_ready.is_set() else None
+
+    table = _aggregate_table_name(name)
+    if _is_aggregate_current(name):
+        _aggregate_table_stats.hit()
+        return table
+    with _aggregate_locks.setdefault(name, threading.Lock()):
+        if _is_aggregate_current(name):
+            _aggregate_table_stats.hit()
+            return table
+        _aggregate_table_stats.miss()
+        started = time.perf_counter()
+        aggregate = download_aggregate_table(name)
+        if aggregate is None:
+            if get_snapshot_generation(table):
+                logger.warning("Aggregate %s unavailable; keeping last loaded table", name)
+                return table
+            return None
+        row_count = _swap_snapshot(table, aggregate)
+        _aggregate_versions[name] = (time.time(), get_aggregate_cache_mtime(name))
+    duration_ms = (time.perf_counter() - started) * 1000
+    logger.info("Loaded aggregate %s into %s (%s rows, %.1f ms)", name, table, row_count, duration_ms)
+    return table
+
+
+def get_aggregate_manifest_version() -> int:
+    """Return the version of the last aggregate manifest applied (0 before the first one)."""
+    return _aggregate_manifest_version
+
+
+def is_aggregate_manifest_active() -> bool:
+    """True while the aggregate manifest is being polled successfully, so it keeps aggregates current."""
+    if _aggregate_manifest_polled_at is None:
+        return False
+    return time.time() - _aggregate_manifest_polled_at < 2 * settings.aggregate_manifest_poll_seconds
+
+
+def refresh_aggregates_from_manifest() -> list[str] | None:
+    """Poll ``aggregates/manifest.json`` and reload exactly the aggregates that changed.
+
+    Returns the changed aggregate names, or None if no manifest is published (aggregates then
+    expire on ``parquet_cache_max_age_hours`` as before). The tables of all changed aggregates
+    already loaded into DuckDB, including the zip-code trend snapshot, are swapped in together,
+    and the applied manifest version is bumped once afterwards.
+    """
+    global _aggregate_manifest_version, _aggregate_manifest_polled_at, _last_successful_trend_refresh
+
+    manifest = download_aggregate_manifest()
+    if manifest is None:
+        return None
+    changed = sync_aggregates_with_manifest(manifest)
+
+    sources = {}
+    for name in changed:
+        if name in _AGGREGATE_SNAPSHOTS:
+            if not _zip_code_trend_ready.is_set():
+                continue
+            trend = _normalize_zip_code_trend_aggregate(download_aggregate_table(name))
+            if trend is None or trend.num_rows == 0 or not set(ZIP_CODE_TREND_COLUMNS).issubset(trend.column_names):
+                logger.warning("Changed zip-code trend aggregate is invalid; keeping last good trend snapshot")
+                continue
+            sources[_AGGREGATE_SNAPSHOTS[name]] = (trend, "SELECT * FROM _snapshot_source")
+        elif name in _aggregate_versions:
+            aggregate = download_aggregate_table(name)
+            if aggregate is not None:
+                sources[_aggregate_table_name(name)] = (aggregate, "SELECT * FROM _snapshot_source")
+    if sources:
+        _swap_snapshots(sources)
+
+    now = time.time()
+    if ZIP_CODE_TREND_TABLE in sources:
+        _snapshot_sources[ZIP_CODE_TREND_TABLE] = _aggregate_source("zip_code_daily_stats.parquet")
+        _last_successful_trend_refresh = now
+    # Unchanged local copies were touched, so record their new mtimes to keep the tables current.
+    for name in list(_aggregate_versions):
+        if name not in changed or _aggregate_table_name(name) in sources:
+            _aggregate_versions[name] = (now, get_aggregate_cache_mtime(name))
+    if manifest.get("version", 0) != _aggregate_manifest_version:
+        logger.info(
+            "Applied aggregate manifest v%s (changed: %s)", manifest.get("version"), ", ".join(changed) or "none"
+        )
+    _aggregate_manifest_version = manifest.get("version", 0)
+    _aggregate_manifest_polled_at = now
+    return changed
+
+
+@_snapshot_cached("latest_stations")
 def query_cheapest_by_zip(
     zip_code: str, fuel_type: str, limit: int = 5, labels: list[str] | None = None
 ) -> pd.DataFrame:
     fuel_type = _validate_fuel_column(fuel_type)
     label_clause, label_params = _label_filter_clause(labels, 3)
-    with _lock:
-        conn = get_connection()
+    with _reader("query_cheapest_by_zip") as conn:
         return conn.execute(
             f"""
             SELECT label, address, municipality, province, zip_code, latitude, longitude, {fuel_type}
@@ -194,57 +1011,112 @@ def query_cheapest_by_zip(
         ).fetchdf()
 
 
-def query_stations_within_radius(
-    lat: float, lon: float, fuel_type: str, radius_km: float, labels: list[str] | None = None
+def _grid_cell_bounds(lat: float, lon: float, radius_km: float) -> tuple[int, int, int, int]:
+    """Return (min_row, max_row, min_col, max_col) of the grid cells covering *radius_km* around a point."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    # Size the longitude window with the latitude farthest from the equator, where degrees are shortest.
+    widest_lat = min(89.0, abs(lat) + lat_delta)
+    lon_delta = min(180.0, radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest_lat))))
+    return (
+        math.floor((lat - lat_delta) / GRID_CELL_DEGREES),
+        math.floor((lat + lat_delta) / GRID_CELL_DEGREES),
+        math.floor((lon - lon_delta) / GRID_CELL_DEGREES),
+        math.floor((lon + lon_delta) / GRID_CELL_DEGREES),
+    )
+
+
+def _query_stations_near(
+    name: str,
+    lat: float,
+    lon: float,
+    columns: str,
+    predicate: str,
+    labels: list[str] | None,
+    radius_km: float | None,
+    limit: int | None = None,
 ) -> pd.DataFrame:
-    fuel_type = _validate_fuel_column(fuel_type)
-    label_clause, label_params = _label_filter_clause(labels, 4)
-    with _lock:
-        conn = get_connection()
+    """Haversine search over the grid cells within *radius_km* (whole snapshot when None), nearest first."""
+    params: list = [math.radians(lat), math.radians(lon), math.cos(math.radians(lat))]
+    grid_clause = ""
+    radius_clause = ""
+    if radius_km is not None:
+        min_row, max_row, min_col, max_col = _grid_cell_bounds(lat, lon, radius_km)
+        grid_clause = "AND grid_row BETWEEN $4 AND $5 AND grid_col BETWEEN $6 AND $7"
+        radius_clause = "WHERE distance_km <= $8"
+        params += [min_row, max_row, min_col, max_col, radius_km]
+    limit_clause = ""
+    if limit is not None:
+        limit_clause = f"LIMIT ${len(params) + 1}"
+        params.append(limit)
+    label_clause, label_params = _label_filter_clause(labels, len(params) + 1)
+    with _reader(name) as conn:
         return conn.execute(
             f"""
             SELECT * FROM (
-                SELECT label, address, municipality, province, zip_code, latitude, longitude, {fuel_type},
-                    2 * 6371 * ASIN(SQRT(
-                        POWER(SIN(RADIANS(latitude - $1) / 2), 2) +
-                        COS(RADIANS($1)) * COS(RADIANS(latitude)) *
-                        POWER(SIN(RADIANS(longitude - $2) / 2), 2)
+                SELECT {columns},
+                    2 * {EARTH_RADIUS_KM} * ASIN(SQRT(
+                        POWER(SIN((lat_rad - $1) / 2), 2) +
+                        $3 * cos_lat * POWER(SIN((lon_rad - $2) / 2), 2)
                     )) AS distance_km
                 FROM latest_stations
-                WHERE {fuel_type} IS NOT NULL AND {fuel_type} > 0
+                WHERE {predicate}
                     AND latitude IS NOT NULL AND longitude IS NOT NULL
+                    {grid_clause}
                     {label_clause}
-            ) WHERE distance_km <= $3
+            ) {radius_clause}
             ORDER BY distance_km ASC
+            {limit_clause}
             """,
-            [lat, lon, radius_km] + label_params,
+            params + label_params,
         ).fetchdf()
 
 
+def _query_nearest_by_rings(
+    name: str, lat: float, lon: float, columns: str, predicate: str, limit: int, labels: list[str] | None
+) -> pd.DataFrame:
+    """k-NN: search growing rings until `limit` stations are found inside one.
+
+    Every station outside a ring is farther than the ring radius, so a ring that already holds
+    `limit` stations contains the exact nearest ones.
+    """
+    for radius_km in _KNN_RING_RADII_KM:
+        df = _query_stations_near(name, lat, lon, columns, predicate, labels, radius_km, limit)
+        if len(df) >= limit:
+            return df
+    return _query_stations_near(name, lat, lon, columns, predicate, labels, None, limit)
+
+
+_STATION_COLUMNS = "label, address, municipality, province, zip_code, latitude, longitude"
+
+
+def query_stations_within_radius(
+    lat: float, lon: float, fuel_type: str, radius_km: float, labels: list[str] | None = None
+) -> pd.DataFrame:
+    fuel_type = _validate_fuel_column(fuel_type)
+    return _query_stations_near(
+        "query_stations_within_radius",
+        lat,
+        lon,
+        f"{_STATION_COLUMNS}, {fuel_type}",
+        _primary_availability_predicate(fuel_type),
+        labels,
+        radius_km,
+    )
+
+
 def query_nearest_stations(
     lat: float, lon: float, fuel_type: str, limit: int = 5, labels: list[str] | None = None
 ) -> pd.DataFrame:
     fuel_type = _validate_fuel_column(fuel_type)
-    label_clause, label_params = _label_filter_clause(labels, 4)
-    with _lock:
-        conn = get_connection()
-        return conn.execute(
-            f"""
-            SELECT label, address, municipality, province, zip_code, latitude, longitude, {fuel_type},
-                2 * 6371 * ASIN(SQRT(
-                    POWER(SIN(RADIANS(latitude - $1) / 2), 2) +
-                    COS(RADIANS($1)) * COS(RADIANS(latitude)) *
-                    POWER(SIN(RADIANS(longitude - $2) / 2), 2)
-                )) AS distance_km
-            FROM latest_stations
-            WHERE {fuel_type} IS NOT NULL AND {fuel_type} > 0
-                AND latitude IS NOT NULL AND longitude IS NOT NULL
-                {label_clause}
-            ORDER BY distance_km ASC
-            LIMIT $3
-            """,
-            [lat, lon, limit] + label_params,
-        ).fetchdf()
+    return _query_nearest_by_rings(
+        "query_nearest_stations",
+        lat,
+        lon,
+        f"{_STATION_COLUMNS}, {fuel_type}",
+        _primary_availability_predicate(fuel_type),
+        limit,
+        labels,
+    )
 
 
 def _validate_fuel_columns(fuel_types: list[str]) -> list[str]:
@@ -259,6 +1131,7 @@ def _primary_availability_predicate(primary_fuel: str) -> str:
     return f"{primary_fuel} IS NOT NULL AND {primary_fuel} > 0"
 
 
+@_snapshot_cached("latest_stations")
 def query_cheapest_by_zip_group(
     zip_code: str, primary_fuel: str, all_fuels: list[str], limit: int = 5, labels: list[str] | None = None
 ) -> pd.DataFrame:
@@ -267,8 +1140,7 @@ def query_cheapest_by_zip_group(
     fuel_cols = ", ".join(fuel_types)
     predicate = _primary_availability_predicate(primary_fuel)
     label_clause, label_params = _label_filter_clause(labels, 3)
-    with _lock:
-        conn = get_connection()
+    with _reader("query_cheapest_by_zip_group") as conn:
         return conn.execute(
             f"""
             SELECT label, address, municipality, province, zip_code, latitude, longitude, {fuel_cols}
@@ -287,28 +1159,15 @@ def query_nearest_stations_group(
 ) -> pd.DataFrame:
     primary_fuel = _validate_fuel_column(primary_fuel)
     fuel_types = _validate_fuel_columns(all_fuels)
-    fuel_cols = ", ".join(fuel_types)
-    predicate = _primary_availability_predicate(primary_fuel)
-    label_clause, label_params = _label_filter_clause(labels, 4)
-    with _lock:
-        conn = get_connection()
-        return conn.execute(
-            f"""
-            SELECT label, address, municipality, province, zip_code, latitude, longitude, {fuel_cols},
-                2 * 6371 * ASIN(SQRT(
-                    POWER(SIN(RADIANS(latitude - $1) / 2), 2) +
-                    COS(RADIANS($1)) * COS(RADIANS(latitude)) *
-                    POWER(SIN(RADIANS(longitude - $2) / 2), 2)
-                )) AS distance_km
-            FROM latest_stations
-            WHERE {predicate}
-                AND latitude IS NOT NULL AND longitude IS NOT NULL
-                {label_clause}
-            ORDER BY distance_km ASC
-            LIMIT $3
-            """,
-            [lat, lon, limit] + label_params,
-        ).fetchdf()
+    return _query_nearest_by_rings(
+        "query_nearest_stations_group",
+        lat,
+        lon,
+        f"{_STATION_COLUMNS}, {', '.join(fuel_types)}",
+        _primary_availability_predicate(primary_fuel),
+        limit,
+        labels,
+    )
 
 
 def query_stations_within_radius_group(
@@ -321,108 +1180,80 @@ def query_stations_within_radius_group(
 ) -> pd.DataFrame:
     primary_fuel = _validate_fuel_column(primary_fuel)
     fuel_types = _validate_fuel_columns(all_fuels)
-    fuel_cols = ", ".join(fuel_types)
-    predicate = _primary_availability_predicate(primary_fuel)
-    label_clause, label_params = _label_filter_clause(labels, 4)
-    with _lock:
-        conn = get_connection()
-        return conn.execute(
-            f"""
-            SELECT * FROM (
-                SELECT label, address, municipality, province, zip_code, latitude, longitude, {fuel_cols},
-                    2 * 6371 * ASIN(SQRT(
-                        POWER(SIN(RADIANS(latitude - $1) / 2), 2) +
-                        COS(RADIANS($1)) * COS(RADIANS(latitude)) *
-                        POWER(SIN(RADIANS(longitude - $2) / 2), 2)
-                    )) AS distance_km
-                FROM latest_stations
-                WHERE {predicate}
-                    AND latitude IS NOT NULL AND longitude IS NOT NULL
-                    {label_clause}
-            ) WHERE distance_km <= $3
-            ORDER BY distance_km ASC
-            """,
-            [lat, lon, radius_km] + label_params,
-        ).fetchdf()
+    return _query_stations_near(
+        "query_stations_within_radius_group",
+        lat,
+        lon,
+        f"{_STATION_COLUMNS}, {', '.join(fuel_types)}",
+        _primary_availability_predicate(primary_fuel),
+        labels,
+        radius_km,
+    )
 
 
+@_snapshot_cached("latest_stations")
 def query_cheapest_zones(province: str, fuel_type: str) -> pd.DataFrame:
     fuel_type = _validate_fuel_column(fuel_type)
-    with _lock:
-        conn = get_connection()
+    with _reader("query_cheapest_zones") as conn:
         return conn.execute(
-            f"""
-            SELECT zip_code,
-                AVG({fuel_type}) AS avg_price,
-                MIN({fuel_type}) AS min_price,
-                COUNT(*) AS station_count
-            FROM latest_stations
-            WHERE province = $1 AND {fuel_type} IS NOT NULL AND {fuel_type} > 0
-            GROUP BY zip_code
+            """
+            SELECT zip_code, avg_price, min_price, station_count
+            FROM latest_zip_prices
+            WHERE province = $1 AND fuel_type = $2
             ORDER BY avg_price ASC
             """,
-            [province],
+            [province, fuel_type],
         ).fetchdf()
 
 
 def query_price_trends(blob_names: list[str], zip_code: str, fuel_type: str) -> pd.DataFrame:
+    """Daily price stats of one zip code and fuel, aggregated straight from the raw daily parquet files.
+
+    DuckDB scans the locally cached files, so only ``timestamp``, ``zip_code`` and *fuel_type* are
+    read and the zip filter is pushed down to the row groups.
+    """
     fuel_type = _validate_fuel_column(fuel_type)
     if not blob_names:
         return pd.DataFrame()
-    df = download_parquets_as_df(blob_names)  # noqa: F841
-    with _lock:
-        conn = get_connection()
-        conn.execute("DROP TABLE IF EXISTS _trend_data")
-        conn.execute("CREATE TEMP TABLE _trend_data AS SELECT * FROM df")
-        try:
-            result = conn.execute(
-                f"""
-                SELECT
-                    CAST(timestamp AS DATE) AS date,
-                    AVG({fuel_type}) AS avg_price,
-                    MIN({fuel_type}) AS min_price,
-                    MAX({fuel_type}) AS max_price
-                FROM _trend_data
-                WHERE zip_code = $1 AND {fuel_type} IS NOT NULL AND {fuel_type} > 0
-                GROUP BY CAST(timestamp AS DATE)
-                ORDER BY date ASC
-                """,
-                [zip_code],
-            ).fetchdf()
-        finally:
-            conn.execute("DROP TABLE IF EXISTS _trend_data")
-    return result
+    with cached_parquet_paths(blob_names) as paths, _reader("query_price_trends") as conn:
+        return conn.execute(
+            f"""
+            SELECT
+                CAST(timestamp AS DATE) AS date,
+                AVG({fuel_type}) AS avg_price,
+                MIN({fuel_type}) AS min_price,
+                MAX({fuel_type}) AS max_price
+            FROM read_parquet($2, union_by_name = true)
+            WHERE zip_code = $1 AND {fuel_type} IS NOT NULL AND {fuel_type} > 0
+            GROUP BY CAST(timestamp AS DATE)
+            ORDER BY date ASC
+            """,
+            [zip_code, [str(path) for path in paths]],
+        ).fetchdf()
 
 
-def query_zip_code_price_trend(
-    aggregate_df: pd.DataFrame, zip_code: str, fuel_type: str, days_back: int
-) -> pd.DataFrame:
+@_snapshot_cached(ZIP_CODE_TREND_TABLE)
+def query_zip_code_price_trend(zip_code: str, fuel_type: str, days_back: int) -> pd.DataFrame:
     """Query daily price trend for a zip code from the pre-computed zip aggregate."""
     fuel_type = _validate_fuel_column(fuel_type)
-    if aggregate_df is None or aggregate_df.empty:
+    table = load_aggregate("zip_code_daily_stats.parquet")
+    if table is None:
         return pd.DataFrame(columns=["date", "avg_price", "min_price", "max_price"])
-    df = aggregate_df  # noqa: F841
-    with _lock:
-        conn = get_connection()
-        conn.execute("DROP TABLE IF EXISTS _zip_trend_agg")
-        conn.execute("CREATE TEMP TABLE _zip_trend_agg AS SELECT * FROM df")
-        try:
-            result = conn.execute(
-                """
-                SELECT date, avg_price, min_price, max_price
-                FROM _zip_trend_agg
-                WHERE zip_code = $1
-                    AND fuel_type = $2
-                    AND date >= CURRENT_DATE - INTERVAL ($3) DAY
-                ORDER BY date ASC
-                """,
-                [zip_code, fuel_type, days_back],
-            ).fetchdf()
-        finally:
-            conn.execute("DROP TABLE IF EXISTS _zip_trend_agg")
-    return result
+    with _reader("query_zip_code_price_trend") as conn:
+        return conn.execute(
+            f"""
+            SELECT date, avg_price, min_price, max_price
+            FROM {table}
+            WHERE zip_code = $1
+                AND fuel_type = $2
+                AND date >= CURRENT_DATE - INTERVAL ($3) DAY
+            ORDER BY date ASC
+            """,
+            [zip_code, fuel_type, days_back],
+        ).fetchdf()
 
 
+@_snapshot_cached(ZIP_CODE_TREND_TABLE)
 def query_cached_zip_code_price_trend(zip_code: str, fuel_type: str, days_back: int) -> pd.DataFrame:
     """Query daily price trend for a zip code from the local DuckDB trend cache."""
     fuel_type = _validate_fuel_column(fuel_type)
@@ -430,8 +1261,7 @@ def query_cached_zip_code_price_trend(zip_code: str, fuel_type: str, days_back:
         return pd.DataFrame(columns=["date", "avg_price", "min_price", "max_price"])
 
     started = time.perf_counter()
-    with _lock:
-        conn = get_connection()
+    with _reader("query_cached_zip_code_price_trend") as conn:
         result = conn.execute(
             f"""
             SELECT date, avg_price, min_price, max_price
@@ -455,6 +1285,7 @@ def query_cached_zip_code_price_trend(zip_code: str, fuel_type: str, days_back:
     return result
 
 
+@_snapshot_cached(ZIP_CODE_TREND_TABLE)
 def query_national_price_trend(fuel_type: str, days_back: int, province: str | None = None) -> pd.DataFrame:
     """Query national daily price trend by aggregating all zip codes in the trend cache."""
     fuel_type = _validate_fuel_column(fuel_type)
@@ -462,8 +1293,7 @@ def query_national_price_trend(fuel_type: str, days_back: int, province: str | N
         return pd.DataFrame(columns=["date", "avg_price", "min_price", "max_price"])
     province_clause = "AND province = $3" if province else ""
     params = [fuel_type, days_back] + ([province] if province else [])
-    with _lock:
-        conn = get_connection()
+    with _reader("query_national_price_trend") as conn:
         return conn.execute(
             f"""
             SELECT date,
@@ -481,56 +1311,64 @@ def query_national_price_trend(fuel_type: str, days_back: int, province: str | N
         ).fetchdf()
 
 
+@_snapshot_cached(ZIP_CODE_TREND_TABLE)
 def query_national_group_price_trend(
-    fuel_types: list[str], days_back: int, province: str | None = None
-) -> pd.DataFrame:
+    fuel_types: list[str], days_back: int, province: str | None = None, as_arrow: bool = False
+) -> pd.DataFrame | pa.Table:
     """Query national daily price trend for multiple fuel types from the trend cache."""
     _validate_fuel_columns(fuel_types)
     if not _zip_code_trend_ready.is_set():
-        return pd.DataFrame(columns=["date", "fuel_type", "avg_price", "min_price", "max_price"])
+        return _empty_result(["date", "fuel_type", "avg_price", "min_price", "max_price"], as_arrow)
     province_clause = "AND province = $3" if province else ""
     params = [fuel_types, days_back] + ([province] if province else [])
-    with _lock:
-        conn = get_connection()
-        return conn.execute(
-            f"""
-            SELECT date,
-                fuel_type,
-                AVG(avg_price) AS avg_price,
-                MIN(min_price) AS min_price,
-                MAX(max_price) AS max_price
-            FROM {ZIP_CODE_TREND_TABLE}
-            WHERE fuel_type = ANY($1)
-                AND date >= CURRENT_DATE - INTERVAL ($2) DAY
-                {province_clause}
-            GROUP BY date, fuel_type
-            ORDER BY fuel_type, date ASC
-            """,
-            params,
-        ).fetchdf()
+    with _reader("query_national_group_price_trend") as conn:
+        return _fetch(
+            conn.execute(
+                f"""
+                SELECT date,
+                    fuel_type,
+                    AVG(avg_price) AS avg_price,
+                    MIN(min_price) AS min_price,
+                    MAX(max_price) AS max_price
+                FROM {ZIP_CODE_TREND_TABLE}
+                WHERE fuel_type = ANY($1)
+                    AND date >= CURRENT_DATE - INTERVAL ($2) DAY
+                    {province_clause}
+                GROUP BY date, fuel_type
+                ORDER BY fuel_type, date ASC
+                """,
+                params,
+            ),
+            as_arrow,
+        )
 
 
-def query_cached_group_price_trend(zip_code: str, fuel_types: list[str], days_back: int) -> pd.DataFrame:
+@_snapshot_cached(ZIP_CODE_TREND_TABLE)
+def query_cached_group_price_trend(
+    zip_code: str, fuel_types: list[str], days_back: int, as_arrow: bool = False
+) -> pd.DataFrame | pa.Table:
     """Query daily price trend for multiple fuel types in a zip code from the DuckDB trend cache."""
     for ft in fuel_types:
         _validate_fuel_column(ft)
     if not _zip_code_trend_ready.is_set():
-        return pd.DataFrame(columns=["date", "fuel_type", "avg_price", "min_price", "max_price"])
+        return _empty_result(["date", "fuel_type", "avg_price", "min_price", "max_price"], as_arrow)
 
     started = time.perf_counter()
-    with _lock:
-        conn = get_connection()
-        result = conn.execute(
-            f"""
-            SELECT date, fuel_type, avg_price, min_price, max_price
-            FROM {ZIP_CODE_TREND_TABLE}
-            WHERE zip_code = $1
-                AND fuel_type = ANY($2)
-                AND date >= CURRENT_DATE - INTERVAL ($3) DAY
-            ORDER BY fuel_type, date ASC
-            """,
-            [zip_code, fuel_types, days_back],
-        ).fetchdf()
+    with _reader("query_cached_group_price_trend") as conn:
+        result = _fetch(
+            conn.execute(
+                f"""
+                SELECT date, fuel_type, avg_price, min_price, max_price
+                FROM {ZIP_CODE_TREND_TABLE}
+                WHERE zip_code = $1
+                    AND fuel_type = ANY($2)
+                    AND date >= CURRENT_DATE - INTERVAL ($3) DAY
+                ORDER BY fuel_type, date ASC
+                """,
+                [zip_code, fuel_types, days_back],
+            ),
+            as_arrow,
+        )
     duration_ms = (time.perf_counter() - started) * 1000
     logger.info(
         "Served group trend query from DuckDB cache (%s/%s, %s days, %s rows, %.1f ms)",
@@ -543,84 +1381,116 @@ def query_cached_group_price_trend(zip_code: str, fuel_types: list[str], days_ba
     return result
 
 
+@_snapshot_cached("latest_stations")
 def query_avg_price_by_province(fuel_type: str) -> pd.DataFrame:
     fuel_type = _validate_fuel_column(fuel_type)
-    with _lock:
-        conn = get_connection()
+    with _reader("query_avg_price_by_province") as conn:
         return conn.execute(
-            f"""
-            SELECT province,
-                AVG({fuel_type}) AS avg_price,
-                COUNT(*) AS station_count
-            FROM latest_stations
-            WHERE {fuel_type} IS NOT NULL AND {fuel_type} > 0
-            GROUP BY province
+            """
+            SELECT province, avg_price, station_count
+            FROM latest_province_prices
+            WHERE fuel_type = $1
             ORDER BY avg_price ASC
             """,
+            [fuel_type],
         ).fetchdf()
 
 
-def query_stations_by_province(province: str, fuel_type: str) -> pd.DataFrame:
+@_snapshot_cached("latest_stations")
+def query_avg_price_by_district(province: str, fuel_type: str) -> pd.DataFrame:
     fuel_type = _validate_fuel_column(fuel_type)
-    with _lock:
-        conn = get_connection()
+    with _reader("query_avg_price_by_district") as conn:
         return conn.execute(
             f"""
-            SELECT latitude, longitude, {fuel_type} AS price
+            SELECT district,
+                AVG({fuel_type}) AS avg_price,
+                COUNT(*) AS station_count
             FROM latest_stations
-            WHERE province = $1
-                AND {fuel_type} IS NOT NULL AND {fuel_type} > 0
-                AND latitude IS NOT NULL AND longitude IS NOT NULL
+            WHERE province = $1 AND district IS NOT NULL AND {fuel_type} > 0
+            GROUP BY district
+            ORDER BY avg_price ASC
             """,
             [province],
         ).fetchdf()
 
 
-def query_cheapest_zones_by_municipality(province: str, municipality: str, fuel_type: str) -> pd.DataFrame:
+@_snapshot_cached("latest_stations")
+def query_avg_price_by_barrio(province: str, fuel_type: str, district: str | None = None) -> pd.DataFrame:
+    """Per-barrio prices of Madrid, optionally only the barrios of one *district*."""
     fuel_type = _validate_fuel_column(fuel_type)
-    with _lock:
-        conn = get_connection()
+    district_clause = "AND district = $2" if district else ""
+    with _reader("query_avg_price_by_barrio") as conn:
         return conn.execute(
             f"""
-            SELECT zip_code,
+            SELECT barrio, district,
                 AVG({fuel_type}) AS avg_price,
-                MIN({fuel_type}) AS min_price,
                 COUNT(*) AS station_count
             FROM latest_stations
-            WHERE province = $1 AND municipality = $2
-                AND {fuel_type} IS NOT NULL AND {fuel_type} > 0
-            GROUP BY zip_code
+            WHERE province = $1 AND barrio IS NOT NULL AND {fuel_type} > 0 {district_clause}
+            GROUP BY barrio, district
+            ORDER BY avg_price ASC
+            """,
+            [province, district] if district else [province],
+        ).fetchdf()
+
+
+@_snapshot_cached("latest_stations")
+def query_cheapest_zones_by_municipality(province: str, municipality: str, fuel_type: str) -> pd.DataFrame:
+    fuel_type = _validate_fuel_column(fuel_type)
+    with _reader("query_cheapest_zones_by_municipality") as conn:
+        return conn.execute(
+            """
+            SELECT zip_code, avg_price, min_price, station_count
+            FROM latest_municipality_zip_prices
+            WHERE province = $1 AND municipality = $2 AND fuel_type = $3
             ORDER BY avg_price ASC
             """,
-            [province, municipality],
+            [province, municipality, fuel_type],
         ).fetchdf()
 
 
+@_snapshot_cached("latest_stations")
 def query_municipalities_by_province(province: str) -> list[str]:
-    with _lock:
-        conn = get_connection()
+    with _reader("query_municipalities_by_province") as conn:
         result = conn.execute(
-            "SELECT DISTINCT municipality FROM latest_stations WHERE province = $1 ORDER BY municipality",
+            "SELECT municipality FROM latest_provinces WHERE province = $1 ORDER BY municipality",
             [province],
         ).fetchdf()
     return result["municipality"].tolist()
 
 
-def query_zip_codes_by_district(province: str, fuel_type: str) -> pd.DataFrame:
-    """Query stations in a province with their zip codes (for district-to-zip mapping)."""
+@_snapshot_cached("latest_stations")
+def query_zip_codes_by_district(province: str, fuel_type: str, district: str) -> list[str]:
+    """Zip codes of the stations with a *fuel_type* price that lie in a Madrid district."""
     fuel_type = _validate_fuel_column(fuel_type)
-    with _lock:
-        conn = get_connection()
-        return conn.execute(
+    with _reader("query_zip_codes_by_district") as conn:
+        result = conn.execute(
             f"""
-            SELECT latitude, longitude, zip_code, {fuel_type} AS price
+            SELECT DISTINCT zip_code
             FROM latest_stations
-            WHERE province = $1
-                AND {fuel_type} IS NOT NULL AND {fuel_type} > 0
-                AND latitude IS NOT NULL AND longitude IS NOT NULL
+            WHERE province = $1 AND district = $2 AND {fuel_type} > 0
+            ORDER BY zip_code
             """,
-            [province],
+            [province, district],
+        ).fetchdf()
+    return result["zip_code"].astype(str).tolist()
+
+
+@_snapshot_cached("latest_stations")
+def query_zip_codes_by_barrio(province: str, fuel_type: str, barrio: str) -> list[str]:
+    """Zip codes of the stations with a *fuel_type* price that lie in a Madrid barrio."""
+    fuel_type = _validate_fuel_column(fuel_type)
+    with _reader("query_zip_codes_by_barrio") as conn:
+        result = conn.execute(
+            f"""
+            SELECT DISTINCT zip_code
+            FROM latest_stations
+            WHERE province = $1 AND barrio = $2 AND {fuel_type} > 0
+            ORDER BY zip_code
+            """,
+            [province, barrio],
         ).fetchdf()
+    return result["zip_code"].astype(str).tolist()
 
 
 def query_stations_along_corridor(
@@ -652,8 +1522,7 @@ def query_stations_along_corridor(
 
     wp_df = pd.DataFrame({"wp_idx": range(len(waypoints)), "wp_lat": lats, "wp_lon": lons})  # noqa: F841
 
-    with _lock:
-        conn = get_connection()
+    with _reader("query_stations_along_corridor") as conn:
         df = conn.execute(
             f"""
             WITH corridor_stations AS (
@@ -693,15 +1562,11 @@ def query_stations_along_corridor(
     return df
 
 
-@functools.lru_cache(maxsize=16)
+@_snapshot_cached("latest_stations")
 def query_national_avg_stats(fuel_type: str) -> tuple[float | None, int]:
-    """Return (avg_price, station_count) for a fuel type nationally.
-
-    Cached per fuel type; cache is cleared on ``replace_latest_stations()``.
-    """
+    """Return (avg_price, station_count) for a fuel type nationally; cached per latest_stations generation."""
     fuel_type = _validate_fuel_column(fuel_type)
-    with _lock:
-        conn = get_connection()
+    with _reader("query_national_avg_stats") as conn:
         result = conn.execute(
             f"""
             SELECT AVG({fuel_type}) AS avg_price, COUNT(*) AS cnt
@@ -720,71 +1585,63 @@ def query_national_avg_price(fuel_type: str) -> float | None:
     return avg
 
 
+@_snapshot_cached("latest_stations")
 def get_distinct_provinces() -> dict[str, str]:
-    with _lock:
-        conn = get_connection()
-        result = conn.execute("SELECT DISTINCT province FROM latest_stations ORDER BY province").fetchdf()
+    with _reader("get_distinct_provinces") as conn:
+        result = conn.execute("SELECT DISTINCT province FROM latest_provinces ORDER BY province").fetchdf()
     provinces = result["province"].tolist()
     return {p: p.title() for p in provinces}
 
 
+@_snapshot_cached("latest_stations")
 def get_distinct_labels(top_n: int = 0) -> dict[str, str]:
     """Return {raw: Title Case} label dict ordered by station count; top_n > 0 limits results."""
     limit_clause = f"LIMIT {int(top_n)}" if top_n > 0 else ""
-    with _lock:
-        conn = get_connection()
+    with _reader("get_distinct_labels") as conn:
         result = conn.execute(
-            f"""
-            SELECT label, COUNT(*) AS cnt
-            FROM latest_stations
-            WHERE label IS NOT NULL AND label != ''
-            GROUP BY label
-            ORDER BY cnt DESC, label ASC
-            {limit_clause}
-            """
+            f"SELECT label FROM latest_labels ORDER BY station_count DESC, label ASC {limit_clause}"
         ).fetchdf()
     labels = result["label"].tolist()
     return {label: label.title() for label in labels}
 
 
-def query_province_ranking(aggregate_df: pd.DataFrame, fuel_type: str, days_back: int) -> pd.DataFrame:
+def query_province_ranking(fuel_type: str, days_back: int, as_arrow: bool = False) -> pd.DataFrame | pa.Table:
     """Query province ranking from pre-computed province_daily_stats aggregate."""
     fuel_type = _validate_fuel_column(fuel_type)
-    df = aggregate_df  # noqa: F841
-    with _lock:
-        conn = get_connection()
-        conn.execute("DROP TABLE IF EXISTS _province_agg")
-        conn.execute("CREATE TEMP TABLE _province_agg AS SELECT * FROM df")
-        try:
-            result = conn.execute(
-                """
+    table = load_aggregate("province_daily_stats.parquet")
+    if table is None:
+        return _empty_result(["province", "avg_price", "min_price", "max_price", "total_observations"], as_arrow)
+    with _reader("query_province_ranking") as conn:
+        return _fetch(
+            conn.execute(
+                f"""
                 SELECT province,
                     AVG(avg_price) AS avg_price,
                     MIN(min_price) AS min_price,
                     MAX(max_price) AS max_price,
                     CAST(SUM(station_count) AS INTEGER) AS total_observations
-                FROM _province_agg
+                FROM {table}
                 WHERE fuel_type = $1
                     AND date >= CURRENT_DATE - INTERVAL ($2) DAY
                 GROUP BY province
                 ORDER BY avg_price ASC
                 """,
                 [fuel_type, days_back],
-            ).fetchdf()
-        finally:
-            conn.execute("DROP TABLE IF EXISTS _province_agg")
-    return result
+            ),
+            as_arrow,
+        )
 
 
 def query_day_of_week_pattern(
-    aggregate_df: pd.DataFrame,
     fuel_type: str,
     province: str | None = None,
     exclude_provinces: set | None = None,
 ) -> pd.DataFrame:
     """Query day-of-week price patterns from pre-computed day_of_week_stats aggregate."""
     fuel_type = _validate_fuel_column(fuel_type)
-    df = aggregate_df  # noqa: F841
+    table = load_aggregate("day_of_week_stats.parquet")
+    if table is None:
+        return pd.DataFrame(columns=["day_of_week", "avg_price", "count_days", "min_daily_avg", "max_daily_avg"])
 
     # When a specific province is selected, use it directly
     if province:
@@ -797,124 +1654,97 @@ def query_day_of_week_pattern(
         province_filter = "__national__"
         use_aggregate = True
 
-    with _lock:
-        conn = get_connection()
-        conn.execute("DROP TABLE IF EXISTS _dow_agg")
-        conn.execute("CREATE TEMP TABLE _dow_agg AS SELECT * FROM df")
-        try:
-            if use_aggregate:
-                result = conn.execute(
-                    """
-                    SELECT day_of_week,
-                        sum_price / count_days AS avg_price,
-                        count_days,
-                        min_daily_avg,
-                        max_daily_avg
-                    FROM _dow_agg
-                    WHERE fuel_type = $1 AND province = $2
-                    ORDER BY day_of_week ASC
-                    """,
-                    [fuel_type, province_filter],
-                ).fetchdf()
-            else:
-                exclude_list = list(exclude_provinces | {"__national__"})
-                result = conn.execute(
-                    """
-                    SELECT day_of_week,
-                        SUM(sum_price) / SUM(count_days) AS avg_price,
-                        MAX(count_days) AS count_days,
-                        MIN(min_daily_avg) AS min_daily_avg,
-                        MAX(max_daily_avg) AS max_daily_avg
-                    FROM _dow_agg
-                    WHERE fuel_type = $1 AND province NOT IN (SELECT UNNEST($2::VARCHAR[]))
-                    GROUP BY day_of_week
-                    ORDER BY day_of_week ASC
-                    """,
-                    [fuel_type, exclude_list],
-                ).fetchdf()
-        finally:
-            conn.execute("DROP TABLE IF EXISTS _dow_agg")
-    return result
+    with _reader("query_day_of_week_pattern") as conn:
+        if use_aggregate:
+            return conn.execute(
+                f"""
+                SELECT day_of_week,
+                    sum_price / count_days AS avg_price,
+                    count_days,
+                    min_daily_avg,
+                    max_daily_avg
+                FROM {table}
+                WHERE fuel_type = $1 AND province = $2
+                ORDER BY day_of_week ASC
+                """,
+                [fuel_type, province_filter],
+            ).fetchdf()
+        exclude_list = list(exclude_provinces | {"__national__"})
+        return conn.execute(
+            f"""
+            SELECT day_of_week,
+                SUM(sum_price) / SUM(count_days) AS avg_price,
+                MAX(count_days) AS count_days,
+                MIN(min_daily_avg) AS min_daily_avg,
+                MAX(max_daily_avg) AS max_daily_avg
+            FROM {table}
+            WHERE fuel_type = $1 AND province NOT IN (SELECT UNNEST($2::VARCHAR[]))
+            GROUP BY day_of_week
+            ORDER BY day_of_week ASC
+            """,
+            [fuel_type, exclude_list],
+        ).fetchdf()
 
 
-def query_brand_ranking(aggregate_df: pd.DataFrame, fuel_type: str, days_back: int, top_n: int = 15) -> pd.DataFrame:
+def query_brand_ranking(fuel_type: str, days_back: int, top_n: int = 15) -> pd.DataFrame:
     """Query brand ranking from pre-computed brand_daily_stats aggregate."""
     fuel_type = _validate_fuel_column(fuel_type)
-    df = aggregate_df  # noqa: F841
-    with _lock:
-        conn = get_connection()
-        conn.execute("DROP TABLE IF EXISTS _brand_agg")
-        conn.execute("CREATE TEMP TABLE _brand_agg AS SELECT * FROM df")
-        try:
-            result = conn.execute(
-                """
-                SELECT brand,
-                    SUM(avg_price * station_count) / NULLIF(SUM(station_count), 0) AS avg_price,
-                    MIN(min_price) AS min_price,
-                    MAX(max_price) AS max_price,
-                    CAST(SUM(station_count) AS INTEGER) AS total_observations
-                FROM _brand_agg
-                WHERE fuel_type = $1
-                    AND date >= CURRENT_DATE - INTERVAL ($2) DAY
-                GROUP BY brand
-                ORDER BY avg_price ASC
-                LIMIT $3
-                """,
-                [fuel_type, days_back, top_n],
-            ).fetchdf()
-        finally:
-            conn.execute("DROP TABLE IF EXISTS _brand_agg")
-    return result
+    table = load_aggregate("brand_daily_stats.parquet")
+    if table is None:
+        return pd.DataFrame(columns=["brand", "avg_price", "min_price", "max_price", "total_observations"])
+    with _reader("query_brand_ranking") as conn:
+        return conn.execute(
+            f"""
+            SELECT brand,
+                SUM(avg_price * station_count) / NULLIF(SUM(station_count), 0) AS avg_price,
+                MIN(min_price) AS min_price,
+                MAX(max_price) AS max_price,
+                CAST(SUM(station_count) AS INTEGER) AS total_observations
+            FROM {table}
+            WHERE fuel_type = $1
+                AND date >= CURRENT_DATE - INTERVAL ($2) DAY
+            GROUP BY brand
+            ORDER BY avg_price ASC
+            LIMIT $3
+            """,
+            [fuel_type, days_back, top_n],
+        ).fetchdf()
 
 
-def query_brand_price_trend(aggregate_df: pd.DataFrame, fuel_type: str, days_back: int, brands: list) -> pd.DataFrame:
+def query_brand_price_trend(fuel_type: str, days_back: int, brands: list) -> pd.DataFrame:
     """Query daily price trend for specific brands from brand_daily_stats aggregate."""
     fuel_type = _validate_fuel_column(fuel_type)
     if not brands:
         return pd.DataFrame(columns=["date", "brand", "avg_price"])
-    df = aggregate_df  # noqa: F841
-    with _lock:
-        conn = get_connection()
-        conn.execute("DROP TABLE IF EXISTS _brand_trend_agg")
-        conn.execute("CREATE TEMP TABLE _brand_trend_agg AS SELECT * FROM df")
-        try:
-            result = conn.execute(
-                """
-                SELECT date, brand, avg_price
-                FROM _brand_trend_agg
-                WHERE fuel_type = $1
-                    AND date >= CURRENT_DATE - INTERVAL ($2) DAY
-                    AND brand IN (SELECT UNNEST($3::VARCHAR[]))
-                ORDER BY date ASC, brand ASC
-                """,
-                [fuel_type, days_back, brands],
-            ).fetchdf()
-        finally:
-            conn.execute("DROP TABLE IF EXISTS _brand_trend_agg")
-    return result
+    table = load_aggregate("brand_daily_stats.parquet")
+    if table is None:
+        return pd.DataFrame(columns=["date", "brand", "avg_price"])
+    with _reader("query_brand_price_trend") as conn:
+        return conn.execute(
+            f"""
+            SELECT date, brand, avg_price
+            FROM {table}
+            WHERE fuel_type = $1
+                AND date >= CURRENT_DATE - INTERVAL ($2) DAY
+                AND brand IN (SELECT UNNEST($3::VARCHAR[]))
+            ORDER BY date ASC, brand ASC
+            """,
+            [fuel_type, days_back, brands],
+        ).fetchdf()
 
 
 def query_volatility_by_zone(
-    aggregate_df: pd.DataFrame,
     fuel_type: str,
     days_back: int,
     mainland_only: bool = True,
-) -> pd.DataFrame:
+    as_arrow: bool = False,
+) -> pd.DataFrame | pa.Table:
     """Query ZIP-code price volatility from the pre-computed zip_code_daily_stats aggregate."""
     fuel_type = _validate_fuel_column(fuel_type)
-    expected_columns = {
-        "date",
-        "zip_code",
-        "province",
-        "fuel_type",
-        "avg_price",
-        "min_price",
-        "max_price",
-        "station_count",
-    }
-    if aggregate_df is None or aggregate_df.empty or not expected_columns.issubset(aggregate_df.columns):
-        return pd.DataFrame(
-            columns=[
+    table = load_aggregate("zip_code_daily_stats.parquet")
+    if table is None:
+        return _empty_result(
+            [
                 "zip_code",
                 "province",
                 "avg_price",
@@ -926,69 +1756,45 @@ def query_volatility_by_zone(
                 "price_range",
                 "observation_days",
                 "avg_station_count",
-            ]
+            ],
+            as_arrow,
         )
 
     min_observation_days = max(2, math.ceil(days_back * 0.7))
-    df = aggregate_df  # noqa: F841
-    with _lock:
-        conn = get_connection()
-        conn.execute("DROP TABLE IF EXISTS _zip_volatility_agg")
-        conn.execute("CREATE TEMP TABLE _zip_volatility_agg AS SELECT * FROM df")
-        try:
-            if mainland_only:
-                from data.geojson_loader import _NON_MAINLAND_DATA_NAMES
-
-                result = conn.execute(
-                    """
-                    SELECT
-                        zip_code,
-                        province,
-                        AVG(avg_price) AS avg_price,
-                        STDDEV_SAMP(avg_price) AS std_dev_price,
-                        STDDEV_SAMP(avg_price) / NULLIF(AVG(avg_price), 0) AS coefficient_of_variation,
-                        100 * STDDEV_SAMP(avg_price) / NULLIF(AVG(avg_price), 0) AS volatility_pct,
-                        MIN(avg_price) AS min_price,
-                        MAX(avg_price) AS max_price,
-                        MAX(avg_price) - MIN(avg_price) AS price_range,
-                        CAST(COUNT(*) AS INTEGER) AS observation_days,
-                        AVG(station_count) AS avg_station_count
-                    FROM _zip_volatility_agg
-                    WHERE fuel_type = $1
-                        AND date >= CURRENT_DATE - INTERVAL ($2) DAY
-                        AND province NOT IN (SELECT UNNEST($3::VARCHAR[]))
-                    GROUP BY zip_code, province
-                    HAVING COUNT(*) >= $4
-                        AND AVG(station_count) >= 3
-                    ORDER BY coefficient_of_variation ASC, std_dev_price ASC, avg_price ASC
-                    """,
-                    [fuel_type, days_back, list(_NON_MAINLAND_DATA_NAMES), min_observation_days],
-                ).fetchdf()
-            else:
-                result = conn.execute(
-                    """
-                    SELECT
-                        zip_code,
-                        province,
-                        AVG(avg_price) AS avg_price,
-                        STDDEV_SAMP(avg_price) AS std_dev_price,
-                        STDDEV_SAMP(avg_price) / NULLIF(AVG(avg_price), 0) AS coefficient_of_variation,
-                        100 * STDDEV_SAMP(avg_price) / NULLIF(AVG(avg_price), 0) AS volatility_pct,
-                        MIN(avg_price) AS min_price,
-                        MAX(avg_price) AS max_price,
-                        MAX(avg_price) - MIN(avg_price) AS price_range,
-                        CAST(COUNT(*) AS INTEGER) AS observation_days,
-                        AVG(station_count) AS avg_station_count
-                    FROM _zip_volatility_agg
-                    WHERE fuel_type = $1
-                        AND date >= CURRENT_DATE - INTERVAL ($2) DAY
-                    GROUP BY zip_code, province
-                    HAVING COUNT(*) >= $3
-                        AND AVG(station_count) >= 3
-                    ORDER BY coefficient_of_variation ASC, std_dev_price ASC, avg_price ASC
-                    """,
-                    [fuel_type, days_back, min_observation_days],
-                ).fetchdf()
-        finally:
-            conn.execute("DROP TABLE IF EXISTS _zip_volatility_agg")
-    return result
+    province_clause = ""
+    params = [fuel_type, days_back, min_observation_days]
+    if mainland_only:
+        from data.geojson_loader import _NON_MAINLAND_DATA_NAMES
+
+        province_clause = "AND province NOT IN (SELECT UNNEST($4::VARCHAR[]))"
+        params.append(list(_NON_MAINLAND_DATA_NAMES))
+
+    with _reader("query_volatility_by_zone") as conn:
+        return _fetch(
+            conn.execute(
+                f"""
+                SELECT
+                    zip_code,
+                    province,
+                    AVG(avg_price) AS avg_price,
+                    STDDEV_SAMP(avg_price) AS std_dev_price,
+                    STDDEV_SAMP(avg_price) / NULLIF(AVG(avg_price), 0) AS coefficient_of_variation,
+                    100 * STDDEV_SAMP(avg_price) / NULLIF(AVG(avg_price), 0) AS volatility_pct,
+                    MIN(avg_price) AS min_price,
+                    MAX(avg_price) AS max_price,
+                    MAX(avg_price) - MIN(avg_price) AS price_range,
+                    CAST(COUNT(*) AS INTEGER) AS observation_days,
+                    AVG(station_count) AS avg_station_count
+                FROM {table}
+                WHERE fuel_type = $1
+                    AND date >= CURRENT_DATE - INTERVAL ($2) DAY
+                    {province_clause}
+                GROUP BY zip_code, province
+                HAVING COUNT(*) >= $3
+                    AND AVG(station_count) >= 3
+                ORDER BY coefficient_of_variation ASC, std_dev_price ASC, avg_price ASC
+                """,
+                params,
+            ),
+            as_arrow,
+        )
@@ -1,16 +1,24 @@
-import io
+import json
 import logging
+import os
 import re
+import threading
 import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
 from pathlib import Path
+from typing import Iterator
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from config import settings
 from google.cloud import storage
+from metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +26,15 @@ PARQUET_PATTERN = re.compile(r"spain_fuel_prices_(\d{4}-\d{2}-\d{2})T")
 
 _client: storage.Client | None = None
 _bucket = None
+_parquet_disk_cache_stats = REGISTRY.cache("parquet_disk")
+_aggregate_disk_cache_stats = REGISTRY.cache("aggregate_disk")
+_aggregate_memory_cache_stats = REGISTRY.cache("aggregate_memory")
+_DOWNLOADED_BYTES = REGISTRY.counter("gcs_downloaded_bytes_total", "Bytes downloaded from GCS.", ("kind",))
+_REVALIDATED_BYTES = REGISTRY.counter(
+    "gcs_revalidated_bytes_saved_total",
+    "Bytes not downloaded because an expired cache file still matched the blob's generation/md5.",
+    ("kind",),
+)
 
 
 def _get_bucket():
@@ -44,6 +61,232 @@ def _get_cache_dir() -> Path:
     return cache_dir
 
 
+class _DiskCacheBudget:
+    """Keeps ``parquet_cache_dir`` under ``parquet_cache_max_mb`` by evicting least recently used files.
+
+    Access times are tracked in memory (seeded from the files' atime on the first scan) rather
+    than written to disk, because file mtimes drive the freshness checks for today's raw file and
+    the aggregates. Those two kinds of file are pinned and never evicted, and so are the files of a
+    batch held by ``lease()`` while DuckDB scans them. All methods are safe to call from the
+    download thread pool.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._dir: Path | None = None
+        self._entries: dict[str, tuple[int, float]] = {}  # file name -> (size, last access)
+        self._leases: dict[str, int] = {}  # file name -> batches currently holding it
+        self._bytes = 0
+        self._evictions = 0
+        self._evicted_bytes = 0
+
+    def _ensure_index(self, cache_dir: Path) -> None:
+        if self._dir == cache_dir:
+            return
+        self._dir = cache_dir
+        self._entries = {}
+        for path in cache_dir.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            self._entries[path.name] = (stat.st_size, stat.st_atime)
+        self._bytes = sum(size for size, _ in self._entries.values())
+
+    def touch(self, path: Path) -> None:
+        with self._mutex:
+            self._ensure_index(path.parent)
+            entry = self._entries.get(path.name)
+            if entry is not None:
+                self._entries[path.name] = (entry[0], time.time())
+
+    def admit(self, path: Path) -> None:
+        """Account for a file just written to the cache, then evict until the budget holds."""
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return
+        with self._mutex:
+            self._ensure_index(path.parent)
+            previous = self._entries.get(path.name)
+            self._bytes += size - (previous[0] if previous else 0)
+            self._entries[path.name] = (size, time.time())
+            self._evict()
+
+    @contextmanager
+    def lease(self, file_names: list[str]) -> Iterator[None]:
+        """Pin *file_names* until the block exits, then evict whatever the batch pushed over budget."""
+        with self._mutex:
+            for name in file_names:
+                self._leases[name] = self._leases.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            with self._mutex:
+                for name in file_names:
+                    if self._leases[name] == 1:
+                        del self._leases[name]
+                    else:
+                        self._leases[name] -= 1
+                if self._dir is not None:
+                    self._evict()
+
+    def _is_pinned(self, file_name: str) -> bool:
+        return _is_pinned(file_name) or file_name in self._leases
+
+    def _evict(self) -> None:
+        max_bytes = settings.parquet_cache_max_mb * 1024 * 1024
+        if self._bytes <= max_bytes:
+            return
+        candidates = sorted((access, name) for name, (_, access) in self._entries.items() if not self._is_pinned(name))
+        for _, name in candidates:
+            if self._bytes <= max_bytes:
+                break
+            size, _ = self._entries.pop(name)
+            for path in (self._dir / name, _blob_meta_path(self._dir / name)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._bytes -= size
+            self._evictions += 1
+            self._evicted_bytes += size
+            logger.info(f"Evicted {name} from parquet cache ({size} bytes)")
+        if self._bytes > max_bytes:
+            logger.warning(f"Parquet cache holds {self._bytes} bytes of pinned files, over its {max_bytes} byte budget")
+
+    def stats(self) -> dict:
+        with self._mutex:
+            pinned = [size for name, (size, _) in self._entries.items() if self._is_pinned(name)]
+            return {
+                "bytes": self._bytes,
+                "entries": len(self._entries),
+                "pinned_bytes": sum(pinned),
+                "pinned_entries": len(pinned),
+                "evictions": self._evictions,
+                "evicted_bytes": self._evicted_bytes,
+                "max_bytes": settings.parquet_cache_max_mb * 1024 * 1024,
+            }
+
+
+def _is_pinned(file_name: str) -> bool:
+    return file_name.startswith("aggregates_") or _is_today_file(file_name)
+
+
+_disk_cache_budget = _DiskCacheBudget()
+
+
+def get_parquet_cache_stats() -> dict:
+    """Return size, entry count, pinned share and evictions of the local parquet cache."""
+    return _disk_cache_budget.stats()
+
+
+def _parquet_cache_metrics():
+    stats = _disk_cache_budget.stats()
+    return [
+        (
+            "fuel_dashboard_parquet_cache_bytes",
+            "gauge",
+            "Bytes held in the local parquet cache.",
+            [({}, stats["bytes"])],
+        ),
+        (
+            "fuel_dashboard_parquet_cache_entries",
+            "gauge",
+            "Files in the local parquet cache.",
+            [({}, stats["entries"])],
+        ),
+        (
+            "fuel_dashboard_parquet_cache_evictions_total",
+            "counter",
+            "Files evicted from the local parquet cache to stay within its byte budget.",
+            [({}, stats["evictions"])],
+        ),
+        (
+            "fuel_dashboard_aggregate_memory_cache_bytes",
+            "gauge",
+            "Bytes of decoded aggregates held in memory.",
+            [({}, _aggregate_memory_cache.stats()["bytes"])],
+        ),
+    ]
+
+
+REGISTRY.register_collector(_parquet_cache_metrics)
+
+
+def _read_cached_table(path: Path) -> pa.Table | None:
+    """Memory-map a cache file as an Arrow table, or return None if it was evicted before the read."""
+    _disk_cache_budget.touch(path)
+    try:
+        return pq.read_table(path, memory_map=True)
+    except FileNotFoundError:
+        return None
+
+
+def _write_cache_file(data: bytes, path: Path) -> None:
+    """Store downloaded parquet bytes verbatim, replacing any previous copy atomically."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        logger.warning(f"Failed to write cache file: {path}", exc_info=True)
+        return
+    _disk_cache_budget.admit(path)
+
+
+def _store_download(data: bytes, path: Path) -> pa.Table:
+    """Write *data* to the cache and return it as a table mapped from that file (decoded in memory if unwritable)."""
+    _write_cache_file(data, path)
+    table = _read_cached_table(path) if path.exists() else None
+    return table if table is not None else pq.read_table(pa.BufferReader(data))
+
+
+def _blob_meta_path(path: Path) -> Path:
+    return path.with_name(path.name + ".meta.json")
+
+
+def _blob_version(blob) -> dict | None:
+    version = {"generation": getattr(blob, "generation", None), "md5_hash": getattr(blob, "md5_hash", None)}
+    return version if any(version.values()) else None
+
+
+def _write_blob_meta(path: Path, blob) -> None:
+    """Record the generation/md5 of the blob a cache file was downloaded from, for later revalidation."""
+    version = _blob_version(blob)
+    if version is None:
+        return
+    try:
+        with open(_blob_meta_path(path), "w") as f:
+            json.dump(version, f)
+    except Exception:
+        logger.warning(f"Failed to write cache metadata: {path}", exc_info=True)
+
+
+def _read_blob_meta(path: Path) -> dict | None:
+    try:
+        with open(_blob_meta_path(path)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _revalidate_cache_file(path: Path, blob, kind: str) -> bool:
+    """If the expired cache file at *path* still holds *blob*'s version, restart its freshness window.
+
+    *blob* comes from a metadata-only ``get_blob()``; a match saves downloading the whole file again.
+    """
+    version = _blob_version(blob)
+    if version is None or _read_blob_meta(path) != version or not path.exists():
+        return False
+    os.utime(path)
+    _disk_cache_budget.touch(path)
+    _REVALIDATED_BYTES.inc(blob.size or 0, kind=kind)
+    logger.info(f"Cache revalidated (unchanged generation): {blob.name}")
+    return True
+
+
 def _aggregate_cached_path(name: str) -> Path:
     blob_name = f"aggregates/{name}"
     safe_name = blob_name.replace("/", "_")
@@ -58,7 +301,7 @@ def _is_today_file(blob_name: str) -> bool:
     return file_date == utcnow().date()
 
 
-def _cached_download(blob_name: str) -> pd.DataFrame:
+def _cached_download(blob_name: str) -> pa.Table:
     """Download a parquet file, using local disk cache for historical (immutable) files."""
     cache_dir = _get_cache_dir()
     safe_name = blob_name.replace("/", "_")
@@ -69,23 +312,152 @@ def _cached_download(blob_name: str) -> pd.DataFrame:
             age_hours = (time.time() - cached_path.stat().st_mtime) / 3600
             if age_hours < settings.parquet_cache_max_age_hours:
                 logger.debug(f"Cache hit (today, fresh): {blob_name}")
-                return pd.read_parquet(cached_path)
-            logger.info(f"Cache stale (today, {age_hours:.1f}h old): {blob_name}")
+                table = _read_cached_table(cached_path)
+                if table is not None:
+                    _parquet_disk_cache_stats.hit()
+                    return table
+            else:
+                logger.info(f"Cache stale (today, {age_hours:.1f}h old): {blob_name}")
         else:
             logger.debug(f"Cache hit (historical): {blob_name}")
-            return pd.read_parquet(cached_path)
+            table = _read_cached_table(cached_path)
+            if table is not None:
+                _parquet_disk_cache_stats.hit()
+                return table
 
+    _parquet_disk_cache_stats.miss()
     bucket = _get_bucket()
-    blob = bucket.blob(blob_name)
+    is_today = _is_today_file(blob_name)
+    if is_today:
+        # Today's file can still be rewritten, so fetch its metadata to revalidate or record its version.
+        blob = bucket.get_blob(blob_name)
+        if blob is None:
+            raise FileNotFoundError(f"Parquet file not found in GCS: {blob_name}")
+        if _revalidate_cache_file(cached_path, blob, "raw"):
+            table = _read_cached_table(cached_path)
+            if table is not None:
+                return table
+    else:
+        blob = bucket.blob(blob_name)
     data = blob.download_as_bytes()
-    df = pd.read_parquet(io.BytesIO(data))
-
-    try:
-        df.to_parquet(cached_path)
-    except Exception:
-        logger.warning(f"Failed to write cache file: {cached_path}", exc_info=True)
-
-    return df
+    _DOWNLOADED_BYTES.inc(len(data), kind="raw")
+    table = _store_download(data, cached_path)
+    if is_today:
+        _write_blob_meta(cached_path, blob)
+    return table
+
+
+RAW_PREFIX = "spain_fuel_prices_"
+AGGREGATE_MANIFEST_BLOB = "aggregates/manifest.json"
+_MANIFEST_FILE = "bucket_manifest.json"
+# Beyond this many days since the last seen file, one full listing is cheaper than per-day prefixes.
+_MAX_INCREMENTAL_DAYS = 14
+
+
+class _BucketManifest:
+    """In-memory (and on-disk) index of the raw ``spain_fuel_prices_*`` parquet blobs.
+
+    Listing queries are answered from the index. It is refreshed at most every
+    ``bucket_manifest_refresh_seconds`` by listing only the day prefixes from the newest indexed
+    date up to today, since files are only ever added for the current day; a full listing runs on
+    a cold start and every ``bucket_manifest_full_refresh_hours`` to pick up deletions. The index
+    is persisted next to the parquet cache so a restart resumes incrementally.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._loaded = False
+        self._refreshed_at = 0.0
+        self._full_listing_at = 0.0
+
+    def _path(self) -> Path:
+        return _get_cache_dir() / _MANIFEST_FILE
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self._path()) as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable bucket manifest: {e}")
+            return
+        if payload.get("bucket") != settings.gcs_bucket_name:
+            return
+        self._entries = {entry["name"]: entry for entry in payload["entries"]}
+        self._full_listing_at = payload["full_listing_at"]
+        logger.info(f"Loaded bucket manifest with {len(self._entries)} files")
+
+    def _save(self) -> None:
+        path = self._path()
+        tmp_path = path.with_suffix(".json.tmp")
+        payload = {
+            "bucket": settings.gcs_bucket_name,
+            "full_listing_at": self._full_listing_at,
+            "entries": sorted(self._entries.values(), key=lambda e: e["name"]),
+        }
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            logger.warning(f"Failed to persist bucket manifest: {path}", exc_info=True)
+
+    def _list(self, prefix: str) -> dict[str, dict]:
+        entries = {}
+        for blob in _get_bucket().list_blobs(prefix=prefix):
+            if not blob.name.endswith(".parquet"):
+                continue
+            match = PARQUET_PATTERN.search(blob.name)
+            if not match:
+                continue
+            entries[blob.name] = {
+                "name": blob.name,
+                "date": match.group(1),
+                "size_bytes": blob.size or 0,
+                "generation": getattr(blob, "generation", None),
+            }
+        return entries
+
+    def _refresh(self) -> None:
+        now = time.time()
+        today = utcnow().date()
+        newest = max((e["date"] for e in self._entries.values()), default=None)
+        full_refresh_due = now - self._full_listing_at >= settings.bucket_manifest_full_refresh_hours * 3600
+        newest_day = datetime.strptime(newest, "%Y-%m-%d").date() if newest else None
+        if newest_day is None or full_refresh_due or (today - newest_day).days > _MAX_INCREMENTAL_DAYS:
+            self._entries = self._list(RAW_PREFIX)
+            self._full_listing_at = now
+            logger.info(f"Bucket manifest rebuilt from full listing ({len(self._entries)} files)")
+        else:
+            day = newest_day
+            prefixes = 0
+            while day <= today:
+                self._entries.update(self._list(f"{RAW_PREFIX}{day:%Y-%m-%d}"))
+                day += timedelta(days=1)
+                prefixes += 1
+            logger.debug(f"Bucket manifest refreshed incrementally ({prefixes} day prefixes)")
+        self._refreshed_at = now
+        self._save()
+
+    def entries(self) -> list[dict]:
+        """Return the indexed files sorted by name (i.e. chronologically), refreshing the index if it is due."""
+        with self._mutex:
+            if not self._loaded:
+                self._load()
+            if time.time() - self._refreshed_at >= settings.bucket_manifest_refresh_seconds:
+                try:
+                    self._refresh()
+                except Exception:
+                    if not self._entries:
+                        raise
+                    logger.warning("Failed to refresh bucket manifest; serving last index", exc_info=True)
+            return sorted(self._entries.values(), key=lambda e: e["name"])
+
+
+_manifest = _BucketManifest()
 
 
 def list_parquet_files_with_metadata(
@@ -93,10 +465,7 @@ def list_parquet_files_with_metadata(
     start_date: datetime | None = None,
     end_date: datetime | None = None,
 ) -> list[dict]:
-    """List parquet files with name, date, and size metadata."""
-    bucket = _get_bucket()
-    blobs = bucket.list_blobs(prefix="spain_fuel_prices_")
-
+    """List parquet files with name, date, and size metadata (served from the bucket manifest)."""
     if start_date is None and days_back is not None:
         start_date = utcnow() - timedelta(days=days_back)
     if end_date is None:
@@ -104,22 +473,14 @@ def list_parquet_files_with_metadata(
     if start_date is not None:
         start_date = _to_utc(start_date)
     end_date = _to_utc(end_date)
-    start_day = start_date.date() if start_date is not None else None
-    end_day = end_date.date()
-
-    files = []
-    for blob in blobs:
-        if not blob.name.endswith(".parquet"):
-            continue
-        match = PARQUET_PATTERN.search(blob.name)
-        if not match:
-            continue
-        file_date_str = match.group(1)
-        file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
-        if start_day and not (start_day <= file_date <= end_day):
-            continue
-        files.append({"name": blob.name, "date": file_date_str, "size_bytes": blob.size or 0})
-
+    start_day = start_date.strftime("%Y-%m-%d") if start_date is not None else None
+    end_day = end_date.strftime("%Y-%m-%d")
+
+    files = [
+        {"name": entry["name"], "date": entry["date"], "size_bytes": entry["size_bytes"]}
+        for entry in _manifest.entries()
+        if not start_day or start_day <= entry["date"] <= end_day
+    ]
     logger.info(f"Found {len(files)} parquet files in GCS bucket")
     return sorted(files, key=lambda f: f["date"])
 
@@ -134,82 +495,313 @@ def list_parquet_files(
 
 
 def get_latest_parquet_file() -> str | None:
-    """Get the latest parquet file, checking today and yesterday first."""
+    """Get the latest parquet file from the bucket manifest."""
     try:
-        bucket = _get_bucket()
-        now = utcnow()
-        for days_ago in range(3):
-            date_str = (now - timedelta(days=days_ago)).strftime("%Y-%m-%d")
-            prefix = f"spain_fuel_prices_{date_str}"
-            blobs = list(bucket.list_blobs(prefix=prefix))
-            parquets = sorted([b.name for b in blobs if b.name.endswith(".parquet")])
-            if parquets:
-                return parquets[-1]
-
-        logger.warning("No recent parquet files found, falling back to full listing")
-        files = list_parquet_files()
-        return files[-1] if files else None
+        entries = _manifest.entries()
     except Exception:
         logger.warning("Failed to list parquet files from GCS (network error)", exc_info=True)
         return None
+    return entries[-1]["name"] if entries else None
 
 
-def download_parquet_as_df(blob_name: str) -> pd.DataFrame:
+def download_parquet_as_table(blob_name: str) -> pa.Table:
+    """Return a raw parquet file as an Arrow table memory-mapped from the local disk cache."""
     return _cached_download(blob_name)
 
 
-def download_parquets_as_df(blob_names: list[str]) -> pd.DataFrame:
-    if not blob_names:
-        return pd.DataFrame()
+def download_parquet_as_df(blob_name: str) -> pd.DataFrame:
+    return _cached_download(blob_name).to_pandas()
 
-    max_workers = min(4, len(blob_names))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        dfs = list(executor.map(_cached_download, blob_names))
 
-    return pd.concat(dfs, ignore_index=True)
+def _cached_file(blob_name: str) -> Path:
+    """Return the local cache file of *blob_name*, downloading it first if it is missing or stale."""
+    cached_path = _get_cache_dir() / blob_name.replace("/", "_")
+    if cached_path.exists():
+        fresh = not _is_today_file(blob_name) or (
+            (time.time() - cached_path.stat().st_mtime) / 3600 < settings.parquet_cache_max_age_hours
+        )
+        if fresh:
+            _disk_cache_budget.touch(cached_path)
+            _parquet_disk_cache_stats.hit()
+            return cached_path
+    _cached_download(blob_name)
+    if not cached_path.exists():
+        raise FileNotFoundError(f"Parquet file could not be cached locally: {blob_name}")
+    return cached_path
+
+
+@contextmanager
+def cached_parquet_paths(blob_names: list[str]) -> Iterator[list[Path]]:
+    """Make every raw parquet file of *blob_names* available in the local disk cache and yield the paths.
+
+    Lets DuckDB scan the files with ``read_parquet()``, reading only the columns and row groups a
+    query needs, instead of decoding whole files into pandas. The files stay pinned in the disk
+    cache until the block exits, so downloading the end of a long batch cannot evict its start
+    before the query has read it.
+    """
+    if not blob_names:
+        yield []
+        return
+
+    with _disk_cache_budget.lease([name.replace("/", "_") for name in blob_names]):
+        max_workers = min(4, len(blob_names))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            paths = list(executor.map(_cached_file, blob_names))
+        yield paths
+
+
+class _DecodedAggregateCache:
+    """Decoded aggregates kept in memory, keyed by name and the mtime of their local cache file.
+
+    Each entry is the Arrow table memory-mapped from the cache file, plus its pandas conversion
+    once some caller asked for a DataFrame. An entry is served while that file is unchanged and
+    still within ``parquet_cache_max_age_hours``; a refetch rewrites the file, so its mtime doubles
+    as the generation. Loads of the same aggregate are coalesced behind a per-name lock, so
+    concurrent cold requests share one download and one decode. Least recently used entries are
+    dropped to stay under ``aggregate_memory_cache_mb``.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        # name -> (cache file mtime, table, DataFrame or None, bytes)
+        self._entries: OrderedDict[str, tuple[float, pa.Table, pd.DataFrame | None, int]] = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+
+    def _lookup(self, name: str) -> tuple[float, pa.Table, pd.DataFrame | None, int] | None:
+        mtime = get_aggregate_cache_mtime(name)
+        if mtime is None or (time.time() - mtime) / 3600 >= settings.parquet_cache_max_age_hours:
+            return None
+        with self._mutex:
+            entry = self._entries.get(name)
+            if entry is None or entry[0] != mtime:
+                return None
+            self._entries.move_to_end(name)
+            return entry
+
+    def _load_lock(self, name: str) -> threading.Lock:
+        with self._mutex:
+            return self._load_locks.setdefault(name, threading.Lock())
+
+    def _current(self, name: str) -> pa.Table | None:
+        """Return the entry decoded from the local cache file as it is now, even if that file has expired."""
+        mtime = get_aggregate_cache_mtime(name)
+        with self._mutex:
+            entry = self._entries.get(name)
+        return entry[1] if entry is not None and entry[0] == mtime else None
+
+    def _store(self, name: str, mtime: float | None, table: pa.Table, df: pd.DataFrame | None = None) -> None:
+        if mtime is None:
+            return
+        nbytes = table.nbytes + (int(df.memory_usage(index=True, deep=True).sum()) if df is not None else 0)
+        max_bytes = settings.aggregate_memory_cache_mb * 1024 * 1024
+        with self._mutex:
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                self._bytes -= previous[3]
+            if nbytes > max_bytes:
+                return
+            self._entries[name] = (mtime, table, df, nbytes)
+            self._bytes += nbytes
+            while self._bytes > max_bytes:
+                evicted, (_, _, _, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self._evictions += 1
+                logger.info(f"Evicted aggregate {evicted} from memory cache ({evicted_bytes} bytes)")
+
+    def _entry(self, name: str) -> tuple[float, pa.Table, pd.DataFrame | None, int] | None:
+        entry = self._lookup(name)
+        if entry is not None:
+            _aggregate_memory_cache_stats.hit()
+            return entry
+        with self._load_lock(name):
+            # Whoever held the lock before us may have just loaded it.
+            entry = self._lookup(name)
+            if entry is not None:
+                _aggregate_memory_cache_stats.hit()
+                return entry
+            _aggregate_memory_cache_stats.miss()
+            table = _fetch_aggregate(name, decoded=self._current(name))
+            if table is None:
+                return None
+            mtime = get_aggregate_cache_mtime(name)
+            self._store(name, mtime, table)
+            return (mtime, table, None, 0)
+
+    def get_table(self, name: str) -> pa.Table | None:
+        entry = self._entry(name)
+        return entry[1] if entry is not None else None
+
+    def get(self, name: str) -> pd.DataFrame | None:
+        entry = self._entry(name)
+        if entry is None:
+            return None
+        mtime, table, df, _ = entry
+        if df is None:
+            df = table.to_pandas()
+            with self._mutex:
+                current = self._entries.get(name)
+                is_current = current is not None and current[0] == mtime and current[2] is None
+            if is_current:
+                self._store(name, mtime, table, df)
+        return df.copy(deep=False)
+
+    def reload(self, name: str) -> pa.Table | None:
+        """Download *name* again now, whatever the freshness of its local copy."""
+        with self._load_lock(name):
+            table = _fetch_aggregate(name, force=True)
+            if table is not None:
+                self._store(name, get_aggregate_cache_mtime(name), table)
+            return table
+
+    def retag(self, name: str, old_mtime: float, new_mtime: float) -> None:
+        """Keep serving the entry for *name* after its unchanged cache file was touched."""
+        with self._mutex:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == old_mtime:
+                self._entries[name] = (new_mtime, *entry[1:])
+
+    def clear(self) -> None:
+        with self._mutex:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._mutex:
+            return {
+                "bytes": self._bytes,
+                "entries": len(self._entries),
+                "evictions": self._evictions,
+                "max_bytes": settings.aggregate_memory_cache_mb * 1024 * 1024,
+            }
+
+
+_aggregate_memory_cache = _DecodedAggregateCache()
+
+
+def get_aggregate_memory_cache_stats() -> dict:
+    """Return size, entry count and evictions of the in-memory decoded aggregate cache."""
+    return _aggregate_memory_cache.stats()
+
+
+def download_aggregate_table(name: str) -> pa.Table | None:
+    """Return a pre-computed aggregate from GCS as an Arrow table, shared in memory while its cache file is fresh.
+
+    The table is memory-mapped from the local cache file; DuckDB can scan it without copying.
+    """
+    return _aggregate_memory_cache.get_table(name)
 
 
 def download_aggregate(name: str) -> pd.DataFrame | None:
-    """Download a pre-computed aggregate parquet from GCS; cached locally by parquet_cache_max_age_hours."""
+    """Return a pre-computed aggregate as a DataFrame, converted from the shared table once per cache file.
+
+    The returned frame shares its column data with the cached copy: filter or copy it, never modify it in place.
+    """
+    return _aggregate_memory_cache.get(name)
+
+
+def _fetch_aggregate(name: str, decoded: pa.Table | None = None, force: bool = False) -> pa.Table | None:
+    """Download a pre-computed aggregate parquet from GCS; cached locally by parquet_cache_max_age_hours.
+
+    An expired local copy is revalidated against the blob's generation/md5 before downloading;
+    *decoded* is the caller's table for that copy, returned as-is when it is still current.
+    *force* skips both checks, for callers that already know the blob changed.
+    """
     blob_name = f"aggregates/{name}"
     cached_path = _aggregate_cached_path(name)
 
-    if cached_path.exists():
+    if cached_path.exists() and not force:
         age_hours = (time.time() - cached_path.stat().st_mtime) / 3600
         if age_hours < settings.parquet_cache_max_age_hours:
             logger.debug(f"Aggregate cache hit (fresh): {blob_name}")
-            return pd.read_parquet(cached_path)
+            _aggregate_disk_cache_stats.hit()
+            return pq.read_table(cached_path, memory_map=True)
         logger.info(f"Aggregate cache stale ({age_hours:.1f}h old): {blob_name}")
+    _aggregate_disk_cache_stats.miss()
 
     try:
         bucket = _get_bucket()
-        blob = bucket.blob(blob_name)
-        if not blob.exists():
+        blob = bucket.get_blob(blob_name)
+        if blob is None:
             logger.warning(f"Aggregate file not found: {blob_name}")
             return None
+        if not force and _revalidate_cache_file(cached_path, blob, "aggregate"):
+            return decoded if decoded is not None else pq.read_table(cached_path, memory_map=True)
         data = blob.download_as_bytes()
     except Exception:
         if cached_path.exists():
             logger.warning(
                 f"Failed to download aggregate {blob_name} (network error); serving stale cache", exc_info=True
             )
-            return pd.read_parquet(cached_path)
+            return pq.read_table(cached_path, memory_map=True)
         logger.warning(f"Failed to download aggregate {blob_name} (network error)", exc_info=True)
         return None
 
-    df = pd.read_parquet(io.BytesIO(data))
+    _DOWNLOADED_BYTES.inc(len(data), kind="aggregate")
+    table = _store_download(data, cached_path)
+    _write_blob_meta(cached_path, blob)
+    logger.info(f"Downloaded aggregate {blob_name} ({table.num_rows} rows)")
+    return table
+
 
+def download_aggregate_manifest() -> dict | None:
+    """Return ``aggregates/manifest.json`` as published by the aggregator, or None if missing or unreadable."""
     try:
-        df.to_parquet(cached_path)
+        blob = _get_bucket().get_blob(AGGREGATE_MANIFEST_BLOB)
+        if blob is None:
+            return None
+        return json.loads(blob.download_as_bytes())
     except Exception:
-        logger.warning(f"Failed to write aggregate cache: {cached_path}", exc_info=True)
+        logger.warning("Failed to read aggregate manifest", exc_info=True)
+        return None
+
+
+def _touch_aggregate(name: str, path: Path) -> None:
+    old_mtime = path.stat().st_mtime
+    os.utime(path)
+    _disk_cache_budget.touch(path)
+    _aggregate_memory_cache.retag(name, old_mtime, path.stat().st_mtime)
+
+
+def sync_aggregates_with_manifest(manifest: dict) -> list[str]:
+    """Bring local aggregate copies in line with *manifest*; return the names that were redownloaded.
+
+    A copy still matching its entry's generation/md5 is touched, restarting its freshness window
+    without a GCS call; an outdated one is redownloaded. Aggregates without a local copy were never
+    used by this process and are left to load on demand.
+    """
+    changed = []
+    for name, entry in manifest.get("aggregates", {}).items():
+        path = _aggregate_cached_path(name)
+        if not path.exists():
+            continue
+        if _read_blob_meta(path) == {"generation": entry.get("generation"), "md5_hash": entry.get("md5_hash")}:
+            _touch_aggregate(name, path)
+        elif _aggregate_memory_cache.reload(name) is not None:
+            changed.append(name)
+    return changed
 
-    logger.info(f"Downloaded aggregate {blob_name} ({len(df)} rows)")
-    return df
+
+def get_aggregate_cache_mtime(name: str) -> float | None:
+    """Return the mtime of the local aggregate cache file (it changes whenever download_aggregate refetches)."""
+    try:
+        return _aggregate_cached_path(name).stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def get_aggregate_generation(name: str) -> str | None:
+    """Return the GCS generation (or md5) of the blob the local aggregate copy was downloaded from."""
+    version = _read_blob_meta(_aggregate_cached_path(name))
+    if not version:
+        return None
+    identity = version.get("generation") or version.get("md5_hash")
+    return str(identity) if identity else None
 
 
 def get_aggregate_cache_age_seconds(name: str) -> float | None:
-    cached_path = _aggregate_cached_path(name)
-    if not cached_path.exists():
+    mtime = get_aggregate_cache_mtime(name)
+    if mtime is None:
         return None
-    return max(0.0, time.time() - cached_path.stat().st_mtime)
+    return max(0.0, time.time() - mtime)
@@ -2,16 +2,31 @@ import gzip
 import json
 from pathlib import Path
 
+from services.geo_utils import FULL_DETAIL
+from services.geo_utils import NestedPolygonIndex
+from services.geo_utils import PolygonIndex
+from services.geo_utils import simplify_feature
+
+from data.postal_geometry import detail_store_path
+from data.postal_geometry import PostalGeometryStore
+from data.postal_geometry import ZIP_CODE_PROPERTY
+
 _GEOJSON_DIR = Path(__file__).resolve().parent / "geojson"
+# Built from the GeoJSON by the Dockerfile's asset-builder; the GeoJSON is the fallback for local runs.
+_POSTAL_CODES_STORE = "spain-postal-codes.bin"
 _POSTAL_CODES_GEOJSON = "spain-postal-codes.geojson"
 _POSTAL_CODES_GEOJSON_GZ = "spain-postal-codes.geojson.gz"
 
 _provinces_geojson: dict | None = None
 _provinces_name_lookup: dict[str, str] | None = None
 _districts_geojson: dict | None = None
+_district_index: PolygonIndex | None = None
+_barrios_geojson: dict | None = None
+_barrio_index: NestedPolygonIndex | None = None
 _postal_code_index: dict[str, dict] | None = None
-
-ZIP_CODE_PROPERTY = "COD_POSTAL"
+_postal_geometry_stores: dict[str, PostalGeometryStore] = {}
+# Simplified copies of the bundled FeatureCollections, keyed by (file name, detail level).
+_simplified_geojson: dict[tuple[str, str], dict] = {}
 
 _DATA_TO_GEOJSON_OVERRIDES: dict[str, str] = {
     "coruña (a)": "A Coruña",
@@ -49,7 +64,18 @@ def is_mainland_province(province: str) -> bool:
     return normalize_data_province_name(province) not in _NON_MAINLAND_DATA_NAMES
 
 
-def load_provinces_geojson() -> dict:
+def _at_detail(name: str, geojson: dict, detail: str) -> dict:
+    """*geojson* simplified to *detail*, computed once per file and level."""
+    if detail == FULL_DETAIL:
+        return geojson
+    key = (name, detail)
+    if key not in _simplified_geojson:
+        features = [simplify_feature(feature, detail) for feature in geojson["features"]]
+        _simplified_geojson[key] = {**geojson, "features": features}
+    return _simplified_geojson[key]
+
+
+def load_provinces_geojson(detail: str = FULL_DETAIL) -> dict:
     global _provinces_geojson, _provinces_name_lookup
     if _provinces_geojson is None:
         path = _GEOJSON_DIR / "spain-provinces.geojson"
@@ -60,7 +86,7 @@ def load_provinces_geojson() -> dict:
             geojson_name = feature["properties"]["name"]
             _provinces_name_lookup[geojson_name.lower()] = geojson_name
         _provinces_name_lookup.update(_DATA_TO_GEOJSON_OVERRIDES)
-    return _provinces_geojson
+    return _at_detail("spain-provinces.geojson", _provinces_geojson, detail)
 
 
 def get_geojson_province_name(data_province: str) -> str | None:
@@ -77,6 +103,15 @@ def normalize_data_province_name(province_name: str | None) -> str | None:
     return _LOWERCASE_GEOJSON_TO_DATA.get(normalized, normalized)
 
 
+def _ensure_postal_store(detail: str = FULL_DETAIL) -> PostalGeometryStore | None:
+    if detail not in _postal_geometry_stores:
+        path = detail_store_path(_GEOJSON_DIR / _POSTAL_CODES_STORE, detail)
+        if not path.exists():
+            return None
+        _postal_geometry_stores[detail] = PostalGeometryStore(path)
+    return _postal_geometry_stores[detail]
+
+
 def _ensure_postal_index() -> dict[str, dict]:
     global _postal_code_index
     if _postal_code_index is None:
@@ -116,25 +151,64 @@ def _load_json(path: Path) -> dict:
 
 
 def load_postal_code_boundary(zip_code: str) -> dict | None:
+    store = _ensure_postal_store()
+    if store is not None:
+        return store.feature(zip_code)
     index = _ensure_postal_index()
     return index.get(zip_code)
 
 
-def load_postal_codes_for_zip_list(zip_codes: list[str]) -> dict:
-    """Return a GeoJSON FeatureCollection containing only features matching the given zip codes."""
-    index = _ensure_postal_index()
+def load_postal_codes_for_zip_list(zip_codes: list[str], detail: str = FULL_DETAIL) -> dict:
+    """Return a GeoJSON FeatureCollection containing only features matching the given zip codes.
+
+    Geometries come from the store precomputed for *detail*; without one (a local checkout), the
+    full-resolution boundaries are simplified per request.
+    """
+    store = _ensure_postal_store(detail)
+    precomputed = store is not None
+    if store is None:
+        store = _ensure_postal_store()
+    lookup = store.feature if store is not None else _ensure_postal_index().get
     features = []
     for zc in zip_codes:
-        feature = index.get(zc)
+        feature = lookup(zc)
         if feature is not None:
-            features.append(feature)
+            features.append(feature if precomputed else simplify_feature(feature, detail))
     return {"type": "FeatureCollection", "features": features}
 
 
-def load_madrid_districts() -> dict:
+def load_madrid_districts(detail: str = FULL_DETAIL) -> dict:
     global _districts_geojson
     if _districts_geojson is None:
         path = _GEOJSON_DIR / "distritos-madrid.geojson"
         with open(path, encoding="utf-8") as f:
             _districts_geojson = json.load(f)
-    return _districts_geojson
+    return _at_detail("distritos-madrid.geojson", _districts_geojson, detail)
+
+
+def load_madrid_district_index() -> PolygonIndex:
+    """Madrid district polygons prepared for point lookups, built once from ``load_madrid_districts()``."""
+    global _district_index
+    if _district_index is None:
+        _district_index = PolygonIndex(load_madrid_districts()["features"], "nombre")
+    return _district_index
+
+
+def load_madrid_barrios(detail: str = FULL_DETAIL) -> dict:
+    """Madrid's administrative barrios; ``nombre``, ``distrito`` (a district's ``nombre``) and ``codbarrio``."""
+    global _barrios_geojson
+    if _barrios_geojson is None:
+        path = _GEOJSON_DIR / "barrios-madrid.geojson"
+        with open(path, encoding="utf-8") as f:
+            _barrios_geojson = json.load(f)
+    return _at_detail("barrios-madrid.geojson", _barrios_geojson, detail)
+
+
+def load_madrid_barrio_index() -> NestedPolygonIndex:
+    """Barrio polygons under their district, for district-then-barrio point lookups."""
+    global _barrio_index
+    if _barrio_index is None:
+        _barrio_index = NestedPolygonIndex(
+            load_madrid_district_index(), load_madrid_barrios()["features"], "nombre", "distrito"
+        )
+    return _barrio_index
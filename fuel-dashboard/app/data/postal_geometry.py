@@ -0,0 +1,178 @@
+"""Compact binary store of the postal-code boundaries, memory-mapped and decoded one zip at a time.
+
+The file is built once from the postal-code GeoJSON (the Dockerfile's ``asset-builder`` stage runs
+``python -m data.postal_geometry <src.geojson[.gz]> <dst.bin>``), along with one simplified copy per
+``GEOMETRY_DETAIL_LEVELS`` level next to it (``<dst>.<level>.bin``). Each holds every coordinate in
+one flat float64 array plus offset tables, little-endian, each section 8-byte aligned:
+
+- header:    ``MAGIC``, then uint32 zip / polygon / ring / coordinate counts and the zip code width
+- codes:     sorted zip codes, fixed-width ASCII (``S<width>``)
+- types:     uint8 per zip, 1 for a MultiPolygon and 0 for a Polygon
+- offsets:   uint32 zip -> first polygon, polygon -> first ring, ring -> first coordinate (count + 1 each)
+- coords:    float64 ``[lon, lat]`` pairs
+
+Opening the store maps the file without reading it; a zip's coordinates are paged in and turned into
+GeoJSON only when that zip is requested.
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+from services.geo_utils import FULL_DETAIL
+from services.geo_utils import GEOMETRY_DETAIL_LEVELS
+from services.geo_utils import simplify_feature
+
+MAGIC = b"PCGEO\x00\x00\x01"
+ZIP_CODE_PROPERTY = "COD_POSTAL"
+_HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("zips", "<u4"),
+        ("polygons", "<u4"),
+        ("rings", "<u4"),
+        ("coords", "<u4"),
+        ("code_width", "<u4"),
+        ("reserved", "<u4"),
+    ]
+)
+
+
+def detail_store_path(path: Path, detail: str) -> Path:
+    """Where the store simplified to *detail* lives next to the full-resolution one at *path*."""
+    if detail == FULL_DETAIL:
+        return path
+    return path.with_name(f"{path.stem}.{detail}{path.suffix}")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _polygons(geometry: dict) -> list:
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def write_postal_geometry_store(features: list[dict], path: Path) -> int:
+    """Write Polygon/MultiPolygon *features* keyed by ``COD_POSTAL`` to *path*; return the zip count."""
+    geometries: dict[str, dict] = {}
+    for feature in features:
+        code = str(feature["properties"].get(ZIP_CODE_PROPERTY, "")).strip()
+        if code and _polygons(feature["geometry"]):
+            geometries[code] = feature["geometry"]
+    codes = sorted(geometries)
+    types, zip_polygons, polygon_rings, ring_coords, coords = [], [0], [0], [0], []
+    for code in codes:
+        geometry = geometries[code]
+        types.append(geometry["type"] == "MultiPolygon")
+        for polygon in _polygons(geometry):
+            for ring in polygon:
+                coords.append(np.asarray([point[:2] for point in ring], dtype=np.float64).reshape(-1, 2))
+                ring_coords.append(ring_coords[-1] + len(ring))
+            polygon_rings.append(len(ring_coords) - 1)
+        zip_polygons.append(len(polygon_rings) - 1)
+
+    code_width = max((len(code.encode("ascii")) for code in codes), default=1)
+    header = np.zeros(1, dtype=_HEADER)
+    header[0] = (MAGIC, len(codes), len(polygon_rings) - 1, len(ring_coords) - 1, ring_coords[-1], code_width, 0)
+    sections = [
+        header,
+        np.asarray(codes, dtype=f"S{code_width}"),
+        np.asarray(types, dtype=np.uint8),
+        np.asarray(zip_polygons, dtype="<u4"),
+        np.asarray(polygon_rings, dtype="<u4"),
+        np.asarray(ring_coords, dtype="<u4"),
+        np.concatenate(coords) if coords else np.zeros((0, 2)),
+    ]
+    with open(path, "wb") as f:
+        for section in sections:
+            data = np.ascontiguousarray(section).tobytes()
+            f.write(data + b"\0" * (_aligned(len(data)) - len(data)))
+    return len(codes)
+
+
+class PostalGeometryStore:
+    """Read side of the store: the file memory-mapped, with one slice of each section as a NumPy view."""
+
+    def __init__(self, path: Path):
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        header = buffer[slice(_HEADER.itemsize)].view(_HEADER)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError(f"{path} is not a postal geometry store")
+        zips, polygons, rings = int(header["zips"]), int(header["polygons"]), int(header["rings"])
+        offset = _HEADER.itemsize
+
+        def section(dtype: np.dtype | str, count: int) -> np.ndarray:
+            nonlocal offset
+            dtype = np.dtype(dtype)
+            view = buffer[slice(offset, offset + dtype.itemsize * count)].view(dtype)
+            offset = _aligned(offset + dtype.itemsize * count)
+            return view
+
+        self.codes = section(f"S{int(header['code_width'])}", zips)
+        self._multipolygon = section(np.uint8, zips)
+        self._zip_polygons = section("<u4", zips + 1)
+        self._polygon_rings = section("<u4", polygons + 1)
+        self._ring_coords = section("<u4", rings + 1)
+        self._coords = section("<f8", int(header["coords"]) * 2).reshape(-1, 2)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _position(self, zip_code: str) -> int | None:
+        try:
+            key = zip_code.encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        position = int(np.searchsorted(self.codes, key))
+        if position < len(self.codes) and self.codes[position] == key:
+            return position
+        return None
+
+    def _rings(self, position: int) -> list[list[np.ndarray]]:
+        polygons = []
+        for polygon in range(self._zip_polygons[position], self._zip_polygons[position + 1]):
+            first, last = self._polygon_rings[polygon], self._polygon_rings[polygon + 1]
+            polygons.append(
+                [
+                    self._coords[slice(self._ring_coords[ring], self._ring_coords[ring + 1])]
+                    for ring in range(first, last)
+                ]
+            )
+        return polygons
+
+    def _feature(self, position: int, polygons: list) -> dict:
+        code = self.codes[position].decode("ascii")
+        if self._multipolygon[position]:
+            geometry = {"type": "MultiPolygon", "coordinates": polygons}
+        else:
+            geometry = {"type": "Polygon", "coordinates": polygons[0]}
+        return {"type": "Feature", "properties": {ZIP_CODE_PROPERTY: code}, "geometry": geometry}
+
+    def feature(self, zip_code: str) -> dict | None:
+        """Decode one zip's boundary to a GeoJSON Feature, or None for an unknown zip."""
+        position = self._position(zip_code)
+        if position is None:
+            return None
+        polygons = [[ring.tolist() for ring in polygon] for polygon in self._rings(position)]
+        return self._feature(position, polygons)
+
+
+def _main(source: str, target: str) -> None:
+    opener = gzip.open if source.endswith(".gz") else open
+    with opener(source, mode="rt", encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    for detail in (FULL_DETAIL, *GEOMETRY_DETAIL_LEVELS):
+        path = detail_store_path(Path(target), detail)
+        count = write_postal_geometry_store([simplify_feature(feature, detail) for feature in features], path)
+        print(f"Wrote {count} postal codes to {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    _main(*sys.argv[1:3])
@@ -1,9 +1,13 @@
+import hmac
+import ipaddress
 import logging
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
 
+from api.http_cache import add_snapshot_cache_headers
 from api.router import limiter
 from api.router import router
 from config import settings
@@ -14,6 +18,7 @@ from fastapi.responses import JSONResponse
 from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from metrics import REGISTRY
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from ui_test_support import health_data_response as ui_test_health_data_response
@@ -23,19 +28,26 @@ from ui_test_support import pop_fixture_set
 from ui_test_support import push_fixture_set
 from ui_test_support import resolve_fixture_set
 
+from data.cache import get_data_health
 from data.cache import get_realtime_status
 from data.cache import is_data_ready
+from data.cache import is_insights_tab_ready
+from data.cache import start_aggregate_preload
 from data.cache import start_cache_refresh
-from data.duckdb_engine import get_latest_data_timestamp
-from data.duckdb_engine import refresh_zip_code_trend_snapshot
-from data.gcs_client import get_latest_parquet_file
-from data.gcs_client import PARQUET_PATTERN
+from data.cache import warm_start
 from data.geojson_loader import load_provinces_geojson
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 _WEB_DIR = Path(__file__).parent / "web"
+# Static code is served under stable, unversioned URLs, so browsers must revalidate it (StaticFiles
+# answers with 304 via its own ETag); other assets can be cached outright.
+_REVALIDATED_STATIC_SUFFIXES = (".js", ".css", ".html", ".webmanifest")
+
+_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency per matched route.", ("method", "route", "status")
+)
 
 
 @asynccontextmanager
@@ -45,12 +57,10 @@ async def lifespan(application: FastAPI):
         yield
         return
 
-    logger.info("Preloading zip-code trend cache")
-    trend_preloaded = False
-    try:
-        trend_preloaded = refresh_zip_code_trend_snapshot()
-    except Exception:
-        logger.exception("Failed to preload zip-code trend cache")
+    logger.info("Restoring warm-start snapshots")
+    trend_preloaded = warm_start()
+    logger.info("Preloading insights aggregates in the background")
+    start_aggregate_preload()
     logger.info("Starting cache refresh background task")
     start_cache_refresh(skip_initial_trend_refresh=trend_preloaded)
     logger.info("Preloading GeoJSON data")
@@ -72,7 +82,24 @@ async def add_security_headers(request, call_next):
     response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
     response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
     if request.url.path.startswith("/static/"):
-        response.headers["Cache-Control"] = "no-cache, must-revalidate"
+        if request.url.path.endswith(_REVALIDATED_STATIC_SUFFIXES):
+            response.headers["Cache-Control"] = "no-cache"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={settings.static_max_age_seconds}"
+    else:
+        add_snapshot_cache_headers(request, response)
+    return response
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, so /insights/{tab} etc. stay one series each.
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    _REQUEST_SECONDS.observe(
+        time.perf_counter() - started, method=request.method, route=route, status=str(response.status_code)
+    )
     return response
 
 
@@ -90,7 +117,7 @@ async def bind_ui_test_fixture_set(request: Request, call_next):
 
 @app.get("/robots.txt", include_in_schema=False)
 def robots_txt():
-    lines = ["User-agent: *", "Allow: /", "Disallow: /api/", "Disallow: /health/", ""]
+    lines = ["User-agent: *", "Allow: /", "Disallow: /api/", "Disallow: /health/", "Disallow: /metrics", ""]
     if settings.public_url:
         lines.append(f"Sitemap: {settings.public_url.rstrip('/')}/sitemap.xml")
     else:
@@ -128,6 +155,26 @@ def sitemap_xml():
     return Response(content=xml, media_type="application/xml")
 
 
+def _is_loopback_client(request: Request) -> bool:
+    try:
+        return request.client is not None and ipaddress.ip_address(request.client.host).is_loopback
+    except ValueError:
+        return False
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.metrics_token:
+        expected = f"Bearer {settings.metrics_token}"
+        if not hmac.compare_digest(request.headers.get("authorization", "").encode(), expected.encode()):
+            raise HTTPException(status_code=401, detail="Unauthorized", headers={"WWW-Authenticate": "Bearer"})
+    elif not _is_loopback_client(request):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -142,38 +189,43 @@ def health_data():
         return JSONResponse(status_code=status_code, content=body)
 
     realtime = get_realtime_status()
-    latest = get_latest_parquet_file()
-    if latest is None and not realtime["realtime_active"]:
+    health = get_data_health()
+    if health is None:
+        return JSONResponse(status_code=503, content={"status": "error", "detail": "Data status not computed yet"})
+    if health.latest_file is None and health.file_date == "unknown" and not realtime["realtime_active"]:
         return JSONResponse(status_code=503, content={"status": "error", "detail": "No parquet files found"})
 
-    match = PARQUET_PATTERN.search(latest) if latest else None
-    file_date_str = match.group(1) if match else "unknown"
     today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-    source = "realtime" if realtime["realtime_active"] else "gcs"
-    data_datetime = get_latest_data_timestamp() or file_date_str
+    if realtime["realtime_active"]:
+        source = "realtime"
+    else:
+        source = "gcs" if health.loaded_file else "warm_start"
 
     result = {
         "status": "ok",
         "source": source,
-        "latest_file": latest,
-        "file_date": file_date_str,
-        "data_datetime": data_datetime,
+        "latest_file": health.latest_file,
+        "file_date": health.file_date,
+        "loaded_file": health.loaded_file,
+        "data_datetime": health.data_datetime,
         "realtime": realtime,
+        "aggregates": health.aggregates,
+        "insights_ready": health.insights_ready,
     }
 
     if source == "realtime":
         return result
-    if file_date_str == today_str:
+    if health.file_date == today_str:
         return result
     return JSONResponse(
         status_code=503,
         content={
             "status": "stale",
             "source": source,
-            "latest_file": latest,
-            "file_date": file_date_str,
-            "data_datetime": data_datetime,
+            "latest_file": health.latest_file,
+            "file_date": health.file_date,
+            "loaded_file": health.loaded_file,
+            "data_datetime": health.data_datetime,
             "expected_date": today_str,
         },
     )
@@ -236,11 +288,6 @@ INSIGHTS_TABS = ("trends", "zones", "historical", "reportes", "quality")
 
 
 def _render_insights(request: Request, active_tab: str):
-    data_ready = ui_test_is_data_ready() if settings.ui_test_mode else is_data_ready()
-    if not data_ready:
-        return templates.TemplateResponse(
-            request, "loading.html", _base_context("insights"), status_code=503, headers={"Retry-After": "5"}
-        )
     insights_zones_enabled, insights_historical_enabled, insights_reportes_enabled = (
         ui_test_insights_flags()
         if settings.ui_test_mode
@@ -256,6 +303,12 @@ def _render_insights(request: Request, active_tab: str):
     }
     if not tab_enabled.get(active_tab, False):
         active_tab = "trends"
+    # Each tab renders as soon as its own aggregates are preloaded, independently of the others.
+    data_ready = ui_test_is_data_ready() if settings.ui_test_mode else is_data_ready()
+    if not data_ready or not is_insights_tab_ready(active_tab):
+        return templates.TemplateResponse(
+            request, "loading.html", _base_context("insights"), status_code=503, headers={"Retry-After": "5"}
+        )
     ctx = _base_context("insights")
     ctx["insights_zones_enabled"] = insights_zones_enabled
     ctx["insights_historical_enabled"] = insights_historical_enabled
@@ -0,0 +1,237 @@
+"""In-process metrics registry, rendered in the Prometheus text exposition format at ``/metrics``.
+
+Modules declare their own histograms/counters at import time and observe them inline; values
+that already live elsewhere (snapshot sizes, ``functools.lru_cache`` statistics) are read at
+scrape time through collectors and cache sources. Everything is kept in memory for the life of
+the process, like ``duckdb_engine.get_query_stats()``.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "fuel_dashboard_"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# A collector returns (name, type, help, [(labels, value), ...]) families for the current scrape.
+Family = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._mutex = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._mutex:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._mutex:
+            return self._values.get(tuple(labels[name] for name in self.labelnames), 0.0)
+
+    def render(self) -> list[str]:
+        with self._mutex:
+            values = dict(self._values)
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._mutex = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._mutex:
+            series = self._series.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[key] = series
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += seconds
+
+    def count(self, **labels: str) -> int:
+        with self._mutex:
+            series = self._series.get(tuple(labels[name] for name in self.labelnames))
+            return int(series[-2]) if series else 0
+
+    def render(self) -> list[str]:
+        with self._mutex:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(snapshot.items()):
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, series):
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(count)}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(series[-2])}")
+        return lines
+
+
+class CacheStats:
+    """Hit/miss counters for a cache that does not keep its own."""
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self) -> None:
+        with self._mutex:
+            self.hits += 1
+
+    def miss(self) -> None:
+        with self._mutex:
+            self.misses += 1
+
+    def counts(self) -> tuple[int, int]:
+        return self.hits, self.misses
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._collectors: list[Callable[[], Iterable[Family]]] = []
+        self._caches: dict[str, Callable[[], tuple[int, int]]] = {}
+
+    def _register(self, metric):
+        with self._mutex:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(PREFIX + name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(PREFIX + name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        with self._mutex:
+            self._collectors.append(collector)
+
+    def register_cache(self, name: str, counts: Callable[[], tuple[int, int]]) -> None:
+        """Expose a cache's (hits, misses) as ``cache_hits_total`` / ``cache_misses_total`` / ``cache_hit_ratio``."""
+        with self._mutex:
+            self._caches[name] = counts
+
+    def cache(self, name: str) -> CacheStats:
+        stats = CacheStats()
+        self.register_cache(name, stats.counts)
+        return stats
+
+    def _cache_families(self) -> list[Family]:
+        hits, misses, ratios = [], [], []
+        for name, counts in sorted(self._caches.items()):
+            try:
+                cache_hits, cache_misses = counts()
+            except Exception:
+                logger.warning("Failed to read stats of cache %s", name, exc_info=True)
+                continue
+            labels = {"cache": name}
+            lookups = cache_hits + cache_misses
+            hits.append((labels, cache_hits))
+            misses.append((labels, cache_misses))
+            ratios.append((labels, cache_hits / lookups if lookups else 0.0))
+        return [
+            (PREFIX + "cache_hits_total", "counter", "Cache lookups served from the cache.", hits),
+            (PREFIX + "cache_misses_total", "counter", "Cache lookups that had to compute or fetch.", misses),
+            (PREFIX + "cache_hit_ratio", "gauge", "Hits over lookups since process start.", ratios),
+        ]
+
+    def render(self) -> str:
+        with self._mutex:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: list[str] = []
+        for metric in sorted(metrics, key=lambda m: m.name):
+            lines.extend(metric.render())
+        families = self._cache_families()
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                logger.warning("Metrics collector %s failed", collector.__name__, exc_info=True)
+        for name, metric_type, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external services.", ("service", "operation")
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "upstream_errors_total",
+    "Failed calls to external services (exception or unusable response).",
+    ("service", "operation"),
+)
+
+
+def record_upstream_call(service: str, operation: str, started: float, failed: bool) -> None:
+    """Record one call to *service* that began at ``time.perf_counter()`` value *started*."""
+    UPSTREAM_SECONDS.observe(time.perf_counter() - started, service=service, operation=operation)
+    if failed:
+        UPSTREAM_ERRORS.inc(service=service, operation=operation)
@@ -1,5 +1,20 @@
 from typing import Sequence
 
+import numpy as np
+
+# Upper bound on points x edges tested in one NumPy broadcast, to bound temporary memory.
+_MAX_BROADCAST_CELLS = 1 << 20
+
+# Precomputed GeoJSON detail levels: Douglas-Peucker tolerance (degrees), decimals coordinates are
+# rounded to, and the highest web-map zoom at which the tolerance stays around one screen pixel
+# (a pixel spans about 1.4 / 2**zoom degrees). "full" is the source geometry, unchanged.
+GEOMETRY_DETAIL_LEVELS: dict[str, tuple[float, int, int]] = {
+    "low": (0.01, 2, 7),
+    "medium": (0.001, 3, 10),
+    "high": (0.0001, 4, 13),
+}
+FULL_DETAIL = "full"
+
 
 def point_in_polygon(lat: float, lon: float, polygon: Sequence[Sequence[float]]) -> bool:
     """Ray-casting algorithm. *polygon* is a list of [lon, lat] pairs (GeoJSON order)."""
@@ -29,24 +44,196 @@ def point_in_multipolygon(lat: float, lon: float, geometry: dict) -> bool:
     return False
 
 
-def assign_districts(
-    latitudes: Sequence[float],
-    longitudes: Sequence[float],
-    prices: Sequence[float],
-    geojson_features: list[dict],
-) -> dict[str, dict[str, float]]:
-    """Assign stations to districts via point-in-polygon and aggregate prices.
+class _Ring:
+    """Edges of one exterior ring as arrays, for testing many points against it at once."""
+
+    def __init__(self, ring: Sequence[Sequence[float]]):
+        coords = np.asarray(ring, dtype=np.float64)[:, :2]
+        x, y = coords[:, 0], coords[:, 1]
+        # Edge i runs from vertex i to vertex i - 1, as in point_in_polygon().
+        xj, yj = np.roll(x, 1), np.roll(y, 1)
+        # Horizontal edges never straddle a point's latitude; dropping them also avoids dividing by zero.
+        keep = y != yj
+        self.xi, self.yi = x[keep], y[keep]
+        self.dx, self.dy = (xj - x)[keep], (yj - y)[keep]
+        self.yj = yj[keep]
+
+    def contains(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        inside = np.zeros(len(lats), dtype=bool)
+        if not len(self.xi):
+            return inside
+        step = max(1, _MAX_BROADCAST_CELLS // len(self.xi))
+        for start in range(0, len(lats), step):
+            chunk = slice(start, start + step)
+            py, px = lats[chunk, None], lons[chunk, None]
+            straddles = (self.yi > py) != (self.yj > py)
+            # Same operation order as point_in_polygon(), so both agree on points near an edge.
+            crosses = straddles & (px < self.dx * (py - self.yi) / self.dy + self.xi)
+            inside[chunk] = np.count_nonzero(crosses, axis=1) % 2 == 1
+        return inside
+
+
+class PolygonIndex:
+    """GeoJSON Polygon/MultiPolygon features prepared for vectorized point-in-polygon lookups.
+
+    Each feature's exterior rings become edge arrays and a bounding box once, at construction;
+    ``locate()`` then tests all points against a ring in one NumPy pass, and only the points that
+    fall inside the feature's bounding box.
+    """
+
+    def __init__(self, features: list[dict], name_property: str):
+        self.names: list[str] = []
+        self._bounds: list[tuple[float, float, float, float]] = []
+        self._rings: list[list[_Ring]] = []
+        for feature in features:
+            geometry = feature["geometry"]
+            if geometry["type"] == "Polygon":
+                exteriors = [geometry["coordinates"][0]]
+            elif geometry["type"] == "MultiPolygon":
+                exteriors = [polygon[0] for polygon in geometry["coordinates"]]
+            else:
+                continue
+            coords = np.concatenate([np.asarray(ring, dtype=np.float64)[:, :2] for ring in exteriors])
+            self.names.append(feature["properties"][name_property])
+            self._bounds.append((coords[:, 0].min(), coords[:, 1].min(), coords[:, 0].max(), coords[:, 1].max()))
+            self._rings.append([_Ring(ring) for ring in exteriors])
+
+    def locate(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> np.ndarray:
+        """Return, per point, the index in ``names`` of the first feature containing it, or -1."""
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+        located = np.full(len(lats), -1, dtype=np.intp)
+        # Points sorted by longitude, so each bounding box's candidates are one searchsorted() slice.
+        by_lon = np.argsort(lons, kind="stable")
+        sorted_lons = lons[by_lon]
+        for index, ((min_lon, min_lat, max_lon, max_lat), rings) in enumerate(zip(self._bounds, self._rings)):
+            start = np.searchsorted(sorted_lons, min_lon, side="left")
+            stop = np.searchsorted(sorted_lons, max_lon, side="right")
+            candidates = by_lon[start:stop]
+            in_box = (located[candidates] < 0) & (lats[candidates] >= min_lat) & (lats[candidates] <= max_lat)
+            candidates = candidates[in_box]
+            if not len(candidates):
+                continue
+            inside = np.zeros(len(candidates), dtype=bool)
+            for ring in rings:
+                pending = np.flatnonzero(~inside)
+                inside[pending] = ring.contains(lats[candidates[pending]], lons[candidates[pending]])
+            located[candidates[inside]] = index
+        return located
+
+    def lookup(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> np.ndarray:
+        """Return, per point, the name of the first feature containing it, or None."""
+        # locate() returns -1 outside every polygon, which picks the trailing None.
+        return np.asarray([*self.names, None], dtype=object)[self.locate(latitudes, longitudes)]
+
+
+class NestedPolygonIndex:
+    """Child features (e.g. barrios) grouped under the parent feature (e.g. district) they belong to.
 
-    Returns ``{district_name: {"total_price": float, "count": int}}``.
+    A point is located among the parents first, then tested only against that parent's children.
     """
-    result: dict[str, dict[str, float]] = {}
-    for lat, lon, price in zip(latitudes, longitudes, prices):
-        for feature in geojson_features:
-            name = feature["properties"]["nombre"]
-            if point_in_multipolygon(lat, lon, feature["geometry"]):
-                if name not in result:
-                    result[name] = {"total_price": 0.0, "count": 0}
-                result[name]["total_price"] += price
-                result[name]["count"] += 1
-                break
-    return result
+
+    def __init__(self, parents: PolygonIndex, children: list[dict], name_property: str, parent_property: str):
+        self.parents = parents
+        self._children = [
+            PolygonIndex([child for child in children if child["properties"][parent_property] == parent], name_property)
+            for parent in parents.names
+        ]
+
+    def lookup(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> tuple[np.ndarray, np.ndarray]:
+        """Return the parent and the child name of each point, None where not located."""
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+        located = self.parents.locate(lats, lons)
+        children = np.full(len(lats), None, dtype=object)
+        for parent in np.unique(located[located >= 0]):
+            members = np.flatnonzero(located == parent)
+            children[members] = self._children[parent].lookup(lats[members], lons[members])
+        return np.asarray([*self.parents.names, None], dtype=object)[located], children
+
+
+def detail_for_zoom(zoom: int) -> str:
+    """Coarsest detail level that still looks exact at a web-map *zoom*."""
+    for level, (_, _, max_zoom) in GEOMETRY_DETAIL_LEVELS.items():
+        if zoom <= max_zoom:
+            return level
+    return FULL_DETAIL
+
+
+def _douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Mask of the vertices of an open polyline that Douglas-Peucker keeps at *tolerance*."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start = points[first]
+        offsets = points[slice(first + 1, last)] - start
+        dx, dy = points[last] - start
+        length = np.hypot(dx, dy)
+        if length:
+            distances = np.abs(dx * offsets[:, 1] - dy * offsets[:, 0]) / length
+        else:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.extend(((first, split), (split, last)))
+    return keep
+
+
+def _simplify_ring(ring: Sequence[Sequence[float]], tolerance: float, decimals: int) -> list | None:
+    """Simplify and round a closed ring; None when it collapses below a triangle at this tolerance."""
+    points = np.asarray([point[:2] for point in ring], dtype=np.float64).reshape(-1, 2)
+    if len(points) < 4:
+        return None
+    # A closed ring starts and ends on the same vertex, so split it at the vertex farthest from the
+    # start and simplify both halves as open polylines.
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    keep = np.zeros(len(points), dtype=bool)
+    keep[slice(far + 1)] = _douglas_peucker(points[slice(far + 1)], tolerance)
+    keep[slice(far, None)] |= _douglas_peucker(points[slice(far, None)], tolerance)
+    rounded = np.round(points[keep], decimals)
+    # Rounding can land neighbouring vertices on the same point.
+    distinct = np.ones(len(rounded), dtype=bool)
+    distinct[1:] = np.any(rounded[1:] != rounded[:-1], axis=1)
+    rounded = rounded[distinct]
+    if len(rounded) < 4:
+        return None
+    return rounded.tolist()
+
+
+def simplify_geometry(geometry: dict, tolerance: float, decimals: int) -> dict:
+    """Douglas-Peucker a Polygon/MultiPolygon at *tolerance* and round it to *decimals*.
+
+    Holes and parts that collapse at this tolerance are dropped; a geometry whose every part
+    collapses keeps its first exterior ring, only rounded, so small features stay on the map.
+    """
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return geometry
+    simplified = []
+    for polygon in polygons:
+        exterior = _simplify_ring(polygon[0], tolerance, decimals)
+        if exterior is not None:
+            holes = (_simplify_ring(ring, tolerance, decimals) for ring in polygon[1:])
+            simplified.append([exterior, *(hole for hole in holes if hole is not None)])
+    if not simplified and polygons:
+        simplified = [[_simplify_ring(polygons[0][0], 0.0, decimals) or polygons[0][0]]]
+    if geometry["type"] == "Polygon":
+        return {"type": "Polygon", "coordinates": simplified[0] if simplified else []}
+    return {"type": "MultiPolygon", "coordinates": simplified}
+
+
+def simplify_feature(feature: dict, detail: str) -> dict:
+    """*feature* with its geometry at a ``GEOMETRY_DETAIL_LEVELS`` level (or as is, for ``FULL_DETAIL``)."""
+    if detail == FULL_DETAIL:
+        return feature
+    tolerance, decimals, _ = GEOMETRY_DETAIL_LEVELS[detail]
+    return {**feature, "geometry": simplify_geometry(feature["geometry"], tolerance, decimals)}
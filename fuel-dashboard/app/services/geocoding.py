@@ -1,11 +1,14 @@
 import functools
 import logging
 import re
+import time
 from typing import Any
 
 import httpx
 from config import settings
 from geopy.geocoders import Nominatim
+from metrics import record_upstream_call
+from metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
@@ -51,21 +54,27 @@ def _short_display_name(result: dict[str, Any]) -> str:
 
 @functools.lru_cache(maxsize=512)
 def _fetch_address_suggestions(query: str) -> list[dict[str, Any]]:
-    resp = httpx.get(
-        _NOMINATIM_SEARCH_URL,
-        params={
-            "q": query,
-            "countrycodes": "es",
-            "format": "jsonv2",
-            "addressdetails": 1,
-            "limit": 5,
-            "accept-language": "es",
-        },
-        headers={"User-Agent": settings.geocoding_user_agent},
-        timeout=5.0,
-    )
-    resp.raise_for_status()
-    data = resp.json()
+    started = time.perf_counter()
+    failed = True
+    try:
+        resp = httpx.get(
+            _NOMINATIM_SEARCH_URL,
+            params={
+                "q": query,
+                "countrycodes": "es",
+                "format": "jsonv2",
+                "addressdetails": 1,
+                "limit": 5,
+                "accept-language": "es",
+            },
+            headers={"User-Agent": settings.geocoding_user_agent},
+            timeout=5.0,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        failed = False
+    finally:
+        record_upstream_call("nominatim", "search", started, failed)
     return [
         {"display_name": name, "lat": float(r["lat"]), "lon": float(r["lon"])}
         for r in data
@@ -90,9 +99,19 @@ def geocode_address(address: str) -> tuple[float, float] | None:
         logger.info("Parsed coordinates directly from input: %s", coords)
         return coords
     geocoder = _get_geocoder()
-    location = geocoder.geocode(address, country_codes=["es"])
+    started = time.perf_counter()
+    failed = True
+    try:
+        location = geocoder.geocode(address, country_codes=["es"])
+        failed = False
+    finally:
+        record_upstream_call("nominatim", "geocode", started, failed)
     if location is None:
         logger.warning(f"Could not geocode address: {address}")
         return None
     logger.info(f"Geocoded '{address}' to ({location.latitude}, {location.longitude})")
     return (location.latitude, location.longitude)
+
+
+REGISTRY.register_cache("geocode_address", lambda: geocode_address.cache_info()[:2])
+REGISTRY.register_cache("address_suggestions", lambda: _fetch_address_suggestions.cache_info()[:2])
@@ -5,6 +5,8 @@ import time
 
 import httpx
 from config import settings
+from metrics import record_upstream_call
+from metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +49,8 @@ def get_full_route(
     origin_str = f"{origin[1]},{origin[0]}"
     dest_str = f"{destination[1]},{destination[0]}"
     url = f"{settings.osrm_base_url}/route/v1/driving/{origin_str};{dest_str}?overview=full&geometries=geojson"
+    started = time.perf_counter()
+    failed = True
     try:
         response = _osrm_get(url)
         if response.status_code != 200:
@@ -59,15 +63,19 @@ def get_full_route(
             return None
 
         route = data["routes"][0]
-        return {
+        result = {
             "coordinates": route["geometry"]["coordinates"],
             "distance_km": round(route["distance"] / 1000, 2),
             "duration_minutes": round(route["duration"] / 60, 1),
         }
+        failed = False
+        return result
 
     except Exception:
         logger.warning("OSRM full route request failed", exc_info=True)
         return None
+    finally:
+        record_upstream_call("osrm", "route", started, failed)
 
 
 async def _fetch_single_route(
@@ -78,6 +86,8 @@ async def _fetch_single_route(
 ) -> list[list[float]] | None:
     dest_str = f"{lon},{lat}"
     url = f"{settings.osrm_base_url}/route/v1/driving/{origin_str};{dest_str}" "?overview=full&geometries=geojson"
+    started = time.perf_counter()
+    failed = True
     try:
         response = await client.get(url)
         if response.status_code != 200:
@@ -87,10 +97,14 @@ async def _fetch_single_route(
         if data.get("code") != "Ok":
             logger.warning("OSRM route response code: %s", data.get("code"))
             return None
-        return data["routes"][0]["geometry"]["coordinates"]
+        coordinates = data["routes"][0]["geometry"]["coordinates"]
+        failed = False
+        return coordinates
     except Exception:
         logger.warning("OSRM route request failed", exc_info=True)
         return None
+    finally:
+        record_upstream_call("osrm", "route", started, failed)
 
 
 async def get_route_geometries(
@@ -129,6 +143,8 @@ def get_road_distances(
         f"&destinations={dest_indices}"
         "&annotations=distance"
     )
+    started = time.perf_counter()
+    failed = True
     try:
         client = _get_sync_client()
         response = client.get(url)
@@ -140,7 +156,14 @@ def get_road_distances(
             logger.warning("OSRM response code: %s", data.get("code"))
             return None
         row = data["distances"][0]
-        return [round(d / 1000, 2) if d is not None else None for d in row]
+        distances = [round(d / 1000, 2) if d is not None else None for d in row]
+        failed = False
+        return distances
     except Exception:
         logger.warning("OSRM request failed", exc_info=True)
         return None
+    finally:
+        record_upstream_call("osrm", "table", started, failed)
+
+
+REGISTRY.register_cache("osrm_full_route", lambda: get_full_route.cache_info()[:2])
@@ -1,14 +1,17 @@
 import logging
 import re
 import time
-from copy import deepcopy
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from api.schemas import BarrioPriceResult
 from api.schemas import DistrictPriceResult
 from api.schemas import FUEL_GROUP_MEMBERS
 from api.schemas import FUEL_GROUP_PRIMARY
 from api.schemas import FuelGroup
 from api.schemas import FuelType
+from api.schemas import GeometryDetail
 from api.schemas import ProvincePriceResult
 from api.schemas import StationResult
 from api.schemas import TREND_PERIOD_DAYS
@@ -16,14 +19,14 @@ from api.schemas import TrendPeriod
 from api.schemas import TrendPoint
 from api.schemas import ZoneResult
 from config import settings
-from services.geo_utils import assign_districts
-from services.geo_utils import point_in_multipolygon
 from services.routing import get_road_distances
 from services.routing import get_route_geometries
 
 from data.duckdb_engine import get_distinct_labels
 from data.duckdb_engine import get_distinct_provinces
 from data.duckdb_engine import is_zip_code_trend_ready
+from data.duckdb_engine import query_avg_price_by_barrio
+from data.duckdb_engine import query_avg_price_by_district
 from data.duckdb_engine import query_avg_price_by_province
 from data.duckdb_engine import query_cached_group_price_trend
 from data.duckdb_engine import query_cached_zip_code_price_trend
@@ -39,15 +42,15 @@ from data.duckdb_engine import query_national_price_trend
 from data.duckdb_engine import query_nearest_stations
 from data.duckdb_engine import query_nearest_stations_group
 from data.duckdb_engine import query_price_trends
-from data.duckdb_engine import query_stations_by_province
 from data.duckdb_engine import query_stations_within_radius
 from data.duckdb_engine import query_stations_within_radius_group
 from data.duckdb_engine import query_volatility_by_zone
+from data.duckdb_engine import query_zip_codes_by_barrio
 from data.duckdb_engine import query_zip_codes_by_district
-from data.gcs_client import download_aggregate
 from data.gcs_client import list_parquet_files
 from data.geojson_loader import get_geojson_province_name
 from data.geojson_loader import is_mainland_province
+from data.geojson_loader import load_madrid_barrios
 from data.geojson_loader import load_madrid_districts
 from data.geojson_loader import load_postal_code_boundary
 from data.geojson_loader import load_postal_codes_for_zip_list
@@ -56,6 +59,8 @@ from data.geojson_loader import normalize_data_province_name
 
 logger = logging.getLogger(__name__)
 
+_TREND_PRICE_COLUMNS = ("avg_price", "min_price", "max_price")
+
 
 def _validate_zip_code(zip_code: str) -> str:
     if not re.fullmatch(r"\d{5}", zip_code):
@@ -102,17 +107,40 @@ def _confidence_band(appearances: int) -> str:
 
 
 def _trend_points_from_df(df: pd.DataFrame) -> list[TrendPoint]:
+    """TrendPoints of a trend frame, dated ``YYYY-MM-DD``; days without a price are left out."""
+    if df.empty:
+        return []
+    df = df.dropna(subset=list(_TREND_PRICE_COLUMNS))
+    dates = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
     return [
-        TrendPoint(
-            date=str(row["date"]),
-            avg_price=row["avg_price"],
-            min_price=row["min_price"],
-            max_price=row["max_price"],
-        )
-        for _, row in df.iterrows()
+        TrendPoint(date=date, avg_price=avg_price, min_price=min_price, max_price=max_price)
+        for date, avg_price, min_price, max_price in zip(dates, df["avg_price"], df["min_price"], df["max_price"])
     ]
 
 
+def _trend_table(rows: pa.Table) -> pa.Table:
+    """The Arrow counterpart of ``_trend_points_from_df``: same columns, date format and dropped days."""
+    for column in _TREND_PRICE_COLUMNS:
+        prices = rows[column]
+        rows = rows.filter(pc.is_finite(prices) if pa.types.is_floating(prices.type) else pc.is_valid(prices))
+    dates = rows["date"]
+    if pa.types.is_timestamp(dates.type):
+        dates = pc.cast(dates, pa.date32())
+    elif not pa.types.is_date(dates.type):
+        dates = pc.utf8_slice_codeunits(pc.cast(dates, pa.string()), 0, 10)
+    return pa.table([dates, *(rows[column] for column in _TREND_PRICE_COLUMNS)], ["date", *_TREND_PRICE_COLUMNS])
+
+
+def _trend_tables_by_fuel_type(table: pa.Table) -> dict[str, pa.Table]:
+    """Split a (fuel_type, date)-ordered trend table into per-fuel tables shaped like TrendPoint."""
+    if table.num_rows == 0:
+        return {}
+    series = {}
+    for fuel_type in sorted(pc.unique(table["fuel_type"]).to_pylist()):
+        series[str(fuel_type)] = _trend_table(table.filter(pc.equal(table["fuel_type"], fuel_type)))
+    return series
+
+
 def _df_to_station_results(df: pd.DataFrame, fuel_type: str, national_avg: float | None = None) -> list[StationResult]:
     results = []
     for _, row in df.iterrows():
@@ -444,8 +472,10 @@ def get_province_price_map_filtered(fuel_type: FuelType, mainland_only: bool = F
     return [result for result in results if is_mainland_province(result.province)]
 
 
-def get_province_price_geojson(fuel_type: FuelType, mainland_only: bool = False) -> dict:
-    geojson = deepcopy(load_provinces_geojson())
+def get_province_price_geojson(
+    fuel_type: FuelType, mainland_only: bool = False, detail: GeometryDetail = GeometryDetail.full
+) -> dict:
+    geojson = load_provinces_geojson(detail.value)
     price_map = {
         get_geojson_province_name(result.province): result
         for result in get_province_price_map_filtered(fuel_type, mainland_only)
@@ -456,59 +486,92 @@ def get_province_price_geojson(fuel_type: FuelType, mainland_only: bool = False)
         if mainland_only and not is_mainland_province(name):
             continue
         result = price_map.get(name)
-        feature["properties"] = {
+        # Geometries are shared with the cached collection; only the properties are per request.
+        properties = {
             **feature["properties"],
             "province": name,
             "avg_price": result.avg_price if result else None,
             "station_count": result.station_count if result else 0,
         }
-        features.append(feature)
-    geojson["features"] = features
-    return geojson
+        features.append({**feature, "properties": properties})
+    return {**geojson, "features": features}
 
 
 def get_district_price_map(province: str, fuel_type: FuelType) -> list[DistrictPriceResult]:
     if normalize_data_province_name(province) != "madrid":
         return []
-    geojson = load_madrid_districts()
-    df = query_stations_by_province(province, fuel_type.value)
-    if df.empty:
-        return []
-    aggregated = assign_districts(
-        df["latitude"].tolist(),
-        df["longitude"].tolist(),
-        df["price"].tolist(),
-        geojson["features"],
-    )
-    results = []
-    for district, data in aggregated.items():
-        if data["count"] == 0:
-            continue
-        results.append(
-            DistrictPriceResult(
-                district=district,
-                avg_price=data["total_price"] / data["count"],
-                station_count=int(data["count"]),
-            )
+    df = query_avg_price_by_district(province, fuel_type.value)
+    return [
+        DistrictPriceResult(
+            district=row["district"],
+            avg_price=row["avg_price"],
+            station_count=int(row["station_count"]),
         )
-    return sorted(results, key=lambda r: r.avg_price)
+        for _, row in df.iterrows()
+    ]
 
 
-def get_district_price_geojson(province: str, fuel_type: FuelType) -> dict:
+def get_district_price_geojson(
+    province: str, fuel_type: FuelType, detail: GeometryDetail = GeometryDetail.full
+) -> dict:
     if normalize_data_province_name(province) != "madrid":
         return {"type": "FeatureCollection", "features": []}
-    geojson = deepcopy(load_madrid_districts())
+    geojson = load_madrid_districts(detail.value)
     district_map = {result.district: result for result in get_district_price_map(province, fuel_type)}
+    features = []
     for feature in geojson["features"]:
         name = feature["properties"].get("nombre")
         result = district_map.get(name)
-        feature["properties"] = {
+        properties = {
             **feature["properties"],
             "district": name,
             "avg_price": result.avg_price if result else None,
             "station_count": result.station_count if result else 0,
         }
-    return geojson
+        features.append({**feature, "properties": properties})
+    return {**geojson, "features": features}
+
+
+def get_barrio_price_map(province: str, fuel_type: FuelType, district: str | None = None) -> list[BarrioPriceResult]:
+    if normalize_data_province_name(province) != "madrid":
+        return []
+    df = query_avg_price_by_barrio(province, fuel_type.value, district)
+    return [
+        BarrioPriceResult(
+            barrio=row["barrio"],
+            district=row["district"],
+            avg_price=row["avg_price"],
+            station_count=int(row["station_count"]),
+        )
+        for _, row in df.iterrows()
+    ]
+
+
+def get_barrio_price_geojson(
+    province: str, fuel_type: FuelType, district: str | None = None, detail: GeometryDetail = GeometryDetail.full
+) -> dict:
+    if normalize_data_province_name(province) != "madrid":
+        return {"type": "FeatureCollection", "features": []}
+    barrio_map = {result.barrio: result for result in get_barrio_price_map(province, fuel_type, district)}
+    features = []
+    for feature in load_madrid_barrios(detail.value)["features"]:
+        if district and feature["properties"].get("distrito") != district:
+            continue
+        name = feature["properties"].get("nombre")
+        result = barrio_map.get(name)
+        features.append(
+            {
+                **feature,
+                "properties": {
+                    **feature["properties"],
+                    "barrio": name,
+                    "district": feature["properties"].get("distrito"),
+                    "avg_price": result.avg_price if result else None,
+                    "station_count": result.station_count if result else 0,
+                },
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
 
 
 def get_municipalities(province: str) -> list[str]:
@@ -529,30 +592,17 @@ def get_zip_code_price_map_by_municipality(province: str, fuel_type: FuelType, m
 
 
 def get_zip_codes_for_district(province: str, fuel_type: FuelType, district_name: str) -> list[str]:
-    """Get zip codes that fall within a Madrid district by assigning stations to districts."""
+    """Get zip codes of the stations assigned to a Madrid district when the snapshot was loaded."""
     if normalize_data_province_name(province) != "madrid":
         return []
-    geojson = load_madrid_districts()
-    df = query_zip_codes_by_district(province, fuel_type.value)
-    if df.empty:
-        return []
-    aggregated = assign_districts(
-        df["latitude"].tolist(),
-        df["longitude"].tolist(),
-        df["price"].tolist(),
-        geojson["features"],
-    )
-    if district_name not in aggregated:
+    return query_zip_codes_by_district(province, fuel_type.value, district_name)
+
+
+def get_zip_codes_for_barrio(province: str, fuel_type: FuelType, barrio_name: str) -> list[str]:
+    """Get zip codes of the stations assigned to a Madrid barrio when the snapshot was loaded."""
+    if normalize_data_province_name(province) != "madrid":
         return []
-    # Collect zip codes for stations that were assigned to the target district
-    target_zips: set = set()
-    for feature in geojson["features"]:
-        if feature["properties"]["nombre"] == district_name:
-            for _, row in df.iterrows():
-                if point_in_multipolygon(row["latitude"], row["longitude"], feature["geometry"]):
-                    target_zips.add(str(row["zip_code"]))
-            break
-    return sorted(target_zips)
+    return query_zip_codes_by_barrio(province, fuel_type.value, barrio_name)
 
 
 def get_zip_code_price_map_for_zips(province: str, fuel_type: FuelType, zip_codes: list[str]) -> list[ZoneResult]:
@@ -562,8 +612,8 @@ def get_zip_code_price_map_for_zips(province: str, fuel_type: FuelType, zip_code
     return [z for z in all_zones if z.zip_code in zip_set]
 
 
-def get_postal_code_geojson(zip_codes: list[str]) -> dict:
-    return load_postal_codes_for_zip_list(zip_codes)
+def get_postal_code_geojson(zip_codes: list[str], detail: GeometryDetail = GeometryDetail.full) -> dict:
+    return load_postal_codes_for_zip_list(zip_codes, detail.value)
 
 
 def get_price_trends(
@@ -598,24 +648,26 @@ def get_price_trends(
 
 
 def get_group_price_trends(
-    zip_code: str | None, fuel_group: FuelGroup, period: TrendPeriod, province: str | None = None
-) -> dict[str, list[TrendPoint]]:
+    zip_code: str | None,
+    fuel_group: FuelGroup,
+    period: TrendPeriod,
+    province: str | None = None,
+    as_arrow: bool = False,
+) -> dict[str, list[TrendPoint] | pa.Table]:
+    """Daily trend per fuel of *fuel_group*; with *as_arrow*, series served from DuckDB are Arrow tables."""
     days_back = TREND_PERIOD_DAYS[period]
     fuel_types = [ft.value for ft in FUEL_GROUP_MEMBERS[fuel_group]]
     started = time.perf_counter()
-    result: dict[str, list[TrendPoint]] = {}
+    result: dict[str, list[TrendPoint] | pa.Table] = {}
 
+    df = None
     if not zip_code:
         source = "national_aggregate"
-        df = query_national_group_price_trend(fuel_types, days_back, province=province)
-        for fuel_type, group_df in df.groupby("fuel_type"):
-            result[str(fuel_type)] = _trend_points_from_df(group_df)
+        df = query_national_group_price_trend(fuel_types, days_back, province=province, as_arrow=as_arrow)
     elif is_zip_code_trend_ready():
         source = "duckdb_trend_cache"
         _validate_zip_code(zip_code)
-        df = query_cached_group_price_trend(zip_code, fuel_types, days_back)
-        for fuel_type, group_df in df.groupby("fuel_type"):
-            result[str(fuel_type)] = _trend_points_from_df(group_df)
+        df = query_cached_group_price_trend(zip_code, fuel_types, days_back, as_arrow=as_arrow)
     else:
         source = "raw_history_fallback"
         _validate_zip_code(zip_code)
@@ -626,6 +678,12 @@ def get_group_price_trends(
             if not group_df.empty:
                 result[fuel_type] = _trend_points_from_df(group_df)
 
+    if as_arrow and df is not None:
+        result = _trend_tables_by_fuel_type(df)
+    elif df is not None:
+        for fuel_type, group_df in df.groupby("fuel_type"):
+            result[str(fuel_type)] = _trend_points_from_df(group_df)
+
     duration_ms = (time.perf_counter() - started) * 1000
     logger.info(
         "Loaded group price trends for %s/%s from %s (%s variants, %.1f ms)",
@@ -638,46 +696,30 @@ def get_group_price_trends(
     return result
 
 
-def get_province_ranking(fuel_type: FuelType, days_back: int) -> pd.DataFrame:
+def get_province_ranking(fuel_type: FuelType, days_back: int, as_arrow: bool = False) -> pd.DataFrame | pa.Table:
     from data.duckdb_engine import query_province_ranking
-    from data.gcs_client import download_aggregate
 
-    agg_df = download_aggregate("province_daily_stats.parquet")
-    if agg_df is None:
-        return pd.DataFrame()
-    return query_province_ranking(agg_df, fuel_type.value, days_back)
+    return query_province_ranking(fuel_type.value, days_back, as_arrow=as_arrow)
 
 
 def get_day_of_week_pattern(
     fuel_type: FuelType, province: str | None = None, exclude_provinces: set | None = None
 ) -> pd.DataFrame:
     from data.duckdb_engine import query_day_of_week_pattern
-    from data.gcs_client import download_aggregate
 
-    agg_df = download_aggregate("day_of_week_stats.parquet")
-    if agg_df is None:
-        return pd.DataFrame()
-    return query_day_of_week_pattern(agg_df, fuel_type.value, normalize_data_province_name(province), exclude_provinces)
+    return query_day_of_week_pattern(fuel_type.value, normalize_data_province_name(province), exclude_provinces)
 
 
 def get_brand_ranking(fuel_type: FuelType, days_back: int, top_n: int = 15) -> pd.DataFrame:
     from data.duckdb_engine import query_brand_ranking
-    from data.gcs_client import download_aggregate
 
-    agg_df = download_aggregate("brand_daily_stats.parquet")
-    if agg_df is None:
-        return pd.DataFrame()
-    return query_brand_ranking(agg_df, fuel_type.value, days_back, top_n)
+    return query_brand_ranking(fuel_type.value, days_back, top_n)
 
 
 def get_brand_price_trend(fuel_type: FuelType, days_back: int, brands: list) -> pd.DataFrame:
     from data.duckdb_engine import query_brand_price_trend
-    from data.gcs_client import download_aggregate
 
-    agg_df = download_aggregate("brand_daily_stats.parquet")
-    if agg_df is None:
-        return pd.DataFrame()
-    return query_brand_price_trend(agg_df, fuel_type.value, days_back, brands)
+    return query_brand_price_trend(fuel_type.value, days_back, brands)
 
 
 def get_brand_win_rate_report(fuel_type: str, direction: str) -> list[dict] | None:
@@ -788,8 +830,7 @@ def get_brand_coverage_report(fuel_type: str) -> list[dict] | None:
     return sorted(result, key=lambda x: x["zip_codes"], reverse=True)
 
 
-def get_zone_volatility_ranking(fuel_type: FuelType, days_back: int, mainland_only: bool = True) -> pd.DataFrame:
-    agg_df = download_aggregate("zip_code_daily_stats.parquet")
-    if agg_df is None:
-        return pd.DataFrame()
-    return query_volatility_by_zone(agg_df, fuel_type.value, days_back, mainland_only)
+def get_zone_volatility_ranking(
+    fuel_type: FuelType, days_back: int, mainland_only: bool = True, as_arrow: bool = False
+) -> pd.DataFrame | pa.Table:
+    return query_volatility_by_zone(fuel_type.value, days_back, mainland_only, as_arrow=as_arrow)
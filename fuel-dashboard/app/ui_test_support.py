@@ -6,6 +6,8 @@ from typing import Iterable
 from typing import Optional
 
 from api.schemas import AlternativePlan
+from api.schemas import BarrioMapResponse
+from api.schemas import BarrioPriceResult
 from api.schemas import BrandCoverageRow
 from api.schemas import BrandHistoricalResponse
 from api.schemas import BrandPriceComparisonRow
@@ -295,6 +297,29 @@ def zones_district_geojson_response() -> GeoJSONResponse:
     )
 
 
+def zones_barrios_response(province: str, fuel_type: FuelType, district: Optional[str]) -> BarrioMapResponse:
+    items = [
+        BarrioPriceResult(barrio="Sol", district="Centro", avg_price=1.438, station_count=4),
+        BarrioPriceResult(barrio="Embajadores", district="Centro", avg_price=1.444, station_count=6),
+        BarrioPriceResult(barrio="Castilla", district="Chamartin", avg_price=1.452, station_count=5),
+    ]
+    if district:
+        items = [item for item in items if item.district == district]
+    return BarrioMapResponse(items=items, province=province, fuel_type=fuel_type.value, district=district)
+
+
+def zones_barrio_geojson_response() -> GeoJSONResponse:
+    return GeoJSONResponse(
+        geojson=_feature_collection(
+            [
+                _square_feature("Sol", "barrio", -3.7035, 40.4168, avg_price=1.438, station_count=4),
+                _square_feature("Embajadores", "barrio", -3.702, 40.408, avg_price=1.444, station_count=6),
+                _square_feature("Castilla", "barrio", -3.684, 40.475, avg_price=1.452, station_count=5),
+            ]
+        )
+    )
+
+
 def zones_municipalities_response(province: str) -> MunicipalitiesResponse:
     municipalities = ["Getafe", "Leganes", "Mostoles"] if province.lower() == "madrid" else ["Badalona", "Terrassa"]
     return MunicipalitiesResponse(province=province, municipalities=municipalities)
@@ -303,9 +303,12 @@ let zonesMap, zonesLayer;
 const zonesState = {
   currentProvince: null,
   currentDistrict: null,
+  currentBarrio: null,
   currentMunicipality: null,
   provinceItems: [],
   provinceGeojson: null,
+  districtItems: [],
+  districtGeojson: null,
   baseGeojson: null,
   detailType: null,
   detailItems: [],
@@ -383,6 +386,7 @@ function setDetailPanel({ title, caption, html }) {
 function hideDetailPanel() {
   zonesState.currentProvince = null;
   zonesState.currentDistrict = null;
+  zonesState.currentBarrio = null;
   zonesState.currentMunicipality = null;
   zonesState.detailType = null;
   zonesState.detailItems = [];
@@ -393,7 +397,7 @@ function renderDistrictList(items) {
   const activeDistrict = zonesState.currentDistrict;
   setDetailPanel({
     title: `Distritos · ${zonesState.currentProvince}`,
-    caption: "Selecciona un distrito para pintar en el mapa sus códigos postales.",
+    caption: "Selecciona un distrito para ver sus barrios.",
     html: items.map((it) => `
       <button type="button" data-district="${escapeHtml(it.district)}" class="${zoneButtonClass(activeDistrict === it.district)}">
         <span class="font-medium">${escapeHtml(it.district)}</span>
@@ -404,7 +408,38 @@ function renderDistrictList(items) {
       </button>`).join("") || emptyMsg("Sin distritos"),
   });
   document.querySelectorAll("#zones-districts button[data-district]").forEach((button) => {
-    button.addEventListener("click", () => loadDistrictZipOverlay(zonesState.currentProvince, button.dataset.district));
+    button.addEventListener("click", () => loadBarrios(zonesState.currentProvince, button.dataset.district));
+  });
+}
+
+function renderBarrioList(items) {
+  const { currentDistrict: district, currentBarrio: activeBarrio } = zonesState;
+  setDetailPanel({
+    title: `Barrios · ${district}`,
+    caption: "Selecciona un barrio para pintar en el mapa sus códigos postales.",
+    html: `
+      <button type="button" data-zones-back class="${zoneButtonClass()}">
+        <span class="font-medium">← Distritos</span>
+        <span class="text-sm text-outline">${escapeHtml(zonesState.currentProvince)}</span>
+      </button>
+      <button type="button" data-district-zips class="${zoneButtonClass(activeBarrio === "")}">
+        <span class="font-medium">Todo ${escapeHtml(district)}</span>
+        <span class="text-sm text-outline">Ver códigos postales</span>
+      </button>` + (items.map((it) => `
+      <button type="button" data-barrio="${escapeHtml(it.barrio)}" class="${zoneButtonClass(activeBarrio === it.barrio)}">
+        <span class="font-medium">${escapeHtml(it.barrio)}</span>
+        <span class="flex gap-3 text-sm">
+          <span class="text-outline">${it.station_count} est.</span>
+          <span class="font-headline font-bold text-primary-container">${formatPrice(it.avg_price)}</span>
+        </span>
+      </button>`).join("") || emptyMsg("Sin barrios")),
+  });
+  document.querySelector("#zones-districts button[data-zones-back]").addEventListener("click", showDistricts);
+  document.querySelector("#zones-districts button[data-district-zips]").addEventListener("click", () => {
+    loadDistrictZipOverlay(zonesState.currentProvince, district);
+  });
+  document.querySelectorAll("#zones-districts button[data-barrio]").forEach((button) => {
+    button.addEventListener("click", () => loadBarrioZipOverlay(zonesState.currentProvince, button.dataset.barrio));
   });
 }
 
@@ -431,7 +466,7 @@ async function drawZipOverlay(zones, scopeLabel) {
     return;
   }
   const zipCodes = zones.map((zone) => zone.zip_code);
-  const { geojson } = await api(`/zones/postal-geojson?${qs({ zip_codes: zipCodes })}`);
+  const { geojson } = await api(`/zones/postal-geojson?${qs({ zip_codes: zipCodes, detail: "high" })}`);
   const priceByZip = new Map(zones.map((zone) => [zone.zip_code, zone]));
   for (const feature of geojson.features || []) {
     const zipCode = String(feature.properties?.COD_POSTAL || "").trim();
@@ -460,7 +495,8 @@ async function loadProvinceMap() {
   try {
     const [resp, geoResp] = await Promise.all([
       api(`/zones/province-map?${qs(params)}`),
-      api(`/zones/province-geojson?${qs(params)}`),
+      // Country-wide view: the coarsest outlines are indistinguishable at this zoom.
+      api(`/zones/province-geojson?${qs({ ...params, detail: "low" })}`),
     ]);
     const items = resp.items || [];
     items.sort((a, b) => a.avg_price - b.avg_price);
@@ -481,6 +517,7 @@ async function loadProvinceMap() {
 async function openProvinceDetail(province) {
   zonesState.currentProvince = province;
   zonesState.currentDistrict = null;
+  zonesState.currentBarrio = null;
   zonesState.currentMunicipality = null;
   renderProvinceList(zonesState.provinceItems);
   if (isMadridProvince(province)) {
@@ -496,16 +533,13 @@ async function loadDistricts(province) {
   try {
     const [resp, geoResp] = await Promise.all([
       api(`/zones/districts?${qs({ province, fuel_type: fuel })}`),
-      api(`/zones/district-geojson?${qs({ province, fuel_type: fuel })}`),
+      api(`/zones/district-geojson?${qs({ province, fuel_type: fuel, detail: "high" })}`),
     ]);
     const items = resp.items || [];
     items.sort((a, b) => a.avg_price - b.avg_price);
-    zonesState.detailType = "district";
-    zonesState.detailItems = items;
-    zonesState.baseGeojson = geoResp.geojson || zonesState.provinceGeojson;
-    setZonesLayer(zonesState.baseGeojson);
-    renderDistrictList(items);
-    showZonesStatus("info", "Madrid admite un segundo nivel de detalle por distritos.");
+    zonesState.districtItems = items;
+    zonesState.districtGeojson = geoResp.geojson || zonesState.provinceGeojson;
+    showDistricts();
   } catch (err) {
     setZonesLayer(zonesState.provinceGeojson);
     setDetailPanel({ title: `Distritos · ${province}`, caption: err.message, html: emptyMsg(err.message) });
@@ -513,9 +547,57 @@ async function loadDistricts(province) {
   }
 }
 
-async function loadDistrictZipOverlay(province, district) {
+function showDistricts() {
+  zonesState.currentDistrict = null;
+  zonesState.currentBarrio = null;
+  zonesState.detailType = "district";
+  zonesState.detailItems = zonesState.districtItems;
+  zonesState.baseGeojson = zonesState.districtGeojson;
+  setZonesLayer(zonesState.baseGeojson);
+  renderDistrictList(zonesState.districtItems);
+  showZonesStatus("info", "Madrid admite dos niveles más de detalle: distritos y, dentro de cada uno, barrios.");
+}
+
+async function loadBarrios(province, district) {
+  const fuel = document.getElementById("zones-fuel").value;
   zonesState.currentDistrict = district;
-  renderDistrictList(zonesState.detailItems);
+  zonesState.currentBarrio = null;
+  renderDistrictList(zonesState.districtItems);
+  try {
+    const [resp, geoResp] = await Promise.all([
+      api(`/zones/barrios?${qs({ province, district, fuel_type: fuel })}`),
+      api(`/zones/barrio-geojson?${qs({ province, district, fuel_type: fuel, detail: "high" })}`),
+    ]);
+    const items = resp.items || [];
+    items.sort((a, b) => a.avg_price - b.avg_price);
+    zonesState.detailType = "barrio";
+    zonesState.detailItems = items;
+    zonesState.baseGeojson = geoResp.geojson || zonesState.districtGeojson;
+    setZonesLayer(zonesState.baseGeojson);
+    renderBarrioList(items);
+    showZonesStatus("info", `Selecciona un barrio de ${district} para ver sus códigos postales en el mapa.`);
+  } catch (err) {
+    setZonesLayer(zonesState.districtGeojson);
+    showZonesStatus("error", err.message);
+  }
+}
+
+async function loadBarrioZipOverlay(province, barrio) {
+  zonesState.currentBarrio = barrio;
+  renderBarrioList(zonesState.detailItems);
+  try {
+    const resp = await api(`/zones/barrio-zips?${qs({ province, barrio, fuel_type: document.getElementById("zones-fuel").value })}`);
+    await drawZipOverlay(resp.zones || [], `${barrio}, ${zonesState.currentDistrict}`);
+  } catch (err) {
+    setZonesLayer(zonesState.baseGeojson);
+    showZonesStatus("error", err.message);
+  }
+}
+
+async function loadDistrictZipOverlay(province, district) {
+  // "" marks the whole district as the active entry of the barrio list.
+  zonesState.currentBarrio = "";
+  renderBarrioList(zonesState.detailItems);
   try {
     const resp = await api(`/zones/district-zips?${qs({ province, district, fuel_type: document.getElementById("zones-fuel").value })}`);
     await drawZipOverlay(resp.zones || [], `${district}, ${province}`);
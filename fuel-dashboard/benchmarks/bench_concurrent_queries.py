@@ -0,0 +1,84 @@
+"""Concurrent read latency for the DuckDB engine.
+
+Fires station and zone queries from a thread pool (like FastAPI's sync handler pool) and
+reports per-query p50/p99 from ``get_query_stats()``. ``--serial`` restores the old behaviour —
+one global lock around a single shared connection — for a before/after comparison.
+
+    cd fuel-dashboard && python benchmarks/bench_concurrent_queries.py --threads 16
+    cd fuel-dashboard && python benchmarks/bench_concurrent_queries.py --threads 16 --serial
+"""
+
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from _common import make_stations_df
+from _common import PROVINCES
+
+import data.duckdb_engine as engine
+
+
+class _SerialLock:
+    """Single mutex for both readers and writers — the pre-pool behaviour."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def read(self):
+        with self._lock:
+            yield
+
+    write = read
+
+
+def _workload(rng: random.Random):
+    lat = rng.uniform(36.5, 43.5)
+    lon = rng.uniform(-9.0, 3.0)
+    province = rng.choice(PROVINCES)
+    choice = rng.randrange(4)
+    if choice == 0:
+        engine.query_nearest_stations(lat, lon, "diesel_a_price", 15)
+    elif choice == 1:
+        engine.query_stations_within_radius(lat, lon, "gasoline_95_e5_price", 10.0)
+    elif choice == 2:
+        engine.query_cheapest_zones(province, "diesel_a_price")
+    else:
+        engine.query_avg_price_by_province("gasoline_95_e5_price")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=12_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--serial", action="store_true", help="emulate the old single global lock")
+    args = parser.parse_args()
+
+    engine.replace_latest_stations(make_stations_df(args.stations))
+    if args.serial:
+        engine._rw_lock = _SerialLock()
+        engine._thread_cursor = engine.get_connection
+    engine.reset_query_stats()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        for future in [pool.submit(_workload, random.Random(i)) for i in range(args.requests)]:
+            future.result()
+    wall_s = time.perf_counter() - started
+
+    mode = "serial (global lock)" if args.serial else "pooled (thread cursors + rw lock)"
+    print(f"{mode}: {args.requests} queries, {args.threads} threads, {args.requests / wall_s:.0f} q/s")
+    print(f"{'query':<36}{'count':>7}{'p50 ms':>10}{'p99 ms':>10}{'lock wait ms':>15}")
+    for name, stats in sorted(engine.get_query_stats().items()):
+        print(
+            f"{name:<36}{stats['count']:>7}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+            f"{stats['lock_wait_ms_total']:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Madrid district and barrio endpoints: where stations are matched to district and barrio polygons.
+
+Loads a synthetic snapshot with ``--stations`` stations spread over Madrid province into the
+engine, then runs ``/zones/districts``, ``/zones/district-zips`` and ``/zones/barrios`` for the real
+polygons three ways:
+
+- python:    per request, every station tested against every district (or barrio) ring with
+             ``point_in_multipolygon()``, plus a second ``iterrows()`` pass for the district's zips
+- numpy:     per request, ``PolygonIndex.lookup()`` (bounding-box prefilter, precomputed edge arrays);
+             barrios via ``NestedPolygonIndex.lookup()``, only within each station's district
+- snapshot:  ``get_district_price_map()`` / ``get_zip_codes_for_district()`` /
+             ``get_barrio_price_map()``, a SQL GROUP BY over the ``district`` and ``barrio``
+             columns assigned once when the snapshot is loaded
+
+and reports per-request p50/p99 (with the snapshot query cache bypassed) and the one-off cost of
+assigning the polygons at load time.
+
+    cd fuel-dashboard && python benchmarks/bench_district_assignment.py --stations 2500
+"""
+
+import argparse
+import time
+
+import numpy as np
+from _common import make_stations_df
+from _common import percentile
+
+import data.duckdb_engine as engine
+from api.schemas import FuelType
+from services.geo_utils import point_in_multipolygon
+from services.station_service import get_zip_code_price_map_for_zips
+
+from data.geojson_loader import load_madrid_barrio_index
+from data.geojson_loader import load_madrid_barrios
+from data.geojson_loader import load_madrid_district_index
+from data.geojson_loader import load_madrid_districts
+
+_FUEL = FuelType.diesel_a_price
+_DISTRICT = "Centro"
+_STATIONS_SQL = f"""
+    SELECT latitude, longitude, zip_code, {_FUEL.value} AS price
+    FROM latest_stations
+    WHERE province = 'madrid' AND {_FUEL.value} > 0 AND latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+
+def _make_madrid_stations(stations: int):
+    rng = np.random.default_rng(3)
+    df = make_stations_df(stations).assign(province="madrid")
+    # Half inside the city's districts, the rest over the rest of the province.
+    city = rng.random(stations) < 0.5
+    df["latitude"] = np.where(city, rng.uniform(40.32, 40.55, stations), rng.uniform(39.9, 41.1, stations))
+    df["longitude"] = np.where(city, rng.uniform(-3.83, -3.53, stations), rng.uniform(-4.5, -3.1, stations))
+    df["zip_code"] = [f"28{i % 100:03d}" for i in range(stations)]
+    return df
+
+
+def _stations():
+    with engine._reader("bench_district_stations") as conn:
+        return conn.execute(_STATIONS_SQL).fetchdf()
+
+
+def _python_assign(df, features) -> dict[str, dict[str, float]]:
+    result: dict[str, dict[str, float]] = {}
+    for lat, lon, price in zip(df["latitude"].tolist(), df["longitude"].tolist(), df["price"].tolist()):
+        for feature in features:
+            name = feature["properties"]["nombre"]
+            if point_in_multipolygon(lat, lon, feature["geometry"]):
+                entry = result.setdefault(name, {"total_price": 0.0, "count": 0})
+                entry["total_price"] += price
+                entry["count"] += 1
+                break
+    return result
+
+
+def _python_districts():
+    aggregated = _python_assign(_stations(), load_madrid_districts()["features"])
+    return sorted((data["total_price"] / data["count"], name) for name, data in aggregated.items())
+
+
+def _python_district_zips():
+    features = load_madrid_districts()["features"]
+    df = _stations()
+    if _DISTRICT not in _python_assign(df, features):
+        return []
+    feature = next(f for f in features if f["properties"]["nombre"] == _DISTRICT)
+    zips = {
+        str(row["zip_code"])
+        for _, row in df.iterrows()
+        if point_in_multipolygon(row["latitude"], row["longitude"], feature["geometry"])
+    }
+    return get_zip_code_price_map_for_zips("madrid", _FUEL, sorted(zips))
+
+
+def _python_barrios():
+    aggregated = _python_assign(_stations(), load_madrid_barrios()["features"])
+    return sorted((data["total_price"] / data["count"], name) for name, data in aggregated.items())
+
+
+def _numpy_districts():
+    df = _stations()
+    districts = load_madrid_district_index().lookup(df["latitude"].to_numpy(), df["longitude"].to_numpy())
+    prices = df.assign(district=districts).dropna(subset=["district"]).groupby("district")["price"].mean()
+    return sorted((price, name) for name, price in prices.items())
+
+
+def _numpy_district_zips():
+    df = _stations()
+    index = load_madrid_district_index()
+    located = index.locate(df["latitude"].to_numpy(), df["longitude"].to_numpy())
+    zips = sorted(set(df.loc[located == index.names.index(_DISTRICT), "zip_code"].astype(str)))
+    return get_zip_code_price_map_for_zips("madrid", _FUEL, zips)
+
+
+def _numpy_barrios():
+    df = _stations()
+    _, barrios = load_madrid_barrio_index().lookup(df["latitude"].to_numpy(), df["longitude"].to_numpy())
+    prices = df.assign(barrio=barrios).dropna(subset=["barrio"]).groupby("barrio")["price"].mean()
+    return sorted((price, name) for name, price in prices.items())
+
+
+def _snapshot_districts():
+    df = engine.query_avg_price_by_district.__wrapped__("madrid", _FUEL.value)
+    return list(zip(df["avg_price"], df["district"]))
+
+
+def _snapshot_district_zips():
+    zips = engine.query_zip_codes_by_district.__wrapped__("madrid", _FUEL.value, _DISTRICT)
+    return get_zip_code_price_map_for_zips("madrid", _FUEL, zips)
+
+
+def _snapshot_barrios():
+    df = engine.query_avg_price_by_barrio.__wrapped__("madrid", _FUEL.value)
+    return list(zip(df["avg_price"], df["barrio"]))
+
+
+def _latency(call, requests: int) -> tuple[float, float]:
+    call()
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentile(samples, 0.5), percentile(samples, 0.99)
+
+
+def _rounded(rows):
+    return [(round(float(price), 9), name) for price, name in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=2_500)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--python-requests", type=int, default=5, help="requests for the slow python path")
+    args = parser.parse_args()
+
+    df = _make_madrid_stations(args.stations)
+    started = time.perf_counter()
+    load_madrid_barrio_index()
+    index_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    engine._with_station_polygons(df)
+    assign_ms = (time.perf_counter() - started) * 1000
+    engine.replace_latest_stations(df)
+
+    assert _rounded(_python_districts()) == _rounded(_numpy_districts()) == _rounded(_snapshot_districts())
+    zips = [[zone.zip_code for zone in call()] for call in (_python_district_zips, _numpy_district_zips)]
+    assert zips[0] == zips[1] == [zone.zip_code for zone in _snapshot_district_zips()]
+    # The python path tests every barrio, so a station on a sliver between districts may land in a
+    # barrio of the neighbouring district; the numpy and snapshot paths agree exactly.
+    assert sorted(_rounded(_numpy_barrios())) == sorted(_rounded(_snapshot_barrios()))
+
+    print(f"{args.stations} stations in Madrid province")
+    print(f"district and barrio indexes built in {index_ms:.1f} ms, stations assigned at load in {assign_ms:.1f} ms")
+    print(f"{'endpoint':<22}{'python p50':>12}{'p99':>9}{'numpy p50':>11}{'p99':>8}{'snapshot p50':>14}{'p99':>8}")
+    for endpoint, calls in (
+        ("/zones/districts", (_python_districts, _numpy_districts, _snapshot_districts)),
+        ("/zones/district-zips", (_python_district_zips, _numpy_district_zips, _snapshot_district_zips)),
+        ("/zones/barrios", (_python_barrios, _numpy_barrios, _snapshot_barrios)),
+    ):
+        python = _latency(calls[0], args.python_requests)
+        numpy = _latency(calls[1], args.requests)
+        snapshot = _latency(calls[2], args.requests)
+        print(
+            f"{endpoint:<22}{python[0]:>12.2f}{python[1]:>9.2f}{numpy[0]:>11.2f}{numpy[1]:>8.2f}"
+            f"{snapshot[0]:>14.2f}{snapshot[1]:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
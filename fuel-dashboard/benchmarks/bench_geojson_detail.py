@@ -0,0 +1,82 @@
+"""Zone GeoJSON endpoints: payload size and serialization time per ``detail=`` level.
+
+For each boundary set, builds the response body the endpoint would return at every
+``GeometryDetail`` level and reports its vertex count, JSON size and p50 time to serialize it
+through the ``GeoJSONResponse`` model, plus the one-off cost of simplifying the set to that level:
+
+- provinces:  ``spain-provinces.geojson``, when bundled in ``app/data/geojson``
+- districts:  Madrid's 21 districts (``/zones/district-geojson``)
+- barrios:    Madrid's 131 barrios (``/zones/barrio-geojson``)
+- postal:     ``--zips`` of 11000 synthetic postal codes (``/zones/postal-geojson`` for a district's worth)
+
+    cd fuel-dashboard && python benchmarks/bench_geojson_detail.py --zips 40 --vertices 400
+"""
+
+import argparse
+import time
+
+from _common import make_postal_features
+from _common import percentile
+
+from api.schemas import GeoJSONResponse
+from api.schemas import GeometryDetail
+from services.geo_utils import simplify_feature
+
+import data.geojson_loader as loader
+
+
+def _vertices(geojson: dict) -> int:
+    count = 0
+    for feature in geojson["features"]:
+        geometry = feature["geometry"]
+        polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+        count += sum(len(ring) for polygon in polygons for ring in polygon)
+    return count
+
+
+def _serialize(geojson: dict, requests: int) -> tuple[int, float]:
+    body = GeoJSONResponse(geojson=geojson).model_dump_json()
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        GeoJSONResponse(geojson=geojson).model_dump_json()
+        samples.append((time.perf_counter() - started) * 1000)
+    return len(body), percentile(samples, 0.5)
+
+
+def _boundary_sets(zips: int, vertices: int) -> dict[str, dict]:
+    sets = {}
+    if (loader._GEOJSON_DIR / "spain-provinces.geojson").exists():
+        sets["provinces"] = loader.load_provinces_geojson()
+    sets["districts"] = loader.load_madrid_districts()
+    sets["barrios"] = loader.load_madrid_barrios()
+    sets["postal"] = {"type": "FeatureCollection", "features": make_postal_features(11_000, vertices)[:zips]}
+    return sets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zips", type=int, default=40, help="postal codes in the postal-geojson body")
+    parser.add_argument("--vertices", type=int, default=400, help="vertices per synthetic postal boundary")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'set':<11}{'detail':<8}{'vertices':>10}{'body KB':>10}{'vs full':>9}{'serialize ms':>14}{'simplify ms':>13}"
+    )
+    for name, geojson in _boundary_sets(args.zips, args.vertices).items():
+        full_size = None
+        for detail in (GeometryDetail.full, GeometryDetail.high, GeometryDetail.medium, GeometryDetail.low):
+            started = time.perf_counter()
+            simplified = {**geojson, "features": [simplify_feature(f, detail.value) for f in geojson["features"]]}
+            simplify_ms = (time.perf_counter() - started) * 1000
+            size, serialize_ms = _serialize(simplified, args.requests)
+            full_size = full_size or size
+            print(
+                f"{name:<11}{detail.value:<8}{_vertices(simplified):>10}{size / 1024:>10.1f}"
+                f"{size / full_size:>9.0%}{serialize_ms:>14.2f}{simplify_ms:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
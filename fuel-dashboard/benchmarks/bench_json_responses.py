@@ -0,0 +1,149 @@
+"""Response encoding cost of the large tabular endpoints: Arrow JSON fast path vs. the model path.
+
+Loads a synthetic zip-code trend snapshot and province aggregate into the engine, then serves
+each endpoint's query two ways from a throwaway FastAPI app:
+
+- model:  ``fetchdf()`` -> ``_rows()`` -> Pydantic response model -> FastAPI JSON serialization
+- arrow:  ``fetch_arrow_table()`` -> ``arrow_json_response()``
+
+and reports per-request p50/p99 through ``TestClient`` together with the body size.
+
+    cd fuel-dashboard && python benchmarks/bench_json_responses.py --zips 4000 --days 120
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from _common import percentile
+from _common import PROVINCES
+
+import data.duckdb_engine as engine
+from api.arrow_json import arrow_json_response
+from api.router import _rows
+from api.schemas import DataFrameResponse
+from api.schemas import FuelGroup
+from api.schemas import GroupTrendResponse
+from api.schemas import TrendPeriod
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from services.station_service import get_group_price_trends
+
+_DIESEL_FUELS = ("diesel_a_price", "diesel_b_price", "diesel_premium_price")
+
+
+def _make_zip_trend_df(zips: int, days: int) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days).date
+    zip_codes = [f"{1 + i % 52:02d}{i // 52:03d}" for i in range(zips)]
+    provinces = [PROVINCES[i % len(PROVINCES)] for i in range(zips)]
+    frames = []
+    for fuel_type in _DIESEL_FUELS:
+        n = days * zips
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": np.repeat(dates, zips),
+                    "zip_code": np.tile(zip_codes, days),
+                    "province": np.tile(provinces, days),
+                    "fuel_type": fuel_type,
+                    "avg_price": rng.uniform(1.3, 1.9, n),
+                    "min_price": rng.uniform(1.2, 1.3, n),
+                    "max_price": rng.uniform(1.9, 2.0, n),
+                    "station_count": rng.integers(3, 20, n),
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def _province_daily_stats(trend_df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        trend_df.groupby(["date", "province", "fuel_type"], as_index=False)
+        .agg(avg_price=("avg_price", "mean"), min_price=("min_price", "min"), max_price=("max_price", "max"))
+        .assign(station_count=100)
+    )
+
+
+def _build_app(days: int) -> FastAPI:
+    app = FastAPI()
+    fuel = "diesel_a_price"
+
+    @app.get("/model/volatility", response_model=DataFrameResponse)
+    def model_volatility():
+        return DataFrameResponse(rows=_rows(engine.query_volatility_by_zone(fuel, days, False)))
+
+    @app.get("/arrow/volatility")
+    def arrow_volatility():
+        return arrow_json_response({"rows": engine.query_volatility_by_zone(fuel, days, False, as_arrow=True)})
+
+    @app.get("/model/provinces", response_model=DataFrameResponse)
+    def model_provinces():
+        return DataFrameResponse(rows=_rows(engine.query_province_ranking(fuel, days)))
+
+    @app.get("/arrow/provinces")
+    def arrow_provinces():
+        return arrow_json_response({"rows": engine.query_province_ranking(fuel, days, as_arrow=True)})
+
+    @app.get("/model/trends-group", response_model=GroupTrendResponse)
+    def model_trends_group():
+        series = get_group_price_trends(None, FuelGroup.diesel, TrendPeriod.year)
+        return GroupTrendResponse(series=series, zip_code=None, fuel_group="diesel", period="year")
+
+    @app.get("/arrow/trends-group")
+    def arrow_trends_group():
+        series = get_group_price_trends(None, FuelGroup.diesel, TrendPeriod.year, as_arrow=True)
+        return arrow_json_response({"series": series, "zip_code": None, "fuel_group": "diesel", "period": "year"})
+
+    return app
+
+
+def _same_payload(model, arrow) -> bool:
+    """Compare two decoded bodies, allowing float rounding and "YYYY-MM-DD 00:00:00" vs. "YYYY-MM-DD" dates."""
+    if isinstance(model, dict):
+        return model.keys() == arrow.keys() and all(_same_payload(model[key], arrow[key]) for key in model)
+    if isinstance(model, list):
+        return len(model) == len(arrow) and all(_same_payload(m, a) for m, a in zip(model, arrow))
+    if isinstance(model, float) and isinstance(arrow, (int, float)):
+        return math.isclose(model, arrow, rel_tol=1e-9)
+    if isinstance(model, str) and isinstance(arrow, str) and model[:10] == arrow[:10]:
+        return True
+    return model == arrow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zips", type=int, default=4_000)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    trend_df = _make_zip_trend_df(args.zips, args.days)
+    engine._swap_snapshot(engine.ZIP_CODE_TREND_TABLE, trend_df)
+    engine._zip_code_trend_ready.set()
+    aggregates = {"province_daily_stats.parquet": pa.Table.from_pandas(_province_daily_stats(trend_df))}
+    engine.download_aggregate_table = aggregates.get
+
+    client = TestClient(_build_app(min(args.days, 90)))
+    print(f"{len(trend_df)} trend rows ({args.zips} zips x {args.days} days x {len(_DIESEL_FUELS)} fuels)")
+    print(f"{'endpoint':<28}{'KB':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for endpoint in ("volatility", "provinces", "trends-group"):
+        bodies = {}
+        for path in ("model", "arrow"):
+            samples = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                response = client.get(f"/{path}/{endpoint}")
+                samples.append((time.perf_counter() - started) * 1000)
+            bodies[path] = response.json()
+            size_kb = len(response.content) / 1024
+            label = f"{endpoint} ({path})"
+            print(f"{label:<28}{size_kb:>8.0f}{percentile(samples, 0.5):>10.1f}{percentile(samples, 0.99):>10.1f}")
+        assert _same_payload(bodies["model"], bodies["arrow"]), endpoint
+
+
+if __name__ == "__main__":
+    main()
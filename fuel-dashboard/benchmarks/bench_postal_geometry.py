@@ -0,0 +1,102 @@
+"""Postal-code boundaries: gzipped GeoJSON loaded whole vs. the memory-mapped binary store.
+
+Writes a synthetic ``spain-postal-codes.geojson.gz`` with ``--zips`` boundaries of ``--vertices``
+vertices each (about a tenth of them MultiPolygons) and converts it with
+``write_postal_geometry_store()``, as the Dockerfile's asset-builder does. Each layout is then
+measured in a fresh process:
+
+- geojson:  ``_ensure_postal_index()`` gunzips and parses every boundary on the first request
+- store:    ``PostalGeometryStore`` maps the file and decodes only the requested zip
+
+and reports the resident memory (VmRSS) before and after the first ``/zones/postal-geojson`` body,
+its latency and the p50 of later requests.
+
+    cd fuel-dashboard && python benchmarks/bench_postal_geometry.py --zips 11000 --vertices 400
+"""
+
+import argparse
+import gzip
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from _common import make_postal_features
+from _common import percentile
+
+import data.geojson_loader as loader
+from data.postal_geometry import write_postal_geometry_store
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status", encoding="ascii") as f:
+        kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    return kb / 1024
+
+
+def _child(directory: str, requests: int) -> None:
+    codes = (Path(directory) / "codes.txt").read_text().split()
+    with patch.object(loader, "_GEOJSON_DIR", Path(directory)):
+        rss_before = _rss_mb()
+        started = time.perf_counter()
+        loader.load_postal_codes_for_zip_list(codes[:3])
+        first_ms = (time.perf_counter() - started) * 1000
+        rss_first = _rss_mb()
+        samples = []
+        for i in range(requests):
+            started = time.perf_counter()
+            loader.load_postal_codes_for_zip_list(codes[slice(i * 3 % len(codes), i * 3 % len(codes) + 3)])
+            samples.append((time.perf_counter() - started) * 1000)
+    print(json.dumps([rss_before, first_ms, rss_first, percentile(samples, 0.5)]))
+
+
+def _measure(directory: str, requests: int) -> list[float]:
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", directory, "--requests", str(requests)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zips", type=int, default=11_000)
+    parser.add_argument("--vertices", type=int, default=400)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child, args.requests)
+        return
+
+    features = make_postal_features(args.zips, args.vertices)
+    codes = [feature["properties"]["COD_POSTAL"] for feature in features]
+    np.random.default_rng(5).shuffle(codes)
+    with tempfile.TemporaryDirectory() as geojson_dir, tempfile.TemporaryDirectory() as store_dir:
+        for directory in (geojson_dir, store_dir):
+            (Path(directory) / "codes.txt").write_text("\n".join(codes))
+        geojson_path = Path(geojson_dir) / "spain-postal-codes.geojson.gz"
+        with gzip.open(geojson_path, mode="wt", encoding="utf-8", compresslevel=9) as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f, separators=(",", ":"))
+        store_path = Path(store_dir) / "spain-postal-codes.bin"
+        started = time.perf_counter()
+        write_postal_geometry_store(features, store_path)
+        build_s = time.perf_counter() - started
+        del features
+        results = {"geojson": _measure(geojson_dir, args.requests), "store": _measure(store_dir, args.requests)}
+        sizes = {"geojson": geojson_path.stat().st_size / 1e6, "store": store_path.stat().st_size / 1e6}
+
+    print(f"{args.zips} postal codes x {args.vertices} vertices, store built in {build_s:.1f} s")
+    print(f"{'layout':<9}{'file MB':>9}{'RSS MB':>9}{'1st req ms':>12}{'RSS after':>11}{'p50 ms':>8}")
+    for layout, (rss_before, first_ms, rss_first, p50_ms) in results.items():
+        print(f"{layout:<9}{sizes[layout]:>9.1f}{rss_before:>9.0f}{first_ms:>12.1f}{rss_first:>11.0f}{p50_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
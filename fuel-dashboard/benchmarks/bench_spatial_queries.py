@@ -0,0 +1,83 @@
+"""Per-query cost of radius and nearest-station search: grid index vs. full Haversine scan.
+
+Loads a synthetic snapshot (100k stations by default, roughly Spain + Portugal + EV chargers)
+through ``replace_latest_stations`` so it carries the grid columns, then times the indexed
+query functions against the pre-index SQL that evaluates Haversine on every row.
+
+    cd fuel-dashboard && python benchmarks/bench_spatial_queries.py --stations 100000
+"""
+
+import argparse
+import random
+
+from _common import make_stations_df
+from _common import percentile
+from _common import timed
+
+import data.duckdb_engine as engine
+
+_FULL_SCAN_SQL = """
+    SELECT * FROM (
+        SELECT label, address, municipality, province, zip_code, latitude, longitude, diesel_a_price,
+            2 * 6371 * ASIN(SQRT(
+                POWER(SIN(RADIANS(latitude - $1) / 2), 2) +
+                COS(RADIANS($1)) * COS(RADIANS(latitude)) *
+                POWER(SIN(RADIANS(longitude - $2) / 2), 2)
+            )) AS distance_km
+        FROM latest_stations
+        WHERE diesel_a_price IS NOT NULL AND diesel_a_price > 0
+            AND latitude IS NOT NULL AND longitude IS NOT NULL
+    ) {where}
+    ORDER BY distance_km ASC
+    {limit}
+"""
+
+
+def _full_scan_radius(lat, lon, radius_km):
+    sql = _FULL_SCAN_SQL.format(where="WHERE distance_km <= $3", limit="")
+    return engine.get_connection().execute(sql, [lat, lon, radius_km]).fetchdf()
+
+
+def _full_scan_nearest(lat, lon, limit):
+    sql = _FULL_SCAN_SQL.format(where="", limit="LIMIT $3")
+    return engine.get_connection().execute(sql, [lat, lon, limit]).fetchdf()
+
+
+def _report(label: str, samples: list[float]):
+    print(f"{label:<34}{percentile(samples, 0.5):>10.2f}{percentile(samples, 0.99):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius-km", type=float, default=6.5)
+    parser.add_argument("--limit", type=int, default=15)
+    args = parser.parse_args()
+
+    engine.replace_latest_stations(make_stations_df(args.stations))
+    rng = random.Random(11)
+    points = [(rng.uniform(36.5, 43.5), rng.uniform(-9.0, 3.0)) for _ in range(args.queries)]
+
+    results = {"radius (grid)": [], "radius (full scan)": [], "nearest (grid)": [], "nearest (full scan)": []}
+    for lat, lon in points:
+        indexed_ms, indexed = timed(engine.query_stations_within_radius, lat, lon, "diesel_a_price", args.radius_km)
+        scan_ms, scanned = timed(_full_scan_radius, lat, lon, args.radius_km)
+        assert indexed["label"].tolist() == scanned["label"].tolist()
+        results["radius (grid)"].append(indexed_ms)
+        results["radius (full scan)"].append(scan_ms)
+
+        indexed_ms, indexed = timed(engine.query_nearest_stations, lat, lon, "diesel_a_price", args.limit)
+        scan_ms, scanned = timed(_full_scan_nearest, lat, lon, args.limit)
+        assert indexed["distance_km"].round(6).tolist() == scanned["distance_km"].round(6).tolist()
+        results["nearest (grid)"].append(indexed_ms)
+        results["nearest (full scan)"].append(scan_ms)
+
+    print(f"{args.stations} stations, {args.queries} queries, radius {args.radius_km} km, limit {args.limit}")
+    print(f"{'query':<34}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, samples in results.items():
+        _report(label, samples)
+
+
+if __name__ == "__main__":
+    main()
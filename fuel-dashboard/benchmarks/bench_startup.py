@@ -0,0 +1,150 @@
+"""Time-to-first-200: how long a freshly started server takes to serve the home page with data.
+
+Spawns ``python main.py`` as a real process and polls ``/`` until it stops returning the 503
+loading page. ``warm`` boots from a warm-start directory pre-filled with a synthetic snapshot;
+``cold`` boots with warm start disabled, so it has to wait for the first GCS refresh (it needs
+credentials for the bucket and otherwise reports a timeout). Real-time refresh is disabled in
+both runs so the measurement is not dominated by the government API.
+
+The warm path is also timed in-process: ``load_warm_snapshot()`` as a whole, the part of it spent
+reading the Arrow files, and the part rebuilding the stations snapshot with its rollups.
+
+    cd fuel-dashboard && python benchmarks/bench_startup.py --stations 12000 --runs 3
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from _common import APP_DIR
+from _common import make_stations_df
+from _common import percentile
+
+from config import settings
+import data.duckdb_engine as engine
+
+
+def _make_zip_trend_df(days: int = 365, zips: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days).date
+    n = days * zips
+    return pd.DataFrame(
+        {
+            "date": np.repeat(dates, zips),
+            "zip_code": np.tile([f"28{i:03d}" for i in range(zips)], days),
+            "province": "madrid",
+            "fuel_type": "diesel_a_price",
+            "avg_price": rng.uniform(1.3, 1.9, n),
+            "min_price": rng.uniform(1.2, 1.3, n),
+            "max_price": rng.uniform(1.9, 2.0, n),
+            "station_count": rng.integers(1, 20, n),
+        }
+    )
+
+
+def _prepare_warm_start_dir(path: str, stations: int) -> None:
+    settings.warm_start_dir = path
+    engine.replace_latest_stations(make_stations_df(stations))
+    engine._swap_snapshot(engine.ZIP_CODE_TREND_TABLE, _make_zip_trend_df())
+    engine.save_warm_snapshot("latest_stations")
+    engine.save_warm_snapshot(engine.ZIP_CODE_TREND_TABLE)
+
+
+def _time_warm_load(path: str, runs: int) -> dict[str, float]:
+    """p50 ms of ``load_warm_snapshot()`` and of its Arrow read and stations rebuild, in this process."""
+    samples = {"read": [], "stations": [], "total": []}
+    for _ in range(runs):
+        started = time.perf_counter()
+        tables = {}
+        for name in engine.WARM_START_TABLES:
+            with pa.memory_map(str(Path(path) / f"{name}.arrow")) as source:
+                tables[name] = pa.ipc.open_file(source).read_all()
+        samples["read"].append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        engine._swap_snapshots(engine._station_snapshot_sources(tables["latest_stations"]))
+        samples["stations"].append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        engine.load_warm_snapshot()
+        samples["total"].append((time.perf_counter() - started) * 1000)
+    return {part: percentile(values, 0.5) for part, values in samples.items()}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _time_to_first_200(warm_start_dir: str, timeout_s: float) -> float | None:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DASHBOARD_PORT": str(port),
+        "DASHBOARD_HOST": "127.0.0.1",
+        "DASHBOARD_WARM_START_DIR": warm_start_dir,
+        "DASHBOARD_REALTIME_ENABLED": "false",
+    }
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout_s:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.02)
+        return None
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _report(label: str, samples: list[float | None]):
+    served = [s for s in samples if s is not None]
+    if not served:
+        print(f"{label:<8}{'no 200 within timeout':>30}")
+        return
+    print(f"{label:<8}{percentile(served, 0.5):>10.0f}{max(served):>10.0f}{len(samples) - len(served):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=12_000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the first 200")
+    parser.add_argument("--skip-cold", action="store_true", help="only measure the warm-start boot")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as warm_dir:
+        _prepare_warm_start_dir(warm_dir, args.stations)
+        warm_load = _time_warm_load(warm_dir, args.runs)
+        results = {"warm": [_time_to_first_200(warm_dir, args.timeout) for _ in range(args.runs)]}
+        if not args.skip_cold:
+            results["cold"] = [_time_to_first_200("", args.timeout) for _ in range(args.runs)]
+
+    print(f"{args.stations} stations, {args.runs} runs, time from spawn to first 200 on /")
+    print(f"{'boot':<8}{'p50 ms':>10}{'max ms':>10}{'timeouts':>10}")
+    for label, samples in results.items():
+        _report(label, samples)
+    print(
+        f"load_warm_snapshot() p50: {warm_load['total']:.0f} ms, of which {warm_load['read']:.0f} ms reading the"
+        f" Arrow files and {warm_load['stations']:.0f} ms rebuilding latest_stations and its rollups"
+    )
+
+
+if __name__ == "__main__":
+    main()
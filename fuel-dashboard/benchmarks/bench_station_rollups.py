@@ -0,0 +1,125 @@
+"""Zone/province/label endpoints: per-request GROUP BY over ``latest_stations`` vs. snapshot rollup lookups.
+
+Loads a synthetic snapshot with ``replace_latest_stations()`` (which also builds the rollups) and
+reports per-query p50/p99 for each query the way it used to aggregate the stations on every call and
+as the keyed lookup it is now, bypassing the query result cache, plus the extra swap time the
+rollups cost per snapshot:
+
+- group by:  the previous SQL, aggregating ``latest_stations`` per request
+- rollup:    the ``data.duckdb_engine`` function, a WHERE lookup on a ``latest_*`` rollup table
+
+    cd fuel-dashboard && python benchmarks/bench_station_rollups.py --stations 12000
+"""
+
+import argparse
+import random
+import time
+from unittest.mock import patch
+
+from _common import LABELS
+from _common import make_stations_df
+from _common import percentile
+from _common import timed
+
+import data.duckdb_engine as engine
+
+_FUEL = "diesel_a_price"
+
+_GROUP_BY_SQL = {
+    "query_cheapest_zones": (
+        f"""
+        SELECT zip_code, AVG({_FUEL}) AS avg_price, MIN({_FUEL}) AS min_price, COUNT(*) AS station_count
+        FROM latest_stations
+        WHERE province = $1 AND {_FUEL} IS NOT NULL AND {_FUEL} > 0
+        GROUP BY zip_code ORDER BY avg_price ASC
+        """,
+        "province",
+    ),
+    "query_avg_price_by_province": (
+        f"""
+        SELECT province, AVG({_FUEL}) AS avg_price, COUNT(*) AS station_count
+        FROM latest_stations
+        WHERE {_FUEL} IS NOT NULL AND {_FUEL} > 0
+        GROUP BY province ORDER BY avg_price ASC
+        """,
+        None,
+    ),
+    "query_municipalities_by_province": (
+        "SELECT DISTINCT municipality FROM latest_stations WHERE province = $1 ORDER BY municipality",
+        "province",
+    ),
+    "get_distinct_provinces": (
+        "SELECT DISTINCT province FROM latest_stations WHERE province IS NOT NULL ORDER BY province",
+        None,
+    ),
+    "get_distinct_labels": (
+        """
+        SELECT label, COUNT(*) AS cnt FROM latest_stations
+        WHERE label IS NOT NULL AND label != ''
+        GROUP BY label ORDER BY cnt DESC, label ASC
+        """,
+        None,
+    ),
+}
+
+
+def _rollup_calls(provinces):
+    rng = random.Random(5)
+    return {
+        "query_cheapest_zones": lambda: engine.query_cheapest_zones.__wrapped__(rng.choice(provinces), _FUEL),
+        "query_avg_price_by_province": lambda: engine.query_avg_price_by_province.__wrapped__(_FUEL),
+        "query_municipalities_by_province": lambda: engine.query_municipalities_by_province.__wrapped__(
+            rng.choice(provinces)
+        ),
+        "get_distinct_provinces": lambda: engine.get_distinct_provinces.__wrapped__(),
+        "get_distinct_labels": lambda: engine.get_distinct_labels.__wrapped__(),
+    }
+
+
+def _group_by_calls(provinces):
+    rng = random.Random(5)
+
+    def call(sql, param):
+        with engine._reader("bench_group_by") as conn:
+            return conn.execute(sql, [rng.choice(provinces)] if param else []).fetchdf()
+
+    return {name: (lambda sql=sql, param=param: call(sql, param)) for name, (sql, param) in _GROUP_BY_SQL.items()}
+
+
+def _latencies(calls, requests: int) -> dict[str, tuple[float, float]]:
+    results = {}
+    for name, call in calls.items():
+        call()
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - started) * 1000)
+        results[name] = (percentile(samples, 0.5), percentile(samples, 0.99))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=12_000)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    df = make_stations_df(args.stations)
+    with patch.object(engine, "STATION_PRICE_ROLLUPS", {}), patch.object(engine, "STATION_DICTIONARIES", {}):
+        swap_without_ms, _ = timed(engine.replace_latest_stations, df, repeat=3)
+    swap_with_ms, _ = timed(engine.replace_latest_stations, df, repeat=3)
+    provinces = df["province"].unique().tolist()
+    group_by = _latencies(_group_by_calls(provinces), args.requests)
+    rollup = _latencies(_rollup_calls(provinces), args.requests)
+
+    print(f"{args.stations} stations, {len(provinces)} provinces, {len(LABELS)} labels")
+    print(f"replace_latest_stations: {swap_without_ms:.1f} ms stations only, {swap_with_ms:.1f} ms with rollups")
+    print(f"\n{'query':<34}{'group by p50':>14}{'p99':>8}{'rollup p50':>12}{'p99':>8}")
+    for name in group_by:
+        before, after = group_by[name], rollup[name]
+        print(f"{name:<34}{before[0]:>14.2f}{before[1]:>8.2f}{after[0]:>12.2f}{after[1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
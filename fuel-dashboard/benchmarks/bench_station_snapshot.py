@@ -0,0 +1,96 @@
+"""Resident size of ``latest_stations`` and ``query_cheapest_*`` latency, feed layout vs. compact layout.
+
+Loads a synthetic feed snapshot (with the id/locality columns the real feed carries) two ways and
+reports the DuckDB memory it occupies and per-query p50/p99 (bypassing the query result cache):
+
+- feed:     every feed column as delivered, prices as DOUBLE (the previous ``replace_latest_stations``)
+- compact:  ``replace_latest_stations()``: only the columns the dashboard reads, prices as DECIMAL(6, 3)
+
+    cd fuel-dashboard && python benchmarks/bench_station_snapshot.py --stations 12000
+"""
+
+import argparse
+import random
+import time
+
+from _common import FUEL_COLUMNS
+from _common import make_stations_df
+from _common import percentile
+
+import data.duckdb_engine as engine
+
+_FEED_BUILD_SQL = f"SELECT *, {engine._SPATIAL_INDEX_COLUMNS} FROM _snapshot_source ORDER BY grid_row, grid_col"
+
+
+def _make_feed_df(stations: int):
+    df = make_stations_df(stations)
+    df["eess_id"] = [str(10_000 + i) for i in range(stations)]
+    df["ccaa_id"] = df["zip_code"].str[:2]
+    df["municipality_id"] = [str(4_000 + i % 8_000) for i in range(stations)]
+    df["province_id"] = df["zip_code"].str[:2]
+    return df
+
+
+def _resident_bytes() -> int:
+    conn = engine.get_connection()
+    return conn.execute("SELECT SUM(memory_usage_bytes) FROM duckdb_memory()").fetchone()[0]
+
+
+def _latencies(df, requests: int) -> dict[str, tuple[float, float]]:
+    rng = random.Random(11)
+    zip_codes = df["zip_code"].unique().tolist()
+    provinces = df["province"].unique().tolist()
+    fuels = list(FUEL_COLUMNS[:3])
+    queries = {
+        "query_cheapest_by_zip": lambda: engine.query_cheapest_by_zip.__wrapped__(
+            rng.choice(zip_codes), "diesel_a_price", 5
+        ),
+        "query_cheapest_by_zip_group": lambda: engine.query_cheapest_by_zip_group.__wrapped__(
+            rng.choice(zip_codes), "diesel_a_price", fuels, 5
+        ),
+        "query_cheapest_zones": lambda: engine.query_cheapest_zones.__wrapped__(
+            rng.choice(provinces), "diesel_a_price"
+        ),
+    }
+    results = {}
+    for name, query in queries.items():
+        query()
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            query()
+            samples.append((time.perf_counter() - started) * 1000)
+        results[name] = (percentile(samples, 0.5), percentile(samples, 0.99))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=12_000)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    df = _make_feed_df(args.stations)
+    baseline = _resident_bytes()
+    report = {}
+    for layout in ("feed", "compact"):
+        if layout == "feed":
+            engine._swap_snapshot("latest_stations", df, _FEED_BUILD_SQL)
+        else:
+            engine.replace_latest_stations(df)
+        resident = _resident_bytes() - baseline
+        columns = engine.get_connection().execute("SELECT * FROM latest_stations LIMIT 0").fetchdf().shape[1]
+        report[layout] = (resident, columns, _latencies(df, args.requests))
+
+    print(f"{args.stations} stations")
+    print(f"{'layout':<10}{'columns':>8}{'resident KB':>13}")
+    for layout, (resident, columns, _) in report.items():
+        print(f"{layout:<10}{columns:>8}{resident / 1024:>13.0f}")
+    print(f"\n{'query':<30}{'feed p50':>10}{'p99':>8}{'compact p50':>13}{'p99':>8}")
+    for name in report["feed"][2]:
+        feed, compact = report["feed"][2][name], report["compact"][2][name]
+        print(f"{name:<30}{feed[0]:>10.2f}{feed[1]:>8.2f}{compact[0]:>13.2f}{compact[1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
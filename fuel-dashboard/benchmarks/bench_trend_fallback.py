@@ -0,0 +1,86 @@
+"""Raw-history trend fallback: DuckDB ``read_parquet()`` pushdown vs. decoding whole files into pandas.
+
+Writes one synthetic raw daily parquet per day to a temporary cache directory, then answers the
+zip-code trend query used while the trend cache is not ready both ways, with the files already on
+local disk:
+
+- pandas:  read every file into pandas, concatenate, copy into a DuckDB temp table, then filter
+- duckdb:  ``query_price_trends()``, which scans the files with ``read_parquet()`` so only
+           ``timestamp``, ``zip_code`` and the fuel column are read and the zip filter is pushed down
+
+    cd fuel-dashboard && python benchmarks/bench_trend_fallback.py --stations 12000 --days 30 90 365
+"""
+
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+import pandas as pd
+from _common import make_stations_df
+from _common import timed
+
+import data.duckdb_engine as engine
+
+_FUEL = "diesel_a_price"
+
+
+def _write_daily_files(directory: Path, days: int, stations: int) -> list[Path]:
+    base = make_stations_df(stations)
+    paths = []
+    for day in pd.date_range(end=pd.Timestamp.today().normalize(), periods=days):
+        path = directory / f"spain_fuel_prices_{day:%Y-%m-%d}T080000.parquet"
+        base.assign(timestamp=day.replace(hour=8)).to_parquet(path)
+        paths.append(path)
+    return paths
+
+
+def _pandas_fallback(paths: list[Path], zip_code: str) -> pd.DataFrame:
+    """The previous implementation: whole files through pandas and a temp table."""
+    with ThreadPoolExecutor(max_workers=min(4, len(paths))) as executor:
+        df = pd.concat(list(executor.map(pd.read_parquet, paths)), ignore_index=True)  # noqa: F841
+    with engine._reader("bench_pandas_fallback") as conn:
+        conn.execute("DROP TABLE IF EXISTS _trend_data")
+        conn.execute("CREATE TEMP TABLE _trend_data AS SELECT * FROM df")
+        try:
+            return conn.execute(
+                f"""
+                SELECT CAST(timestamp AS DATE) AS date, AVG({_FUEL}) AS avg_price,
+                    MIN({_FUEL}) AS min_price, MAX({_FUEL}) AS max_price
+                FROM _trend_data
+                WHERE zip_code = $1 AND {_FUEL} IS NOT NULL AND {_FUEL} > 0
+                GROUP BY CAST(timestamp AS DATE)
+                ORDER BY date ASC
+                """,
+                [zip_code],
+            ).fetchdf()
+        finally:
+            conn.execute("DROP TABLE IF EXISTS _trend_data")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=12_000)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 90, 365])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        all_paths = _write_daily_files(Path(tmp), max(args.days), args.stations)
+        zip_code = make_stations_df(args.stations)["zip_code"].iloc[0]
+        size_mb = sum(path.stat().st_size for path in all_paths) / (1024 * 1024)
+        print(f"{len(all_paths)} daily files x {args.stations} stations ({size_mb:.0f} MB on disk), zip {zip_code}")
+        print(f"{'days':>6}{'pandas ms':>12}{'duckdb ms':>12}{'speedup':>10}")
+        for days in sorted(args.days):
+            paths = all_paths[-days:]
+            names = [path.name for path in paths]
+            engine.cached_parquet_paths = lambda _names, paths=paths: nullcontext(paths)
+            pandas_ms, expected = timed(_pandas_fallback, paths, zip_code, repeat=args.repeat)
+            duckdb_ms, result = timed(engine.query_price_trends, names, zip_code, _FUEL, repeat=args.repeat)
+            pd.testing.assert_frame_equal(expected, result, check_dtype=False)
+            print(f"{days:>6}{pandas_ms:>12.0f}{duckdb_ms:>12.0f}{pandas_ms / duckdb_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
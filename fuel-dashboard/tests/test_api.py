@@ -419,3 +419,64 @@ def test_reportes_coverage_returns_404_when_aggregate_missing(mock_service):
     mock_service.return_value = None
     response = _get_client().get("/api/v1/reportes/coverage?fuel_type=gasoline_95_e5_price")
     assert response.status_code == 404
+
+
+@patch("api.http_cache.get_snapshot_version", return_value="abc-3-2-20260401")
+@patch("api.router.get_provinces")
+def test_snapshot_route_sends_etag_and_answers_304_without_querying(mock_service, _mock_version):
+    mock_service.return_value = {"madrid": "Madrid"}
+    client = _get_client()
+
+    response = client.get("/api/v1/provinces")
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"abc-3-2-20260401"'
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+    revalidated = client.get("/api/v1/provinces", headers={"If-None-Match": 'W/"old", "abc-3-2-20260401"'})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == '"abc-3-2-20260401"'
+    assert mock_service.call_count == 1
+
+
+@patch("api.http_cache.get_snapshot_version", side_effect=["abc-3-2-20260401", "abc-4-2-20260401"])
+@patch("api.router.get_provinces", return_value={"madrid": "Madrid"})
+def test_snapshot_route_serves_full_response_after_swap(mock_service, _mock_version):
+    response = _get_client().get("/api/v1/provinces", headers={"If-None-Match": '"abc-3-2-20260401"'})
+    assert response.status_code == 304
+
+    response = _get_client().get("/api/v1/provinces", headers={"If-None-Match": '"abc-3-2-20260401"'})
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"abc-4-2-20260401"'
+    assert mock_service.call_count == 1
+
+
+@patch("api.http_cache.get_snapshot_version", return_value=None)
+@patch("api.router.get_provinces", return_value={})
+def test_snapshot_route_has_no_validators_before_first_snapshot(_mock_service, _mock_version):
+    response = _get_client().get("/api/v1/provinces", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+@patch("api.http_cache.get_snapshot_version", return_value="abc-3-2-20260401")
+@patch("api.router.get_price_trends", return_value=[])
+def test_trend_route_is_validated_only_while_the_trend_snapshot_serves_it(mock_service, _mock_version):
+    url = "/api/v1/trends/price?zip_code=28001&fuel_type=diesel_a_price&period=week"
+    with patch("api.http_cache.is_zip_code_trend_ready", return_value=False):
+        fallback = _get_client().get(url, headers={"If-None-Match": '"abc-3-2-20260401"'})
+    with patch("api.http_cache.is_zip_code_trend_ready", return_value=True):
+        cached = _get_client().get(url, headers={"If-None-Match": '"abc-3-2-20260401"'})
+
+    assert fallback.status_code == 200
+    assert "etag" not in fallback.headers
+    assert cached.status_code == 304
+    assert mock_service.call_count == 1
+
+
+@patch("api.http_cache.get_snapshot_version", return_value="abc-3-2-20260401")
+@patch("api.router.get_brand_coverage_report", return_value=[])
+def test_aggregate_route_is_not_snapshot_validated(_mock_service, _mock_version):
+    response = _get_client().get("/api/v1/reportes/coverage?fuel_type=gasoline_95_e5_price")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
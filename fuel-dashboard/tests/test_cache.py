@@ -28,3 +28,191 @@ def test_initial_trend_refresh_delay_is_zero_when_cache_age_is_missing(mock_age)
     mock_age.return_value = None
 
     assert _initial_trend_refresh_delay_seconds(True) == 0
+
+
+@patch("data.cache.get_latest_data_timestamp", return_value="2026-04-16T10:00:00+00:00")
+@patch("data.cache.load_warm_snapshot", return_value=["latest_stations"])
+def test_warm_start_marks_data_ready_when_stations_restored(mock_load, _mock_ts):
+    import data.cache as cache_module
+
+    cache_module._data_ready.clear()
+
+    with (
+        patch.object(cache_module, "_data_health", None),
+        patch.object(cache_module, "_latest_parquet_file", None),
+        patch.object(cache_module, "_latest_bucket_file", None),
+    ):
+        assert cache_module.warm_start() is False
+        health = cache_module.get_data_health()
+    assert cache_module.is_data_ready() is True
+    # Published straight away, so /health/data does not wait for the first refresh.
+    assert health.latest_file is None
+    assert health.loaded_file is None
+    assert health.file_date == "2026-04-16"
+    assert health.data_datetime == "2026-04-16T10:00:00+00:00"
+    cache_module._data_ready.clear()
+
+
+@patch("data.cache.load_warm_snapshot", return_value=[])
+def test_warm_start_leaves_data_not_ready_without_snapshot(mock_load):
+    import data.cache as cache_module
+
+    cache_module._data_ready.clear()
+
+    assert cache_module.warm_start() is False
+    assert cache_module.is_data_ready() is False
+
+
+@patch("data.cache.get_aggregate_manifest_version", return_value=7)
+@patch("data.cache.is_zip_code_trend_ready", return_value=True)
+@patch("data.cache.get_snapshot_source", return_value="1712000000000")
+@patch("data.cache.get_latest_data_timestamp", return_value="2026-04-01T08:00:00+00:00")
+@patch("data.cache.get_snapshot_generation")
+def test_snapshot_version_depends_only_on_the_data(mock_generation, mock_timestamp, mock_source, _ready, _manifest):
+    from data.cache import get_snapshot_version
+
+    mock_generation.return_value = 4
+    first = get_snapshot_version()
+    # Another instance, or this one after a restart, swapped the same data in under other generations.
+    mock_generation.return_value = 1
+    same_data = get_snapshot_version()
+    mock_timestamp.return_value = "2026-04-01T08:30:00+00:00"
+    new_feed = get_snapshot_version()
+    mock_source.return_value = "1712000000001"
+    new_trend = get_snapshot_version()
+
+    assert first == same_data
+    assert first.split("-")[:3] == ["202604010800000000", "1712000000000", "7"]
+    assert len({first, new_feed, new_trend}) == 3
+
+
+@patch("data.cache.get_snapshot_generation", return_value=0)
+def test_snapshot_version_is_none_before_first_snapshot(_mock_generation):
+    from data.cache import get_snapshot_version
+
+    assert get_snapshot_version() is None
+
+
+def _reset_aggregate_preload(cache_module):
+    cache_module._aggregate_preload_status.clear()
+    cache_module._aggregate_preload_done.clear()
+
+
+@patch("data.cache.settings.insights_historical_enabled", False)
+@patch("data.cache.settings.aggregate_preload_workers", 2)
+@patch("data.cache.refresh_zip_code_trend_snapshot", return_value=False)
+@patch("data.cache.is_zip_code_trend_ready", return_value=False)
+@patch("data.cache.load_aggregate")
+@patch("data.cache.download_aggregate")
+def test_preload_aggregates_loads_enabled_tabs_concurrently(mock_download, mock_load, _mock_ready, _mock_trend_refresh):
+    import threading
+    import time
+
+    import data.cache as cache_module
+
+    active = []
+    peak = []
+    mutex = threading.Lock()
+
+    def slow_download(name):
+        with mutex:
+            active.append(name)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with mutex:
+            active.remove(name)
+        return None if name == "daily_ingestion_stats.parquet" else object()
+
+    mock_download.side_effect = slow_download
+    mock_load.side_effect = lambda name: f"agg_{name}"
+    _reset_aggregate_preload(cache_module)
+
+    status = cache_module.preload_aggregates()
+
+    assert set(status) == {
+        "zip_code_daily_stats.parquet",
+        "province_daily_stats.parquet",
+        "reports/brand_win_rate.parquet",
+        "reports/brand_price_comparison.parquet",
+        "daily_ingestion_stats.parquet",
+    }
+    assert status["province_daily_stats.parquet"]["status"] == "loaded"
+    assert status["reports/brand_win_rate.parquet"]["load_ms"] >= 50
+    assert status["daily_ingestion_stats.parquet"]["status"] == "missing"
+    assert status["zip_code_daily_stats.parquet"]["status"] == "missing"
+    mock_load.assert_called_once_with("province_daily_stats.parquet")
+    assert max(peak) == 2
+    assert cache_module._aggregate_preload_done.is_set()
+    _reset_aggregate_preload(cache_module)
+
+
+def test_insights_tab_readiness_only_waits_for_its_own_aggregates():
+    import data.cache as cache_module
+
+    _reset_aggregate_preload(cache_module)
+    cache_module._aggregate_preload_status.update(
+        {
+            "zip_code_daily_stats.parquet": {"status": "loaded", "load_ms": 10.0},
+            "province_daily_stats.parquet": {"status": "failed", "load_ms": 5.0},
+            "reports/brand_win_rate.parquet": {"status": "pending", "load_ms": None},
+        }
+    )
+
+    assert cache_module.is_insights_tab_ready("trends") is True
+    assert cache_module.is_insights_tab_ready("zones") is True
+    assert cache_module.is_insights_tab_ready("reportes") is False
+    _reset_aggregate_preload(cache_module)
+    assert cache_module.is_insights_tab_ready("reportes") is True
+
+
+@patch("data.cache.get_latest_data_timestamp")
+def test_publish_data_health_computes_status_from_refreshed_state(mock_ts):
+    import data.cache as cache_module
+
+    mock_ts.return_value = None
+    _reset_aggregate_preload(cache_module)
+    with patch.object(cache_module, "_latest_parquet_file", "spain_fuel_prices_2026-04-16T120000Z.parquet"):
+        first = cache_module._publish_data_health()
+        mock_ts.return_value = "2026-04-16T10:00:00+00:00"
+        second = cache_module._publish_data_health()
+
+    assert first.file_date == "2026-04-16"
+    assert first.data_datetime == "2026-04-16"
+    assert second.data_datetime == "2026-04-16T10:00:00+00:00"
+    assert second.insights_ready["trends"] is True
+    # Probes read the published object; an earlier one is never modified.
+    assert cache_module.get_data_health() is second
+    assert first.data_datetime == "2026-04-16"
+
+
+class _StopLoop(Exception):
+    pass
+
+
+@patch("data.cache.time.sleep", side_effect=_StopLoop)
+@patch("data.cache.get_latest_data_timestamp", return_value="2026-04-16T10:00:00+00:00")
+def test_data_health_follows_the_newest_bucket_file_before_the_snapshot_refreshes(_mock_ts, _mock_sleep):
+    import data.cache as cache_module
+    import data.gcs_client as gcs_client
+
+    loaded = "spain_fuel_prices_2026-04-16T100000Z.parquet"
+    newest = "spain_fuel_prices_2026-04-17T003000Z.parquet"
+    # Past midnight the ingestor has written the new day's file; the stations snapshot loaded
+    # yesterday is not due for a refresh until cache_ttl_seconds after it was loaded.
+    entries = [{"name": loaded, "date": "2026-04-16"}, {"name": newest, "date": "2026-04-17"}]
+    with (
+        patch.object(gcs_client._manifest, "entries", return_value=entries),
+        patch.object(cache_module, "_latest_parquet_file", loaded),
+        patch.object(cache_module, "_latest_bucket_file", None),
+        patch.object(cache_module, "_data_health", None),
+    ):
+        try:
+            cache_module._bucket_file_loop()
+        except _StopLoop:
+            pass
+        health = cache_module.get_data_health()
+
+    assert health.latest_file == newest
+    assert health.file_date == "2026-04-17"
+    assert health.loaded_file == loaded
+    assert health.data_datetime == "2026-04-16T10:00:00+00:00"
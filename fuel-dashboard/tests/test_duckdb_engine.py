@@ -1,7 +1,10 @@
+import time
+from contextlib import nullcontext
 from unittest.mock import patch
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
 import pytest
 
 import data.duckdb_engine as duckdb_engine_module
@@ -23,6 +26,11 @@ from data.duckdb_engine import refresh_latest_snapshot
 from data.duckdb_engine import refresh_zip_code_trend_snapshot
 
 
+def _arrow(df: pd.DataFrame | None) -> pa.Table | None:
+    """An aggregate as download_aggregate_table() serves it."""
+    return None if df is None else pa.Table.from_pandas(df, preserve_index=False)
+
+
 def _setup_test_table(conn):
     df = pd.DataFrame(  # noqa: F841
         {
@@ -37,7 +45,7 @@ def _setup_test_table(conn):
         }
     )
     conn.execute("DROP TABLE IF EXISTS latest_stations")
-    conn.execute("CREATE TABLE latest_stations AS SELECT * FROM df")
+    conn.execute(f"CREATE TABLE latest_stations AS SELECT *, {duckdb_engine_module._SPATIAL_INDEX_COLUMNS} FROM df")
 
 
 def _make_zip_trend_df():
@@ -104,12 +112,7 @@ def test_query_stations_within_radius(mock_conn):
     assert all(result["distance_km"] <= 5.0)
 
 
-@patch("data.duckdb_engine.get_connection")
-def test_query_cheapest_zones(mock_conn):
-    conn = duckdb.connect(":memory:")
-    _setup_test_table(conn)
-    mock_conn.return_value = conn
-
+def test_query_cheapest_zones(cached_stations):
     result = query_cheapest_zones("madrid", "diesel_a_price")
     assert len(result) == 1
     assert result.iloc[0]["zip_code"] == "28001"
@@ -146,12 +149,12 @@ def test_query_rejects_invalid_fuel_column(mock_conn):
         query_cheapest_by_zip("28001", "malicious_column", 3)
 
 
-@patch("data.duckdb_engine.download_aggregate")
+@patch("data.duckdb_engine.download_aggregate_table")
 @patch("data.duckdb_engine.get_connection")
 def test_refresh_zip_code_trend_snapshot_loads_persistent_table(mock_conn, mock_download):
     conn = duckdb.connect(":memory:")
     mock_conn.return_value = conn
-    mock_download.return_value = _make_zip_trend_df()
+    mock_download.return_value = _arrow(_make_zip_trend_df())
     duckdb_engine_module._zip_code_trend_ready.clear()
 
     refreshed = refresh_zip_code_trend_snapshot()
@@ -162,12 +165,12 @@ def test_refresh_zip_code_trend_snapshot_loads_persistent_table(mock_conn, mock_
     assert duckdb_engine_module.is_zip_code_trend_ready() is True
 
 
-@patch("data.duckdb_engine.download_aggregate")
+@patch("data.duckdb_engine.download_aggregate_table")
 @patch("data.duckdb_engine.get_connection")
 def test_refresh_zip_code_trend_snapshot_accepts_legacy_aggregate_without_province(mock_conn, mock_download):
     conn = duckdb.connect(":memory:")
     mock_conn.return_value = conn
-    mock_download.return_value = _make_legacy_zip_trend_df()
+    mock_download.return_value = _arrow(_make_legacy_zip_trend_df())
     duckdb_engine_module._zip_code_trend_ready.clear()
 
     refreshed = refresh_zip_code_trend_snapshot()
@@ -180,7 +183,7 @@ def test_refresh_zip_code_trend_snapshot_accepts_legacy_aggregate_without_provin
     assert duckdb_engine_module.is_zip_code_trend_ready() is True
 
 
-@patch("data.duckdb_engine.download_aggregate")
+@patch("data.duckdb_engine.download_aggregate_table")
 @patch("data.duckdb_engine.get_connection")
 def test_refresh_zip_code_trend_snapshot_keeps_last_good_snapshot_when_download_returns_none(mock_conn, mock_download):
     conn = duckdb.connect(":memory:")
@@ -198,7 +201,7 @@ def test_refresh_zip_code_trend_snapshot_keeps_last_good_snapshot_when_download_
     assert count == 3
 
 
-@patch("data.duckdb_engine.download_aggregate")
+@patch("data.duckdb_engine.download_aggregate_table")
 @patch("data.duckdb_engine.get_connection")
 def test_refresh_zip_code_trend_snapshot_keeps_last_good_snapshot_when_aggregate_is_invalid(mock_conn, mock_download):
     conn = duckdb.connect(":memory:")
@@ -206,7 +209,7 @@ def test_refresh_zip_code_trend_snapshot_keeps_last_good_snapshot_when_aggregate
     df = _make_zip_trend_df()  # noqa: F841
     conn.execute("CREATE TABLE zip_code_daily_stats AS SELECT * FROM df")
     duckdb_engine_module._zip_code_trend_ready.set()
-    mock_download.return_value = pd.DataFrame({"zip_code": ["28001"]})
+    mock_download.return_value = _arrow(pd.DataFrame({"zip_code": ["28001"]}))
 
     refreshed = refresh_zip_code_trend_snapshot()
 
@@ -306,7 +309,7 @@ def _setup_multi_fuel_table(conn):
         }
     )
     conn.execute("DROP TABLE IF EXISTS latest_stations")
-    conn.execute("CREATE TABLE latest_stations AS SELECT * FROM df")
+    conn.execute(f"CREATE TABLE latest_stations AS SELECT *, {duckdb_engine_module._SPATIAL_INDEX_COLUMNS} FROM df")
 
 
 @patch("data.duckdb_engine.get_connection")
@@ -362,12 +365,7 @@ def test_query_stations_within_radius_group_filters_by_primary(mock_conn):
 # --- Label filter tests ---
 
 
-@patch("data.duckdb_engine.get_connection")
-def test_get_distinct_labels(mock_conn):
-    conn = duckdb.connect(":memory:")
-    _setup_test_table(conn)
-    mock_conn.return_value = conn
-
+def test_get_distinct_labels(cached_stations):
     result = get_distinct_labels()
     assert isinstance(result, dict)
     assert len(result) == 3
@@ -376,12 +374,7 @@ def test_get_distinct_labels(mock_conn):
     assert result["station_c"] == "Station_C"
 
 
-@patch("data.duckdb_engine.get_connection")
-def test_get_distinct_labels_top_n(mock_conn):
-    conn = duckdb.connect(":memory:")
-    _setup_test_table(conn)
-    mock_conn.return_value = conn
-
+def test_get_distinct_labels_top_n(cached_stations):
     result = get_distinct_labels(top_n=2)
     assert isinstance(result, dict)
     assert len(result) == 2
@@ -603,7 +596,90 @@ def test_refresh_latest_snapshot_excludes_non_public_sale_type(mock_conn, mock_l
     result = conn.execute("SELECT * FROM latest_stations").df()
     assert len(result) == 1
     assert result.iloc[0]["label"] == "public_station"
-    assert result.iloc[0]["sale_type"] == "p"
+    # Only needed to filter; not kept in the snapshot.
+    assert "sale_type" not in result.columns
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_keeps_used_columns_with_compact_prices(mock_conn):
+    from data.duckdb_engine import replace_latest_stations
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+    df = _random_stations(20).assign(
+        eess_id="1234", province_id="28", locality="madrid", diesel_a_price=1.459, hydrogen_price=None
+    )
+    df.loc[0, "diesel_a_price"] = 12345.678
+
+    assert replace_latest_stations(df) == 20
+
+    types = dict(
+        conn.execute(
+            "SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = 'latest_stations'"
+        ).fetchall()
+    )
+    assert not {"eess_id", "province_id", "locality"} & types.keys()
+    assert types["diesel_a_price"] == "DECIMAL(6,3)"
+    assert types["label"] == "VARCHAR"
+    assert "grid_row" in types
+    prices = conn.execute("SELECT diesel_a_price FROM latest_stations").df()["diesel_a_price"]
+    assert prices.isna().sum() == 1
+    assert set(prices.dropna()) == {1.459}
+    assert query_cheapest_by_zip(df.loc[1, "zip_code"], "diesel_a_price", 1)["diesel_a_price"].tolist() == [1.459]
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_publishes_rollups_per_fuel(mock_conn):
+    from data.duckdb_engine import get_distinct_provinces
+    from data.duckdb_engine import query_avg_price_by_province
+    from data.duckdb_engine import query_cheapest_zones_by_municipality
+    from data.duckdb_engine import query_municipalities_by_province
+    from data.duckdb_engine import replace_latest_stations
+
+    mock_conn.return_value = duckdb.connect(":memory:")
+    df = pd.DataFrame(
+        {
+            "label": ["repsol", "repsol", "", "bp"],
+            "municipality": ["madrid", "getafe", "getafe", "sevilla"],
+            "province": ["madrid", "madrid", "madrid", "sevilla"],
+            "zip_code": ["28001", "28901", "28901", "41001"],
+            "diesel_a_price": [1.40, 1.50, 0.0, 1.60],
+            "gasoline_95_e5_price": [1.70, None, 1.80, 1.65],
+        }
+    )
+
+    replace_latest_stations(df)
+
+    diesel = query_avg_price_by_province("diesel_a_price")
+    assert diesel["province"].tolist() == ["madrid", "sevilla"]
+    assert diesel["avg_price"].tolist() == pytest.approx([1.45, 1.60])
+    assert diesel["station_count"].tolist() == [2, 1]
+    gasoline = query_cheapest_zones("madrid", "gasoline_95_e5_price")
+    assert gasoline["zip_code"].tolist() == ["28001", "28901"]
+    assert gasoline["station_count"].tolist() == [1, 1]
+    getafe = query_cheapest_zones_by_municipality("madrid", "getafe", "diesel_a_price")
+    assert getafe[["zip_code", "min_price", "station_count"]].values.tolist() == [["28901", 1.50, 1]]
+    assert query_municipalities_by_province("madrid") == ["getafe", "madrid"]
+    assert get_distinct_provinces() == {"madrid": "Madrid", "sevilla": "Sevilla"}
+    assert list(get_distinct_labels()) == ["repsol", "bp"]
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_assigns_polygons_once_per_feed(mock_conn):
+    from data.duckdb_engine import _with_station_polygons
+
+    mock_conn.return_value = duckdb.connect(":memory:")
+    feed = pa.table({"label": ["sol", "sevilla"], "latitude": [40.4169, 37.39], "longitude": [-3.7035, -5.98]})
+
+    # A warm-start table saved before the polygon columns existed gets them on load as well.
+    duckdb_engine_module._swap_snapshots(duckdb_engine_module._station_snapshot_sources(feed))
+    located = _with_station_polygons(feed)
+
+    rows = mock_conn.return_value.execute(
+        "SELECT label, district, barrio FROM latest_stations ORDER BY label"
+    ).fetchall()
+    assert rows == [("sevilla", None, None), ("sol", "Centro", "Sol")]
+    assert _with_station_polygons(located) is located
 
 
 def testfilter_public_stations_excludes_restricted():
@@ -617,3 +693,538 @@ def testfilter_public_stations_missing_column_returns_df_unchanged(caplog):
     result = filter_public_stations(df)
     assert len(result) == 2
     assert "sale_type column missing" in caplog.text
+
+
+# --- Concurrent read path ---
+
+
+def test_read_write_lock_allows_concurrent_readers():
+    import threading
+
+    lock = duckdb_engine_module._ReadWriteLock()
+    both_inside = threading.Barrier(2, timeout=2)
+
+    def read():
+        with lock.read():
+            both_inside.wait()
+
+    threads = [threading.Thread(target=read) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=3)
+    assert not both_inside.broken
+
+
+def test_read_write_lock_writer_excludes_readers():
+    import threading
+
+    lock = duckdb_engine_module._ReadWriteLock()
+    events = []
+    writer_inside = threading.Event()
+
+    def read():
+        writer_inside.wait(timeout=2)
+        with lock.read():
+            events.append("read")
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    with lock.write():
+        writer_inside.set()
+        reader.join(timeout=0.2)
+        events.append("write")
+    reader.join(timeout=2)
+
+    assert events == ["write", "read"]
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_thread_cursor_is_reused_per_thread_and_sees_shared_tables(mock_conn):
+    import threading
+
+    conn = duckdb.connect(":memory:")
+    _setup_test_table(conn)
+    mock_conn.return_value = conn
+
+    cursor = duckdb_engine_module._thread_cursor()
+    assert duckdb_engine_module._thread_cursor() is cursor
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(duckdb_engine_module._thread_cursor()))
+    thread.start()
+    thread.join()
+    assert other[0] is not cursor
+    assert other[0].execute("SELECT COUNT(*) FROM latest_stations").fetchone()[0] == 3
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_query_stats_record_calls_per_query(mock_conn):
+    conn = duckdb.connect(":memory:")
+    _setup_test_table(conn)
+    mock_conn.return_value = conn
+    duckdb_engine_module.reset_query_stats()
+
+    query_cheapest_by_zip("28001", "diesel_a_price", 3)
+    query_cheapest_by_zip("08001", "diesel_a_price", 3)
+
+    stats = duckdb_engine_module.get_query_stats()
+    assert stats["query_cheapest_by_zip"]["count"] == 2
+    assert stats["query_cheapest_by_zip"]["p99_ms"] >= stats["query_cheapest_by_zip"]["p50_ms"] >= 0
+    assert stats["query_cheapest_by_zip"]["lock_wait_ms_total"] >= 0
+
+
+# --- Generation-based snapshot swap ---
+
+
+def _physical_tables(conn, prefix):
+    rows = conn.execute(
+        "SELECT table_name FROM duckdb_tables() WHERE table_name LIKE $1 ORDER BY table_name", [f"{prefix}%"]
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_swaps_generations_and_drops_previous(mock_conn):
+    from data.duckdb_engine import get_snapshot_generation
+    from data.duckdb_engine import replace_latest_stations
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+
+    first = pd.DataFrame({"label": ["a", "b"], "diesel_a_price": [1.4, 1.5]})
+    second = pd.DataFrame({"label": ["c"], "diesel_a_price": [1.6]})
+
+    assert replace_latest_stations(first) == 2
+    first_gen = get_snapshot_generation("latest_stations")
+    assert replace_latest_stations(second) == 1
+    second_gen = get_snapshot_generation("latest_stations")
+
+    assert second_gen > first_gen
+    assert _physical_tables(conn, "latest_stations") == [f"latest_stations_{second_gen}"]
+    assert conn.execute("SELECT label FROM latest_stations").fetchall() == [("c",)]
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_replaces_legacy_plain_table(mock_conn):
+    from data.duckdb_engine import replace_latest_stations
+
+    conn = duckdb.connect(":memory:")
+    _setup_test_table(conn)
+    mock_conn.return_value = conn
+
+    replace_latest_stations(pd.DataFrame({"label": ["only"], "diesel_a_price": [1.4]}))
+
+    view_count = conn.execute("SELECT COUNT(*) FROM duckdb_views() WHERE view_name = 'latest_stations'").fetchone()[0]
+    assert view_count == 1
+    assert conn.execute("SELECT COUNT(*) FROM latest_stations").fetchone()[0] == 1
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_builds_new_generation_without_exclusive_lock(mock_conn):
+    from data.duckdb_engine import replace_latest_stations
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+    replace_latest_stations(pd.DataFrame({"label": ["old"], "diesel_a_price": [1.4]}))
+
+    lock_states = []
+    real_cursor = duckdb_engine_module._thread_cursor
+
+    class _Spy:
+        def __init__(self, cursor):
+            self._cursor = cursor
+
+        def __getattr__(self, name):
+            return getattr(self._cursor, name)
+
+        def execute(self, sql, *args):
+            if sql.startswith("CREATE TABLE latest_stations_"):
+                lock_states.append(duckdb_engine_module._rw_lock._writer)
+            return self._cursor.execute(sql, *args)
+
+    with patch.object(duckdb_engine_module, "_thread_cursor", lambda: _Spy(real_cursor())):
+        replace_latest_stations(pd.DataFrame({"label": ["new"], "diesel_a_price": [1.5]}))
+
+    assert lock_states == [False]
+
+
+@patch("data.duckdb_engine.download_aggregate_table")
+@patch("data.duckdb_engine.get_connection")
+def test_refresh_zip_code_trend_snapshot_swaps_generation(mock_conn, mock_download):
+    from data.duckdb_engine import get_snapshot_generation
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+    mock_download.return_value = _arrow(_make_zip_trend_df())
+
+    assert refresh_zip_code_trend_snapshot() is True
+    assert refresh_zip_code_trend_snapshot() is True
+
+    generation = get_snapshot_generation("zip_code_daily_stats")
+    assert _physical_tables(conn, "zip_code_daily_stats") == [f"zip_code_daily_stats_{generation}"]
+    assert conn.execute("SELECT COUNT(*) FROM zip_code_daily_stats").fetchone()[0] == 3
+
+
+@patch("data.duckdb_engine.get_aggregate_cache_mtime", return_value=1.0)
+@patch("data.duckdb_engine.sync_aggregates_with_manifest")
+@patch("data.duckdb_engine.download_aggregate_manifest")
+@patch("data.duckdb_engine.download_aggregate_table")
+@patch("data.duckdb_engine.get_connection")
+def test_refresh_aggregates_from_manifest_swaps_changed_tables_together(
+    mock_conn, mock_download, mock_manifest, mock_sync, _mock_mtime
+):
+    from data.duckdb_engine import get_aggregate_manifest_version
+    from data.duckdb_engine import get_snapshot_generation
+    from data.duckdb_engine import load_aggregate
+    from data.duckdb_engine import refresh_aggregates_from_manifest
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+    province_df = pd.DataFrame({"province": ["madrid"], "avg_price": [1.5]})
+    brand_df = pd.DataFrame({"brand": ["repsol"], "avg_price": [1.6]})
+    frames = {
+        "zip_code_daily_stats.parquet": _make_zip_trend_df(),
+        "province_daily_stats.parquet": province_df,
+        "brand_daily_stats.parquet": brand_df,
+    }
+    mock_download.side_effect = lambda name: _arrow(frames.get(name))
+    with patch.object(duckdb_engine_module, "_aggregate_versions", {}), patch.object(
+        duckdb_engine_module, "_aggregate_manifest_version", 0
+    ):
+        assert refresh_zip_code_trend_snapshot() is True
+        load_aggregate("province_daily_stats.parquet")
+        load_aggregate("brand_daily_stats.parquet")
+        before = {name: get_snapshot_generation(name) for name in ("zip_code_daily_stats", "agg_brand_daily_stats")}
+
+        frames["province_daily_stats.parquet"] = pd.concat([province_df, province_df], ignore_index=True)
+        mock_manifest.return_value = {"version": 7, "aggregates": {}}
+        mock_sync.return_value = ["zip_code_daily_stats.parquet", "province_daily_stats.parquet"]
+
+        changed = refresh_aggregates_from_manifest()
+        version = get_aggregate_manifest_version()
+
+    assert changed == ["zip_code_daily_stats.parquet", "province_daily_stats.parquet"]
+    assert version == 7
+    assert get_snapshot_generation("zip_code_daily_stats") > before["zip_code_daily_stats"]
+    # Both changed tables were published by one swap, so their generations are consecutive.
+    assert get_snapshot_generation("agg_province_daily_stats") == get_snapshot_generation("zip_code_daily_stats") + 1
+    assert get_snapshot_generation("agg_brand_daily_stats") == before["agg_brand_daily_stats"]
+    assert conn.execute("SELECT COUNT(*) FROM agg_province_daily_stats").fetchone()[0] == 2
+
+
+@patch("data.duckdb_engine.sync_aggregates_with_manifest")
+@patch("data.duckdb_engine.download_aggregate_manifest", return_value=None)
+def test_refresh_aggregates_from_manifest_without_manifest_is_a_no_op(_mock_manifest, mock_sync):
+    from data.duckdb_engine import refresh_aggregates_from_manifest
+
+    assert refresh_aggregates_from_manifest() is None
+    mock_sync.assert_not_called()
+
+
+# --- Spatial grid index ---
+
+
+def _brute_force_distances(df, lat, lon):
+    import math
+
+    def haversine(row):
+        dlat = math.radians(row["latitude"] - lat)
+        dlon = math.radians(row["longitude"] - lon)
+        a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat)) * math.cos(math.radians(row["latitude"])) * (
+            math.sin(dlon / 2) ** 2
+        )
+        return 2 * 6371 * math.asin(math.sqrt(a))
+
+    return df.assign(distance_km=df.apply(haversine, axis=1)).sort_values("distance_km")
+
+
+def _random_stations(n=400, seed=3):
+    import random
+
+    rng = random.Random(seed)
+    return pd.DataFrame(
+        {
+            "label": [f"s{i}" for i in range(n)],
+            "address": ["calle"] * n,
+            "municipality": ["m"] * n,
+            "province": ["p"] * n,
+            "zip_code": ["28001"] * n,
+            "latitude": [rng.uniform(36.0, 43.7) for _ in range(n)],
+            "longitude": [rng.uniform(-9.2, 3.3) for _ in range(n)],
+            "diesel_a_price": [rng.uniform(1.3, 1.9) for _ in range(n)],
+        }
+    )
+
+
+def test_grid_cell_bounds_cover_radius():
+    from data.duckdb_engine import _grid_cell_bounds
+    from data.duckdb_engine import GRID_CELL_DEGREES
+
+    min_row, max_row, min_col, max_col = _grid_cell_bounds(40.4168, -3.7038, 10.0)
+
+    # 10 km is ~0.09 degrees of latitude and ~0.12 degrees of longitude at Madrid's latitude.
+    assert min_row * GRID_CELL_DEGREES <= 40.4168 - 0.09
+    assert (max_row + 1) * GRID_CELL_DEGREES >= 40.4168 + 0.09
+    assert min_col * GRID_CELL_DEGREES <= -3.7038 - 0.12
+    assert (max_col + 1) * GRID_CELL_DEGREES >= -3.7038 + 0.12
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_adds_spatial_index_columns(mock_conn):
+    from data.duckdb_engine import replace_latest_stations
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+
+    replace_latest_stations(_random_stations(20))
+
+    columns = {row[0] for row in conn.execute("DESCRIBE latest_stations").fetchall()}
+    assert {"lat_rad", "lon_rad", "cos_lat", "grid_row", "grid_col"}.issubset(columns)
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_indexed_radius_query_matches_brute_force(mock_conn):
+    from data.duckdb_engine import replace_latest_stations
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+    stations = _random_stations()
+    replace_latest_stations(stations)
+
+    result = query_stations_within_radius(40.4168, -3.7038, "diesel_a_price", 150.0)
+
+    expected = _brute_force_distances(stations, 40.4168, -3.7038)
+    expected = expected[expected["distance_km"] <= 150.0]
+    assert result["label"].tolist() == expected["label"].tolist()
+    assert result["distance_km"].tolist() == pytest.approx(expected["distance_km"].tolist())
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_nearest_query_expands_rings_until_limit_is_met(mock_conn):
+    from data.duckdb_engine import replace_latest_stations
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+    stations = _random_stations()
+    replace_latest_stations(stations)
+
+    # A point in the Atlantic: the first rings are empty, so the search has to widen.
+    result = query_nearest_stations(44.5, -12.0, "diesel_a_price", 7)
+
+    expected = _brute_force_distances(stations, 44.5, -12.0).head(7)
+    assert result["label"].tolist() == expected["label"].tolist()
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_nearest_query_returns_all_stations_when_fewer_than_limit(mock_conn):
+    conn = duckdb.connect(":memory:")
+    _setup_test_table(conn)
+    mock_conn.return_value = conn
+
+    result = query_nearest_stations(40.4168, -3.7038, "diesel_a_price", 10)
+
+    assert len(result) == 3
+    assert result["label"].tolist() == ["station_a", "station_b", "station_c"]
+
+
+@patch("data.duckdb_engine.get_aggregate_generation", return_value="1712000000000")
+@patch("data.duckdb_engine.download_aggregate_table")
+@patch("data.duckdb_engine.get_connection")
+def test_warm_snapshot_round_trip_restores_stations_and_trend(mock_conn, mock_download, _mock_generation, tmp_path):
+    from data.duckdb_engine import load_warm_snapshot
+    from data.duckdb_engine import replace_latest_stations
+    from data.duckdb_engine import save_warm_snapshot
+
+    mock_conn.return_value = duckdb.connect(":memory:")
+    mock_download.return_value = _arrow(_make_zip_trend_df())
+    with patch.object(duckdb_engine_module.settings, "warm_start_dir", str(tmp_path)):
+        replace_latest_stations(_random_stations(50))
+        refresh_zip_code_trend_snapshot()
+        save_warm_snapshot("latest_stations")
+        save_warm_snapshot("zip_code_daily_stats")
+
+        # A fresh process: new database, trend not ready.
+        restarted = duckdb.connect(":memory:")
+        mock_conn.return_value = restarted
+        duckdb_engine_module._zip_code_trend_ready.clear()
+        duckdb_engine_module._snapshot_sources.clear()
+        loaded = load_warm_snapshot()
+
+    assert loaded == ["latest_stations", "zip_code_daily_stats"]
+    assert duckdb_engine_module.get_snapshot_source("zip_code_daily_stats") == "1712000000000"
+    assert restarted.execute("SELECT COUNT(*) FROM latest_stations").fetchone()[0] == 50
+    assert restarted.execute("SELECT COUNT(*) FROM zip_code_daily_stats").fetchone()[0] == 3
+    assert duckdb_engine_module.is_zip_code_trend_ready() is True
+    # The persisted table carries the grid columns, so indexed queries work straight away.
+    assert len(query_nearest_stations(40.4168, -3.7038, "diesel_a_price", 5)) == 5
+    # Rollups are not persisted but rebuilt from the restored stations.
+    assert query_cheapest_zones("p", "diesel_a_price")["station_count"].tolist() == [50]
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_load_warm_snapshot_ignores_stale_files(mock_conn, tmp_path):
+    from data.duckdb_engine import load_warm_snapshot
+    from data.duckdb_engine import replace_latest_stations
+    from data.duckdb_engine import save_warm_snapshot
+
+    mock_conn.return_value = duckdb.connect(":memory:")
+    with patch.object(duckdb_engine_module.settings, "warm_start_dir", str(tmp_path)):
+        replace_latest_stations(_random_stations(10))
+        save_warm_snapshot("latest_stations")
+        with (
+            patch.object(duckdb_engine_module.settings, "warm_start_max_age_hours", 1),
+            patch.object(duckdb_engine_module.time, "time", return_value=time.time() + 7200),
+        ):
+            assert load_warm_snapshot() == []
+
+
+def test_warm_snapshot_is_disabled_without_directory(tmp_path):
+    from data.duckdb_engine import load_warm_snapshot
+    from data.duckdb_engine import save_warm_snapshot
+
+    with patch.object(duckdb_engine_module.settings, "warm_start_dir", ""):
+        save_warm_snapshot("latest_stations")
+        assert load_warm_snapshot() == []
+    assert list(tmp_path.iterdir()) == []
+
+
+# --- Snapshot-versioned query result cache ---
+
+
+def _stations_snapshot_df():
+    return pd.DataFrame(
+        {
+            "label": ["station_a", "station_b", "station_c"],
+            "address": ["calle a", "calle b", "calle c"],
+            "municipality": ["madrid", "madrid", "barcelona"],
+            "province": ["madrid", "madrid", "barcelona"],
+            "zip_code": ["28001", "28001", "08001"],
+            "latitude": [40.4168, 40.4200, 41.3851],
+            "longitude": [-3.7038, -3.7000, 2.1734],
+            "diesel_a_price": [1.45, 1.50, 1.55],
+        }
+    )
+
+
+@pytest.fixture
+def cached_stations():
+    from data.duckdb_engine import clear_query_cache
+    from data.duckdb_engine import replace_latest_stations
+
+    with patch("data.duckdb_engine.get_connection", return_value=duckdb.connect(":memory:")):
+        clear_query_cache()
+        replace_latest_stations(_stations_snapshot_df())
+        yield
+        clear_query_cache()
+
+
+def test_query_cache_serves_repeat_calls_until_snapshot_swaps(cached_stations):
+    from data.duckdb_engine import get_query_cache_stats
+    from data.duckdb_engine import replace_latest_stations
+
+    duckdb_engine_module.reset_query_stats()
+    first = query_cheapest_zones("madrid", "diesel_a_price")
+    second = query_cheapest_zones(province="madrid", fuel_type="diesel_a_price")
+    assert second.equals(first)
+    assert duckdb_engine_module.get_query_stats()["query_cheapest_zones"]["count"] == 1
+
+    replace_latest_stations(_stations_snapshot_df().assign(diesel_a_price=[1.30, 1.30, 1.55]))
+    third = query_cheapest_zones("madrid", "diesel_a_price")
+
+    assert third.iloc[0]["avg_price"] == pytest.approx(1.30)
+    stats = get_query_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["invalidations"] == 1
+    assert stats["functions"]["query_cheapest_zones"] == {"hits": 1, "misses": 2}
+
+
+def test_query_cache_returns_copies(cached_stations):
+    from data.duckdb_engine import get_distinct_provinces
+
+    result = query_cheapest_zones("madrid", "diesel_a_price")
+    result["avg_price"] = 0.0
+    get_distinct_provinces()["madrid"] = "changed"
+
+    assert query_cheapest_zones("madrid", "diesel_a_price").iloc[0]["avg_price"] == pytest.approx(1.475)
+    assert get_distinct_provinces()["madrid"] == "Madrid"
+
+
+def test_query_cache_evicts_least_recently_used_over_entry_budget(cached_stations):
+    from data.duckdb_engine import get_query_cache_stats
+
+    with patch.object(duckdb_engine_module.settings, "query_cache_max_entries", 2):
+        query_cheapest_by_zip("28001", "diesel_a_price", 1)
+        query_cheapest_by_zip("08001", "diesel_a_price", 1)
+        query_cheapest_by_zip("28001", "diesel_a_price", 1)
+        query_cheapest_by_zip("99999", "diesel_a_price", 1)
+        query_cheapest_by_zip("28001", "diesel_a_price", 1)
+
+    stats = get_query_cache_stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+
+
+def test_query_cache_skips_results_over_byte_budget(cached_stations):
+    from data.duckdb_engine import get_query_cache_stats
+
+    with patch.object(duckdb_engine_module.settings, "query_cache_max_mb", 0):
+        query_cheapest_zones("madrid", "diesel_a_price")
+        query_cheapest_zones("madrid", "diesel_a_price")
+
+    stats = get_query_cache_stats()
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+    assert stats["hits"] == 0
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_query_cache_bypasses_tables_not_published_as_snapshots(mock_conn):
+    from data.duckdb_engine import get_query_cache_stats
+
+    conn = duckdb.connect(":memory:")
+    mock_conn.return_value = conn
+    with patch.dict(duckdb_engine_module._snapshot_generations, clear=True):
+        _setup_test_table(conn)
+        before = get_query_cache_stats()
+        assert len(query_cheapest_by_zip("28001", "diesel_a_price", 3)) == 2
+        conn.execute("DELETE FROM latest_stations WHERE label = 'station_a'")
+        assert len(query_cheapest_by_zip("28001", "diesel_a_price", 3)) == 1
+
+    after = get_query_cache_stats()
+    assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
+
+
+def test_query_price_trends_scans_cached_raw_files(tmp_path):
+    from data.duckdb_engine import query_price_trends
+
+    paths = [tmp_path / "day1.parquet", tmp_path / "day2.parquet"]
+    pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(["2026-04-01T08:00", "2026-04-01T08:00", "2026-04-01T08:00"]),
+            "zip_code": ["28001", "28001", "08001"],
+            "diesel_a_price": [1.50, 1.60, 1.90],
+            "gasoline_95_e5_price": [1.70, None, 1.80],
+        }
+    ).to_parquet(paths[0])
+    # A later file with an extra column and a missing price.
+    pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(["2026-04-02T08:00", "2026-04-02T08:00"]),
+            "zip_code": ["28001", "28001"],
+            "diesel_a_price": [1.40, None],
+            "gasoline_95_e5_price": [1.75, 1.65],
+            "brand": ["repsol", "cepsa"],
+        }
+    ).to_parquet(paths[1])
+
+    with patch("data.duckdb_engine.cached_parquet_paths", return_value=nullcontext(paths)) as mock_paths:
+        result = query_price_trends(["day1", "day2"], "28001", "diesel_a_price")
+
+    mock_paths.assert_called_once_with(["day1", "day2"])
+    assert [str(d)[:10] for d in result["date"]] == ["2026-04-01", "2026-04-02"]
+    assert result["avg_price"].round(2).tolist() == [1.55, 1.40]
+    assert result["min_price"].tolist() == [1.50, 1.40]
+    assert result["max_price"].tolist() == [1.60, 1.40]
@@ -4,6 +4,19 @@ from types import SimpleNamespace
 from unittest.mock import Mock
 from unittest.mock import patch
 
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_bucket_manifest(tmp_path_factory):
+    import data.gcs_client as gcs_client
+
+    manifest_dir = tmp_path_factory.mktemp("manifest")
+    with patch.object(gcs_client.settings, "parquet_cache_dir", str(manifest_dir)), patch.object(
+        gcs_client, "_manifest", gcs_client._BucketManifest()
+    ), patch.object(gcs_client, "_aggregate_memory_cache", gcs_client._DecodedAggregateCache()):
+        yield manifest_dir
+
 
 @patch("data.gcs_client._get_bucket")
 @patch("data.gcs_client.utcnow")
@@ -79,3 +92,419 @@ def test_list_parquet_files_with_metadata_returns_name_date_size(mock_utcnow, mo
         "date": "2025-01-09",
         "size_bytes": 600_000,
     }
+
+
+def _parquet_bytes(rows: int) -> bytes:
+    import io
+
+    import pandas as pd
+
+    buffer = io.BytesIO()
+    pd.DataFrame({"value": range(rows)}).to_parquet(buffer)
+    return buffer.getvalue()
+
+
+def _fake_bucket(payloads: dict[str, bytes], generations: dict[str, int] | None = None):
+    downloads = []
+
+    def blob(name):
+        def download_as_bytes():
+            downloads.append(name)
+            return payloads[name]
+
+        return SimpleNamespace(
+            name=name,
+            size=len(payloads.get(name, b"")),
+            generation=(generations or {}).get(name, 1),
+            md5_hash=None,
+            download_as_bytes=download_as_bytes,
+        )
+
+    def get_blob(name):
+        return blob(name) if name in payloads else None
+
+    return SimpleNamespace(blob=blob, get_blob=get_blob, downloads=downloads)
+
+
+def _fresh_disk_cache(tmp_path, max_mb):
+    import data.gcs_client as gcs_client
+
+    return (
+        patch.object(gcs_client.settings, "parquet_cache_dir", str(tmp_path)),
+        patch.object(gcs_client.settings, "parquet_cache_max_mb", max_mb),
+        patch.object(gcs_client, "_disk_cache_budget", gcs_client._DiskCacheBudget()),
+    )
+
+
+@patch("data.gcs_client.utcnow", return_value=datetime(2026, 4, 10, 12, 0, tzinfo=timezone.utc))
+def test_disk_cache_evicts_least_recently_used_raw_files(_mock_utcnow, tmp_path):
+    import data.gcs_client as gcs_client
+
+    names = [f"spain_fuel_prices_2026-04-0{day}T00:00:00.parquet" for day in (1, 2, 3)]
+    payloads = {name: _parquet_bytes(20_000) for name in names}
+    size = len(payloads[names[0]])
+    # Budget fits two files but not three.
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, (2.5 * size) / (1024 * 1024))
+    with settings_dir, settings_budget, budget, patch.object(
+        gcs_client, "_get_bucket", return_value=_fake_bucket(payloads)
+    ):
+        gcs_client.download_parquet_as_df(names[0])
+        gcs_client.download_parquet_as_df(names[1])
+        gcs_client.download_parquet_as_df(names[0])  # hit: names[1] is now least recently used
+        gcs_client.download_parquet_as_df(names[2])
+
+        stats = gcs_client.get_parquet_cache_stats()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [names[0], names[2]]
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+
+
+@patch("data.gcs_client.utcnow", return_value=datetime(2026, 4, 10, 12, 0, tzinfo=timezone.utc))
+def test_disk_cache_never_evicts_todays_file_or_aggregates(_mock_utcnow, tmp_path):
+    import data.gcs_client as gcs_client
+
+    today = "spain_fuel_prices_2026-04-10T08:00:00.parquet"
+    older = "spain_fuel_prices_2026-04-01T00:00:00.parquet"
+    payloads = {
+        today: _parquet_bytes(20_000),
+        older: _parquet_bytes(20_000),
+        "aggregates/x.parquet": _parquet_bytes(10),
+    }
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 0)
+    with settings_dir, settings_budget, budget, patch.object(
+        gcs_client, "_get_bucket", return_value=_fake_bucket(payloads)
+    ):
+        gcs_client.download_parquet_as_df(today)
+        gcs_client.download_aggregate("x.parquet")
+        gcs_client.download_parquet_as_df(older)
+        gcs_client.download_parquet_as_df("spain_fuel_prices_2026-04-01T00:00:00.parquet")
+
+        stats = gcs_client.get_parquet_cache_stats()
+
+    assert sorted(path.name for path in tmp_path.glob("*.parquet")) == ["aggregates_x.parquet", today]
+    assert stats["pinned_entries"] == 2
+    assert stats["evictions"] == 2
+
+
+def test_disk_cache_indexes_files_left_by_a_previous_process(tmp_path):
+    import data.gcs_client as gcs_client
+
+    (tmp_path / "spain_fuel_prices_2020-01-01T00:00:00.parquet").write_bytes(_parquet_bytes(100))
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 512)
+    with settings_dir, settings_budget, budget:
+        gcs_client._disk_cache_budget.touch(tmp_path / "spain_fuel_prices_2020-01-01T00:00:00.parquet")
+        stats = gcs_client.get_parquet_cache_stats()
+
+    assert stats["entries"] == 1
+    assert stats["bytes"] > 0
+
+
+def _listing_bucket(blobs: list[SimpleNamespace]):
+    bucket = Mock()
+    bucket.list_blobs.side_effect = lambda prefix: [blob for blob in blobs if blob.name.startswith(prefix)]
+    return bucket
+
+
+@patch("data.gcs_client.utcnow")
+def test_bucket_manifest_refreshes_only_new_day_prefixes(mock_utcnow):
+    import data.gcs_client as gcs_client
+
+    blobs = [
+        SimpleNamespace(name="spain_fuel_prices_2025-01-08T01-00-00.parquet", size=100, generation=1),
+        SimpleNamespace(name="spain_fuel_prices_2025-01-09T01-00-00.parquet", size=100, generation=2),
+    ]
+    bucket = _listing_bucket(blobs)
+    mock_utcnow.return_value = datetime(2025, 1, 9, 12, 0, tzinfo=timezone.utc)
+    with patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        assert gcs_client.get_latest_parquet_file() == "spain_fuel_prices_2025-01-09T01-00-00.parquet"
+        # Served from the index until the refresh interval elapses.
+        assert gcs_client.list_parquet_files(days_back=7) == [blob.name for blob in blobs]
+        assert bucket.list_blobs.call_count == 1
+
+        blobs.append(SimpleNamespace(name="spain_fuel_prices_2025-01-10T01-00-00.parquet", size=100, generation=3))
+        mock_utcnow.return_value = datetime(2025, 1, 10, 12, 0, tzinfo=timezone.utc)
+        gcs_client._manifest._refreshed_at = 0.0
+        bucket.list_blobs.reset_mock()
+
+        assert gcs_client.get_latest_parquet_file() == "spain_fuel_prices_2025-01-10T01-00-00.parquet"
+
+    prefixes = [call.kwargs["prefix"] for call in bucket.list_blobs.call_args_list]
+    assert prefixes == ["spain_fuel_prices_2025-01-09", "spain_fuel_prices_2025-01-10"]
+
+
+@patch("data.gcs_client.utcnow", return_value=datetime(2025, 1, 10, 12, 0, tzinfo=timezone.utc))
+def test_bucket_manifest_is_reloaded_from_disk_and_resumes_incrementally(_mock_utcnow, fresh_bucket_manifest):
+    import data.gcs_client as gcs_client
+
+    blobs = [SimpleNamespace(name="spain_fuel_prices_2025-01-10T01-00-00.parquet", size=100, generation=1)]
+    with patch.object(gcs_client, "_get_bucket", return_value=_listing_bucket(blobs)):
+        gcs_client.list_parquet_files_with_metadata()
+    assert (fresh_bucket_manifest / "bucket_manifest.json").exists()
+
+    bucket = _listing_bucket(blobs)
+    with patch.object(gcs_client, "_manifest", gcs_client._BucketManifest()), patch.object(
+        gcs_client, "_get_bucket", return_value=bucket
+    ):
+        assert gcs_client.get_latest_parquet_file() == blobs[0].name
+
+    bucket.list_blobs.assert_called_once_with(prefix="spain_fuel_prices_2025-01-10")
+
+
+@patch("data.gcs_client.utcnow", return_value=datetime(2025, 1, 10, 12, 0, tzinfo=timezone.utc))
+def test_bucket_manifest_serves_last_index_when_refresh_fails(_mock_utcnow):
+    import data.gcs_client as gcs_client
+
+    blobs = [SimpleNamespace(name="spain_fuel_prices_2025-01-10T01-00-00.parquet", size=100)]
+    bucket = _listing_bucket(blobs)
+    with patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        gcs_client.list_parquet_files()
+        bucket.list_blobs.side_effect = ConnectionError("offline")
+        gcs_client._manifest._refreshed_at = 0.0
+
+        assert gcs_client.get_latest_parquet_file() == blobs[0].name
+
+
+def test_get_latest_parquet_file_returns_none_when_bucket_is_unreachable():
+    import data.gcs_client as gcs_client
+
+    with patch.object(gcs_client, "_get_bucket", side_effect=ConnectionError("offline")):
+        assert gcs_client.get_latest_parquet_file() is None
+
+
+def test_aggregate_memory_cache_coalesces_concurrent_cold_loads(tmp_path):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import data.gcs_client as gcs_client
+
+    downloads = []
+    release = threading.Event()
+    payload = _parquet_bytes(1_000)
+
+    def download_as_bytes():
+        downloads.append(1)
+        release.wait(timeout=5)
+        return payload
+
+    bucket = SimpleNamespace(
+        get_blob=lambda name: SimpleNamespace(name=name, size=len(payload), download_as_bytes=download_as_bytes)
+    )
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 512)
+    with settings_dir, settings_budget, budget, patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            futures = [pool.submit(gcs_client.download_aggregate, "x.parquet") for _ in range(20)]
+            release.set()
+            frames = [future.result() for future in futures]
+
+        stats = gcs_client.get_aggregate_memory_cache_stats()
+
+    assert len(downloads) == 1
+    assert all(len(df) == 1_000 for df in frames)
+    assert stats["entries"] == 1
+
+
+def test_aggregate_memory_cache_reloads_when_cache_file_changes(tmp_path):
+    import os
+
+    import data.gcs_client as gcs_client
+
+    payloads = {"aggregates/x.parquet": _parquet_bytes(10)}
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 512)
+    with settings_dir, settings_budget, budget, patch.object(
+        gcs_client, "_get_bucket", return_value=_fake_bucket(payloads)
+    ):
+        first = gcs_client.download_aggregate("x.parquet")
+        with patch.object(gcs_client.pd, "read_parquet", side_effect=AssertionError("decoded again")):
+            # Column assignment on the returned frame must not leak into the cached one.
+            first["extra"] = 1
+            assert list(gcs_client.download_aggregate("x.parquet").columns) == ["value"]
+
+        cached_file = tmp_path / "aggregates_x.parquet"
+        gcs_client.pd.DataFrame({"value": range(20)}).to_parquet(cached_file)
+        os.utime(cached_file, (cached_file.stat().st_atime, cached_file.stat().st_mtime + 1))
+
+        assert len(gcs_client.download_aggregate("x.parquet")) == 20
+
+
+def test_aggregate_memory_cache_evicts_least_recently_used(tmp_path):
+    import data.gcs_client as gcs_client
+
+    payloads = {f"aggregates/{name}.parquet": _parquet_bytes(20_000) for name in ("a", "b", "c")}
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 512)
+    # 20k int64 values are ~160 KB as an Arrow table; the budget fits two of them.
+    with settings_dir, settings_budget, budget, patch.object(
+        gcs_client.settings, "aggregate_memory_cache_mb", 0.4
+    ), patch.object(gcs_client, "_get_bucket", return_value=_fake_bucket(payloads)):
+        gcs_client.download_aggregate_table("a.parquet")
+        gcs_client.download_aggregate_table("b.parquet")
+        gcs_client.download_aggregate_table("a.parquet")
+        gcs_client.download_aggregate_table("c.parquet")
+
+        cached = list(gcs_client._aggregate_memory_cache._entries)
+        stats = gcs_client.get_aggregate_memory_cache_stats()
+
+    assert cached == ["a.parquet", "c.parquet"]
+    assert stats["evictions"] == 1
+
+
+def test_expired_aggregate_is_revalidated_without_downloading(tmp_path):
+    import time
+
+    import data.gcs_client as gcs_client
+
+    payloads = {"aggregates/x.parquet": _parquet_bytes(1_000)}
+    bucket = _fake_bucket(payloads)
+    saved_before = gcs_client._REVALIDATED_BYTES.value(kind="aggregate")
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 512)
+    with settings_dir, settings_budget, budget, patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        first = gcs_client.download_aggregate("x.parquet")
+
+        with patch.object(gcs_client.settings, "parquet_cache_max_age_hours", 0), patch.object(
+            gcs_client.pd, "read_parquet", side_effect=AssertionError("decoded again")
+        ):
+            second = gcs_client.download_aggregate("x.parquet")
+
+        refreshed_age = time.time() - gcs_client.get_aggregate_cache_mtime("x.parquet")
+
+    assert refreshed_age < 60
+    assert bucket.downloads == ["aggregates/x.parquet"]
+    assert second.equals(first)
+    saved = gcs_client._REVALIDATED_BYTES.value(kind="aggregate") - saved_before
+    assert saved == len(payloads["aggregates/x.parquet"])
+
+
+def test_expired_aggregate_is_downloaded_when_generation_changes(tmp_path):
+    import data.gcs_client as gcs_client
+
+    payloads = {"aggregates/x.parquet": _parquet_bytes(10)}
+    generations = {"aggregates/x.parquet": 1}
+    bucket = _fake_bucket(payloads, generations)
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 512)
+    with settings_dir, settings_budget, budget, patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        gcs_client.download_aggregate("x.parquet")
+        payloads["aggregates/x.parquet"] = _parquet_bytes(20)
+        generations["aggregates/x.parquet"] = 2
+
+        with patch.object(gcs_client.settings, "parquet_cache_max_age_hours", 0):
+            assert len(gcs_client.download_aggregate("x.parquet")) == 20
+
+    assert bucket.downloads == ["aggregates/x.parquet", "aggregates/x.parquet"]
+
+
+@patch("data.gcs_client.utcnow", return_value=datetime(2026, 4, 10, 12, 0, tzinfo=timezone.utc))
+def test_expired_todays_raw_file_is_revalidated_without_downloading(_mock_utcnow, tmp_path):
+    import data.gcs_client as gcs_client
+
+    today = "spain_fuel_prices_2026-04-10T08:00:00.parquet"
+    bucket = _fake_bucket({today: _parquet_bytes(100)})
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 512)
+    with settings_dir, settings_budget, budget, patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        gcs_client.download_parquet_as_df(today)
+
+        with patch.object(gcs_client.settings, "parquet_cache_max_age_hours", 0):
+            assert len(gcs_client.download_parquet_as_df(today)) == 100
+
+    assert bucket.downloads == [today]
+
+
+def test_sync_aggregates_with_manifest_touches_current_copies_and_redownloads_changed_ones(tmp_path):
+    import data.gcs_client as gcs_client
+
+    payloads = {name: _parquet_bytes(10) for name in ("aggregates/a.parquet", "aggregates/b.parquet")}
+    generations = {name: 1 for name in payloads}
+    bucket = _fake_bucket(payloads, generations)
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 512)
+    with settings_dir, settings_budget, budget, patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        gcs_client.download_aggregate("a.parquet")
+        gcs_client.download_aggregate("b.parquet")
+        payloads["aggregates/b.parquet"] = _parquet_bytes(30)
+        generations["aggregates/b.parquet"] = 2
+        manifest = {
+            "version": 2,
+            "aggregates": {
+                "a.parquet": {"generation": 1, "md5_hash": None},
+                "b.parquet": {"generation": 2, "md5_hash": None},
+                "never_used.parquet": {"generation": 1, "md5_hash": None},
+            },
+        }
+        bucket.downloads.clear()
+
+        changed = gcs_client.sync_aggregates_with_manifest(manifest)
+
+        with patch.object(gcs_client.pd, "read_parquet", side_effect=AssertionError("decoded again")):
+            # The touched copy of a.parquet is still served from memory.
+            assert len(gcs_client.download_aggregate("a.parquet")) == 10
+            assert len(gcs_client.download_aggregate("b.parquet")) == 30
+
+    assert changed == ["b.parquet"]
+    assert bucket.downloads == ["aggregates/b.parquet"]
+
+
+@patch("data.gcs_client.utcnow", return_value=datetime(2026, 4, 10, 12, 0, tzinfo=timezone.utc))
+def test_cached_parquet_paths_downloads_only_missing_files(_mock_utcnow, tmp_path):
+    import data.gcs_client as gcs_client
+
+    names = [f"spain_fuel_prices_2026-04-0{day}T00:00:00.parquet" for day in (1, 2)]
+    bucket = _fake_bucket({name: _parquet_bytes(100) for name in names})
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 64)
+    with settings_dir, settings_budget, budget, patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        gcs_client.download_parquet_as_df(names[0])
+        with gcs_client.cached_parquet_paths(names) as paths:
+            pass
+        with gcs_client.cached_parquet_paths(names) as again:
+            pass
+
+    assert paths == again == [tmp_path / name for name in names]
+    assert all(path.exists() for path in paths)
+    assert bucket.downloads == names
+
+
+@patch("data.gcs_client.utcnow", return_value=datetime(2026, 4, 10, 12, 0, tzinfo=timezone.utc))
+def test_cached_parquet_paths_keeps_a_batch_over_budget_until_the_block_exits(_mock_utcnow, tmp_path):
+    import data.gcs_client as gcs_client
+
+    names = [f"spain_fuel_prices_2026-04-0{day}T00:00:00.parquet" for day in (1, 2, 3)]
+    payloads = {name: _parquet_bytes(20_000) for name in names}
+    size = len(payloads[names[0]])
+    # Budget fits one file and a half, so every download of the batch pushes the cache over it.
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, (1.5 * size) / (1024 * 1024))
+    with settings_dir, settings_budget, budget, patch.object(
+        gcs_client, "_get_bucket", return_value=_fake_bucket(payloads)
+    ):
+        with gcs_client.cached_parquet_paths(names) as paths:
+            held = [path.exists() for path in paths]
+            held_stats = gcs_client.get_parquet_cache_stats()
+
+        stats = gcs_client.get_parquet_cache_stats()
+
+    assert held == [True, True, True]
+    assert held_stats["pinned_entries"] == 3
+    assert held_stats["evictions"] == 0
+    assert len(list(tmp_path.glob("*.parquet"))) == 1
+    assert stats["pinned_entries"] == 0
+    assert stats["evictions"] == 2
+    assert stats["bytes"] <= stats["max_bytes"]
+
+
+def test_downloads_are_cached_verbatim_and_converted_to_pandas_once(tmp_path):
+    import numpy as np
+
+    import data.gcs_client as gcs_client
+
+    payload = _parquet_bytes(1_000)
+    bucket = _fake_bucket({"aggregates/a.parquet": payload})
+    settings_dir, settings_budget, budget = _fresh_disk_cache(tmp_path, 64)
+    with settings_dir, settings_budget, budget, patch.object(gcs_client, "_get_bucket", return_value=bucket):
+        table = gcs_client.download_aggregate_table("a.parquet")
+        first = gcs_client.download_aggregate("a.parquet")
+        second = gcs_client.download_aggregate("a.parquet")
+
+    assert (tmp_path / "aggregates_a.parquet").read_bytes() == payload
+    assert not list(tmp_path.glob("*.tmp"))
+    assert table.num_rows == 1_000
+    assert first["value"].tolist() == list(range(1_000))
+    # The second caller gets a view of the frame converted for the first.
+    assert np.shares_memory(first["value"].to_numpy(), second["value"].to_numpy())
+    assert bucket.downloads == ["aggregates/a.parquet"]
@@ -10,3 +10,115 @@ def test_point_inside_polygon():
 def test_point_outside_polygon():
     polygon = [[-1, -1], [1, -1], [1, 1], [-1, 1], [-1, -1]]
     assert point_in_polygon(5.0, 5.0, polygon) is False
+
+
+def test_polygon_index_matches_scalar_ray_casting_on_madrid_districts():
+    import random
+
+    from services.geo_utils import point_in_multipolygon
+    from services.geo_utils import PolygonIndex
+
+    from data.geojson_loader import load_madrid_districts
+
+    features = load_madrid_districts()["features"]
+    rng = random.Random(1)
+    points = [(rng.uniform(40.30, 40.56), rng.uniform(-3.85, -3.52)) for _ in range(500)]
+
+    located = PolygonIndex(features, "nombre").locate([lat for lat, _ in points], [lon for _, lon in points])
+
+    expected = [
+        next((i for i, feature in enumerate(features) if point_in_multipolygon(lat, lon, feature["geometry"])), -1)
+        for lat, lon in points
+    ]
+    assert located.tolist() == expected
+    assert (located >= 0).sum() > 100
+
+
+def test_polygon_index_lookup_names_the_polygon_or_multipolygon_of_each_point():
+    from services.geo_utils import PolygonIndex
+
+    square = [[-1, -1], [1, -1], [1, 1], [-1, 1], [-1, -1]]
+    far = [[[9, 9], [11, 9], [11, 11], [9, 11], [9, 9]]]
+    index = PolygonIndex(
+        [
+            {"properties": {"nombre": "a"}, "geometry": {"type": "Polygon", "coordinates": [square]}},
+            {"properties": {"nombre": "b"}, "geometry": {"type": "MultiPolygon", "coordinates": [far]}},
+            {"properties": {"nombre": "empty"}, "geometry": {"type": "Polygon", "coordinates": [far[0]]}},
+        ],
+        "nombre",
+    )
+
+    located = index.locate([0.0, 0.5, 10.0, 50.0], [0.0, 0.5, 10.0, 50.0])
+    names = index.lookup([0.0, 0.5, 10.0, 50.0], [0.0, 0.5, 10.0, 50.0])
+
+    # "empty" covers the same ring as "b", but the first feature containing a point wins.
+    assert located.tolist() == [0, 0, 1, -1]
+    assert names.tolist() == ["a", "a", "b", None]
+
+
+def test_nested_polygon_index_locates_children_within_their_parent():
+    from services.geo_utils import NestedPolygonIndex
+    from services.geo_utils import PolygonIndex
+
+    def square(name, parent, x0, y0, size):
+        ring = [[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size], [x0, y0]]
+        return {
+            "properties": {"nombre": name, "distrito": parent},
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        }
+
+    parents = PolygonIndex([square("west", None, 0, 0, 2), square("east", None, 2, 0, 2)], "nombre")
+    # "stray" overlaps the west parent but belongs to east, so it is never tested for west points.
+    children = [square("w1", "west", 0, 0, 1), square("stray", "east", 0, 1, 1), square("e1", "east", 2, 0, 2)]
+    index = NestedPolygonIndex(parents, children, "nombre", "distrito")
+
+    parent_names, child_names = index.lookup([0.5, 1.5, 1.0, 5.0], [0.5, 0.5, 3.0, 5.0])
+
+    assert parent_names.tolist() == ["west", "west", "east", None]
+    assert child_names.tolist() == ["w1", None, "e1", None]
+
+
+def test_simplify_geometry_reduces_and_rounds_rings():
+    import math
+
+    from services.geo_utils import simplify_geometry
+
+    circle = [
+        [round(math.cos(a / 100 * 2 * math.pi), 6), round(math.sin(a / 100 * 2 * math.pi), 6)] for a in range(100)
+    ]
+    speck = [[5.0, 5.0], [5.00001, 5.0], [5.00001, 5.00001], [5.0, 5.0]]
+    geometry = {"type": "MultiPolygon", "coordinates": [[circle + circle[:1]], [speck]]}
+
+    simplified = simplify_geometry(geometry, 0.01, 2)
+
+    assert len(simplified["coordinates"]) == 1
+    ring = simplified["coordinates"][0][0]
+    assert 8 <= len(ring) < 40
+    assert ring[0] == ring[-1]
+    assert all(coordinate == round(coordinate, 2) for point in ring for coordinate in point)
+
+
+def test_simplify_geometry_keeps_a_feature_smaller_than_the_tolerance():
+    from services.geo_utils import simplify_geometry
+
+    square = [[0.0, 0.0], [0.004, 0.0], [0.004, 0.004], [0.0, 0.004], [0.0, 0.0]]
+
+    simplified = simplify_geometry({"type": "Polygon", "coordinates": [square]}, 0.01, 3)
+
+    assert simplified == {
+        "type": "Polygon",
+        "coordinates": [[[0.0, 0.0], [0.004, 0.0], [0.004, 0.004], [0.0, 0.004], [0.0, 0.0]]],
+    }
+
+
+def test_detail_for_zoom_picks_coarsest_level_within_a_pixel():
+    from services.geo_utils import detail_for_zoom
+
+    assert [detail_for_zoom(zoom) for zoom in (5, 7, 8, 10, 13, 16)] == [
+        "low",
+        "low",
+        "medium",
+        "medium",
+        "high",
+        "full",
+    ]
@@ -3,6 +3,7 @@ import json
 from unittest.mock import patch
 
 import data.geojson_loader as loader_module
+from data.postal_geometry import write_postal_geometry_store
 
 
 SAMPLE_GEOJSON = {
@@ -32,6 +33,7 @@ SAMPLE_GEOJSON = {
 
 def _reset_cache():
     loader_module._postal_code_index = None
+    loader_module._postal_geometry_stores.clear()
 
 
 def test_load_postal_code_boundary_returns_feature(tmp_path):
@@ -192,3 +194,61 @@ def test_load_postal_codes_for_zip_list_empty_input(tmp_path):
 
     assert result["features"] == []
     _reset_cache()
+
+
+def test_postal_geometry_store_round_trips_geojson(tmp_path):
+    _reset_cache()
+    write_postal_geometry_store(
+        MULTI_ZIP_GEOJSON["features"] + SAMPLE_GEOJSON["features"][1:], tmp_path / "spain-postal-codes.bin"
+    )
+
+    with patch.object(loader_module, "_GEOJSON_DIR", tmp_path):
+        boundary = loader_module.load_postal_code_boundary("28002")
+        multipolygon = loader_module.load_postal_code_boundary("08001")
+        collection = loader_module.load_postal_codes_for_zip_list(["28001", "99999", "28002"])
+
+    assert boundary == MULTI_ZIP_GEOJSON["features"][1]
+    assert multipolygon == SAMPLE_GEOJSON["features"][1]
+    assert [feature["properties"]["COD_POSTAL"] for feature in collection["features"]] == ["28001", "28002"]
+    _reset_cache()
+
+
+def test_postal_geometry_store_is_preferred_over_geojson(tmp_path):
+    _reset_cache()
+    (tmp_path / "spain-postal-codes.geojson").write_text(json.dumps(MULTI_ZIP_GEOJSON), encoding="utf-8")
+    write_postal_geometry_store(SAMPLE_GEOJSON["features"][:1], tmp_path / "spain-postal-codes.bin")
+
+    with patch.object(loader_module, "_GEOJSON_DIR", tmp_path):
+        assert loader_module.load_postal_code_boundary("28001") == SAMPLE_GEOJSON["features"][0]
+        assert loader_module.load_postal_code_boundary("28002") is None
+
+    assert loader_module._postal_code_index is None
+    _reset_cache()
+
+
+def test_load_postal_codes_for_zip_list_reads_precomputed_detail_store(tmp_path):
+    _reset_cache()
+    write_postal_geometry_store(SAMPLE_GEOJSON["features"], tmp_path / "spain-postal-codes.bin")
+    low = {**MULTI_ZIP_GEOJSON["features"][1], "properties": {"COD_POSTAL": "28001"}}
+    write_postal_geometry_store([low], tmp_path / "spain-postal-codes.low.bin")
+
+    with patch.object(loader_module, "_GEOJSON_DIR", tmp_path):
+        result = loader_module.load_postal_codes_for_zip_list(["28001"], "low")
+
+    assert result["features"][0]["geometry"] == low["geometry"]
+    _reset_cache()
+
+
+def test_load_postal_codes_for_zip_list_simplifies_without_detail_store(tmp_path):
+    _reset_cache()
+    (tmp_path / "spain-postal-codes.geojson").write_text(json.dumps(MULTI_ZIP_GEOJSON), encoding="utf-8")
+
+    with patch.object(loader_module, "_GEOJSON_DIR", tmp_path):
+        full = loader_module.load_postal_codes_for_zip_list(["28001"])
+        low = loader_module.load_postal_codes_for_zip_list(["28001"], "low")
+
+    assert full["features"][0] == MULTI_ZIP_GEOJSON["features"][0]
+    assert low["features"][0]["geometry"]["coordinates"] == [
+        [[-3.71, 40.41], [-3.7, 40.41], [-3.7, 40.42], [-3.71, 40.42], [-3.71, 40.41]]
+    ]
+    _reset_cache()
@@ -2,11 +2,36 @@ import datetime
 from unittest.mock import patch
 
 import pandas as pd
+import pyarrow as pa
+import pytest
 from api.schemas import FuelType
 
 from data.geojson_loader import normalize_data_province_name
 
 
+@pytest.fixture(autouse=True)
+def _fresh_aggregate_registry():
+    import data.duckdb_engine as engine
+
+    engine._aggregate_versions.clear()
+    with patch("data.duckdb_engine.get_aggregate_cache_mtime", return_value=None):
+        yield
+    engine._aggregate_versions.clear()
+
+
+def _serving(aggregate_df):
+    """Serve *aggregate_df* as the downloaded aggregate for the duration of the block."""
+    table = None if aggregate_df is None else pa.Table.from_pandas(aggregate_df, preserve_index=False)
+    return patch("data.duckdb_engine.download_aggregate_table", return_value=table)
+
+
+def _load_zip_code_trend(aggregate_df):
+    from data.duckdb_engine import refresh_zip_code_trend_snapshot
+
+    with _serving(aggregate_df):
+        assert refresh_zip_code_trend_snapshot() is True
+
+
 def _make_province_daily_stats():
     """Sample province_daily_stats aggregate."""
     rows = []
@@ -50,7 +75,8 @@ class TestQueryProvinceRanking:
         from data.duckdb_engine import query_province_ranking
 
         df = _make_province_daily_stats()
-        result = query_province_ranking(df, "gasoline_95_e5_price", 90)
+        with _serving(df):
+            result = query_province_ranking("gasoline_95_e5_price", 90)
 
         assert len(result) == 3
         assert "province" in result.columns
@@ -66,7 +92,8 @@ class TestQueryDayOfWeekPattern:
         from data.duckdb_engine import query_day_of_week_pattern
 
         df = _make_day_of_week_stats()
-        result = query_day_of_week_pattern(df, "gasoline_95_e5_price", None)
+        with _serving(df):
+            result = query_day_of_week_pattern("gasoline_95_e5_price", None)
 
         assert len(result) == 7
         assert "day_of_week" in result.columns
@@ -81,16 +108,14 @@ class TestProvinceNormalization:
         assert normalize_data_province_name("La Rioja") == "rioja (la)"
 
     @patch("data.duckdb_engine.query_day_of_week_pattern")
-    @patch("data.gcs_client.download_aggregate")
-    def test_get_day_of_week_pattern_normalizes_public_province_name(self, mock_download_aggregate, mock_query):
+    def test_get_day_of_week_pattern_normalizes_public_province_name(self, mock_query):
         from services.station_service import get_day_of_week_pattern
 
-        mock_download_aggregate.return_value = _make_day_of_week_stats()
         mock_query.return_value = pd.DataFrame()
 
         get_day_of_week_pattern(FuelType.gasoline_95_e5_price, "A Coruña")
 
-        assert mock_query.call_args.args[2] == "coruña (a)"
+        assert mock_query.call_args.args[1] == "coruña (a)"
 
 
 def _make_brand_daily_stats():
@@ -208,7 +233,8 @@ class TestQueryBrandRanking:
         from data.duckdb_engine import query_brand_ranking
 
         df = _make_brand_daily_stats()
-        result = query_brand_ranking(df, "gasoline_95_e5_price", 90)
+        with _serving(df):
+            result = query_brand_ranking("gasoline_95_e5_price", 90)
 
         assert len(result) == 3
         assert "brand" in result.columns
@@ -221,7 +247,8 @@ class TestQueryBrandRanking:
         from data.duckdb_engine import query_brand_ranking
 
         df = _make_brand_daily_stats()
-        result = query_brand_ranking(df, "gasoline_95_e5_price", 90, top_n=2)
+        with _serving(df):
+            result = query_brand_ranking("gasoline_95_e5_price", 90, top_n=2)
         assert len(result) == 2
 
     def test_weights_avg_price_by_station_count(self):
@@ -269,7 +296,8 @@ class TestQueryBrandRanking:
             ]
         )
 
-        result = query_brand_ranking(df, "gasoline_95_e5_price", 30)
+        with _serving(df):
+            result = query_brand_ranking("gasoline_95_e5_price", 30)
 
         assert list(result["brand"]) == ["steady", "volatile"]
         volatile_avg = result.loc[result["brand"] == "volatile", "avg_price"].iloc[0]
@@ -282,7 +310,8 @@ class TestQueryBrandPriceTrend:
         from data.duckdb_engine import query_brand_price_trend
 
         df = _make_brand_daily_stats()
-        result = query_brand_price_trend(df, "gasoline_95_e5_price", 90, ["repsol", "shell"])
+        with _serving(df):
+            result = query_brand_price_trend("gasoline_95_e5_price", 90, ["repsol", "shell"])
 
         assert not result.empty
         assert set(result.columns) == {"date", "brand", "avg_price"}
@@ -295,7 +324,8 @@ class TestQueryBrandPriceTrend:
         from data.duckdb_engine import query_brand_price_trend
 
         df = _make_brand_daily_stats()
-        result = query_brand_price_trend(df, "gasoline_95_e5_price", 90, [])
+        with _serving(df):
+            result = query_brand_price_trend("gasoline_95_e5_price", 90, [])
         assert result.empty
 
 
@@ -305,7 +335,8 @@ class TestQueryZipCodePriceTrend:
         from data.duckdb_engine import query_zip_code_price_trend
 
         df = _make_zip_code_daily_stats()
-        result = query_zip_code_price_trend(df, "28001", "gasoline_95_e5_price", 90)
+        _load_zip_code_trend(df)
+        result = query_zip_code_price_trend("28001", "gasoline_95_e5_price", 90)
 
         assert not result.empty
         assert set(result.columns) == {"date", "avg_price", "min_price", "max_price"}
@@ -316,7 +347,8 @@ class TestQueryZipCodePriceTrend:
         from data.duckdb_engine import query_zip_code_price_trend
 
         df = _make_zip_code_daily_stats()
-        result = query_zip_code_price_trend(df, "99999", "gasoline_95_e5_price", 90)
+        _load_zip_code_trend(df)
+        result = query_zip_code_price_trend("99999", "gasoline_95_e5_price", 90)
 
         assert result.empty
 
@@ -327,7 +359,8 @@ class TestQueryVolatilityByZone:
         from data.duckdb_engine import query_volatility_by_zone
 
         df = _make_zip_code_volatility_stats()
-        result = query_volatility_by_zone(df, "gasoline_95_e5_price", 90, mainland_only=False)
+        _load_zip_code_trend(df)
+        result = query_volatility_by_zone("gasoline_95_e5_price", 90, mainland_only=False)
 
         assert not result.empty
         assert set(result.columns) == {
@@ -351,10 +384,63 @@ class TestQueryVolatilityByZone:
         from data.duckdb_engine import query_volatility_by_zone
 
         df = _make_zip_code_volatility_stats()
-        result = query_volatility_by_zone(df, "gasoline_95_e5_price", 90, mainland_only=True)
+        _load_zip_code_trend(df)
+        result = query_volatility_by_zone("gasoline_95_e5_price", 90, mainland_only=True)
 
         zip_codes = set(result["zip_code"])
         assert "07001" not in zip_codes
         assert "50001" not in zip_codes
         assert "46001" not in zip_codes
         assert zip_codes == {"28001", "41001"}
+
+
+class TestAggregateRegistry:
+
+    def test_loads_aggregate_once_and_queries_in_place(self):
+        from data.duckdb_engine import load_aggregate
+        from data.duckdb_engine import query_brand_ranking
+
+        with _serving(_make_brand_daily_stats()) as mock_download:
+            first = load_aggregate("brand_daily_stats.parquet")
+            query_brand_ranking("gasoline_95_e5_price", 365)
+            second = load_aggregate("brand_daily_stats.parquet")
+
+        assert first == second == "agg_brand_daily_stats"
+        mock_download.assert_called_once_with("brand_daily_stats.parquet")
+
+    def test_reloads_when_local_cache_file_is_refetched(self):
+        from data.duckdb_engine import load_aggregate
+
+        with _serving(_make_brand_daily_stats()) as mock_download:
+            load_aggregate("brand_daily_stats.parquet")
+            with patch("data.duckdb_engine.get_aggregate_cache_mtime", return_value=123.0):
+                load_aggregate("brand_daily_stats.parquet")
+
+        assert mock_download.call_count == 2
+
+    def test_reloads_after_cache_window(self):
+        import data.duckdb_engine as engine
+
+        with _serving(_make_brand_daily_stats()) as mock_download:
+            engine.load_aggregate("brand_daily_stats.parquet")
+            with patch.object(engine.time, "time", return_value=engine.time.time() + 3 * 3600):
+                engine.load_aggregate("brand_daily_stats.parquet")
+
+        assert mock_download.call_count == 2
+
+    def test_keeps_last_table_when_reload_fails(self):
+        import data.duckdb_engine as engine
+
+        with _serving(_make_brand_daily_stats()):
+            engine.load_aggregate("brand_daily_stats.parquet")
+        engine._aggregate_versions.clear()
+        with _serving(None):
+            table = engine.load_aggregate("brand_daily_stats.parquet")
+
+        assert table == "agg_brand_daily_stats"
+
+    def test_never_published_aggregate_has_no_table(self):
+        from data.duckdb_engine import load_aggregate
+
+        with _serving(None):
+            assert load_aggregate("not_yet_published.parquet") is None
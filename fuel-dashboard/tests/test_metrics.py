@@ -0,0 +1,57 @@
+from metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(2.0, route="/a")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE fuel_dashboard_demo_seconds histogram" in lines
+    assert 'fuel_dashboard_demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'fuel_dashboard_demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'fuel_dashboard_demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'fuel_dashboard_demo_seconds_sum{route="/a"} 2.55' in lines
+    assert 'fuel_dashboard_demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_counter_escapes_label_values():
+    registry = MetricsRegistry()
+    registry.counter("demo_total", "Demo counter.", ("name",)).inc(name='a "b"\\c')
+
+    assert 'fuel_dashboard_demo_total{name="a \\"b\\"\\\\c"} 1' in registry.render()
+
+
+def test_caches_report_hits_misses_and_ratio():
+    registry = MetricsRegistry()
+    stats = registry.cache("disk")
+    stats.hit()
+    stats.hit()
+    stats.hit()
+    stats.miss()
+    registry.register_cache("lru", lambda: (0, 0))
+
+    lines = registry.render().splitlines()
+
+    assert 'fuel_dashboard_cache_hits_total{cache="disk"} 3' in lines
+    assert 'fuel_dashboard_cache_misses_total{cache="disk"} 1' in lines
+    assert 'fuel_dashboard_cache_hit_ratio{cache="disk"} 0.75' in lines
+    assert 'fuel_dashboard_cache_hit_ratio{cache="lru"} 0' in lines
+
+
+def test_failing_collector_does_not_break_the_scrape():
+    registry = MetricsRegistry()
+    registry.counter("demo_total", "Demo counter.").inc()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.register_collector(broken)
+    registry.register_collector(lambda: [("fuel_dashboard_up", "gauge", "Up.", [({}, 1)])])
+
+    text = registry.render()
+    assert "fuel_dashboard_demo_total 1" in text
+    assert "fuel_dashboard_up 1" in text
@@ -25,7 +25,8 @@ def _reset_cache_state():
     import data.cache as cache_module
 
     cache_module._last_realtime_refresh = None
-    yield
+    with patch("data.cache.save_warm_snapshot"):
+        yield
     cache_module._last_realtime_refresh = None
 
 
@@ -141,3 +141,20 @@ def test_route_geometries_non_ok_status(mock_client_cls):
 
     result = asyncio.run(get_route_geometries((40.0, -3.0), [(40.1, -3.1)]))
     assert result == [None]
+
+
+@patch("services.routing._get_sync_client")
+def test_osrm_failures_are_counted(mock_get_client):
+    from metrics import UPSTREAM_ERRORS
+    from metrics import UPSTREAM_SECONDS
+
+    mock_client = MagicMock()
+    mock_client.get.side_effect = Exception("connection error")
+    mock_get_client.return_value = mock_client
+    errors_before = UPSTREAM_ERRORS.value(service="osrm", operation="table")
+    calls_before = UPSTREAM_SECONDS.count(service="osrm", operation="table")
+
+    get_road_distances((40.0, -3.0), [(40.1, -3.1)])
+
+    assert UPSTREAM_ERRORS.value(service="osrm", operation="table") == errors_before + 1
+    assert UPSTREAM_SECONDS.count(service="osrm", operation="table") == calls_before + 1
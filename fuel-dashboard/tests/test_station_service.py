@@ -1,3 +1,4 @@
+import json
 from unittest.mock import call
 from unittest.mock import patch
 
@@ -344,7 +345,9 @@ def test_get_group_price_trends(mock_ready, mock_query):
     assert len(result["diesel_a_price"]) == 2
     assert result["diesel_a_price"][0].date == "2025-01-01"
     assert result["diesel_a_price"][0].avg_price == 1.45
-    mock_query.assert_called_once_with("28001", ["diesel_a_price", "diesel_b_price", "diesel_premium_price"], 7)
+    mock_query.assert_called_once_with(
+        "28001", ["diesel_a_price", "diesel_b_price", "diesel_premium_price"], 7, as_arrow=False
+    )
 
 
 @patch("services.station_service.query_cached_group_price_trend")
@@ -363,7 +366,57 @@ def test_get_group_price_trends_zip_takes_precedence_over_province(mock_ready, m
         }
     )
     get_group_price_trends("28001", FuelGroup.diesel, TrendPeriod.week, province="madrid")
-    mock_query.assert_called_once_with("28001", ["diesel_a_price", "diesel_b_price", "diesel_premium_price"], 7)
+    mock_query.assert_called_once_with(
+        "28001", ["diesel_a_price", "diesel_b_price", "diesel_premium_price"], 7, as_arrow=False
+    )
+
+
+@patch("services.station_service.query_cached_group_price_trend")
+@patch("services.station_service.is_zip_code_trend_ready")
+def test_get_group_price_trends_as_arrow_splits_tables_by_fuel(mock_ready, mock_query):
+    import pyarrow as pa
+    from services.station_service import get_group_price_trends
+
+    mock_ready.return_value = True
+    mock_query.return_value = pa.table(
+        {
+            "date": ["2025-01-01", "2025-01-02", "2025-01-01"],
+            "fuel_type": ["diesel_a_price", "diesel_a_price", "diesel_premium_price"],
+            "avg_price": [1.45, 1.47, 1.55],
+            "min_price": [1.40, 1.42, 1.50],
+            "max_price": [1.50, 1.52, 1.60],
+        }
+    )
+
+    result = get_group_price_trends("28001", FuelGroup.diesel, TrendPeriod.week, as_arrow=True)
+
+    assert list(result) == ["diesel_a_price", "diesel_premium_price"]
+    assert result["diesel_a_price"].column_names == ["date", "avg_price", "min_price", "max_price"]
+    assert result["diesel_a_price"]["avg_price"].to_pylist() == [1.45, 1.47]
+    assert mock_query.call_args.kwargs == {"as_arrow": True}
+
+
+def test_trend_routes_share_date_format_and_drop_days_without_prices():
+    import pyarrow as pa
+    from api.arrow_json import arrow_rows_json
+    from services.station_service import _trend_points_from_df
+    from services.station_service import _trend_tables_by_fuel_type
+
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2025-01-01", "2025-01-02", "2025-01-03"]),
+            "fuel_type": "diesel_a_price",
+            "avg_price": [1.45, float("nan"), 1.50],
+            "min_price": [1.40, float("nan"), 1.45],
+            "max_price": [1.50, float("nan"), 1.55],
+        }
+    )
+
+    points = [point.model_dump() for point in _trend_points_from_df(df)]
+    arrow = _trend_tables_by_fuel_type(pa.Table.from_pandas(df, preserve_index=False))["diesel_a_price"]
+
+    assert [point["date"] for point in points] == ["2025-01-01", "2025-01-03"]
+    assert json.loads(arrow_rows_json(arrow)) == points
 
 
 @patch("services.station_service.query_cached_group_price_trend")
@@ -438,7 +491,9 @@ def test_get_group_price_trends_national(mock_query):
     assert "diesel_premium_price" in result
     assert len(result["diesel_a_price"]) == 2
     assert result["diesel_a_price"][0].avg_price == 1.45
-    mock_query.assert_called_once_with(["diesel_a_price", "diesel_b_price", "diesel_premium_price"], 7, province=None)
+    mock_query.assert_called_once_with(
+        ["diesel_a_price", "diesel_b_price", "diesel_premium_price"], 7, province=None, as_arrow=False
+    )
 
 
 @patch("services.station_service.query_national_price_trend")
@@ -474,7 +529,7 @@ def test_get_group_price_trends_with_province(mock_query):
     result = get_group_price_trends(None, FuelGroup.diesel, TrendPeriod.week, province="madrid")
     assert "diesel_a_price" in result
     mock_query.assert_called_once_with(
-        ["diesel_a_price", "diesel_b_price", "diesel_premium_price"], 7, province="madrid"
+        ["diesel_a_price", "diesel_b_price", "diesel_premium_price"], 7, province="madrid", as_arrow=False
     )
 
 
@@ -954,24 +1009,19 @@ def test_get_brand_price_comparison_report_handles_zero_appearances(mock_agg):
     assert rows == []
 
 
-# ---- get_district_price_map zero-count guard --------------------------------
+# ---- get_district_price_map --------------------------------------------------
 
 
-@patch("services.station_service.assign_districts")
-@patch("services.station_service.query_stations_by_province")
-@patch("services.station_service.load_madrid_districts")
+@patch("services.station_service.query_avg_price_by_district")
 @patch("services.station_service.normalize_data_province_name", return_value="madrid")
-def test_get_district_price_map_skips_zero_count_district(mock_norm, mock_geo, mock_query, mock_assign):
+def test_get_district_price_map_maps_district_aggregates(mock_norm, mock_query):
     from services.station_service import get_district_price_map
 
-    mock_geo.return_value = {"features": []}
-    mock_query.return_value = pd.DataFrame({"latitude": [40.4], "longitude": [-3.7], "price": [1.50]})
-    mock_assign.return_value = {
-        "Centro": {"total_price": 3.0, "count": 2},
-        "Empty": {"total_price": 0.0, "count": 0},
-    }
+    mock_query.return_value = pd.DataFrame({"district": ["Centro"], "avg_price": [1.5], "station_count": [2]})
     results = get_district_price_map("madrid", FuelType.gasoline_95_e5_price)
 
+    mock_query.assert_called_once_with("madrid", "gasoline_95_e5_price")
     assert len(results) == 1
     assert results[0].district == "Centro"
     assert results[0].avg_price == pytest.approx(1.5)
+    assert results[0].station_count == 2
@@ -16,6 +16,54 @@ def _get_client():
     return TestClient(app, raise_server_exceptions=False)
 
 
+# ── Static assets ───────────────────────────────────────────────────
+
+
+def test_static_code_is_revalidated_and_images_are_cached():
+    client = _get_client()
+    script = client.get("/static/js/app.js")
+    assert script.headers["cache-control"] == "no-cache"
+    assert client.get("/static/js/app.js", headers={"If-None-Match": script.headers["etag"]}).status_code == 304
+    assert client.get("/static/og-image.png").headers["cache-control"] == "public, max-age=86400"
+
+
+# ── Metrics ─────────────────────────────────────────────────────────
+
+
+def test_metrics_exposes_route_latency_caches_and_snapshots():
+    client = _get_client()
+    client.get("/health")
+
+    with patch.object(settings, "metrics_token", "s3cret"):
+        resp = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'fuel_dashboard_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in resp.text
+    for cache in ("geocode_address", "address_suggestions", "osrm_full_route", "parquet_disk", "aggregate_tables"):
+        assert f'fuel_dashboard_cache_hit_ratio{{cache="{cache}"}}' in resp.text
+    assert "# TYPE fuel_dashboard_snapshot_age_seconds gauge" in resp.text
+
+
+def test_metrics_can_be_disabled():
+    with patch.object(settings, "metrics_enabled", False):
+        assert _get_client().get("/metrics").status_code == 404
+
+
+def test_metrics_require_the_configured_token():
+    client = _get_client()
+    with patch.object(settings, "metrics_token", "s3cret"):
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_metrics_without_a_token_are_served_to_loopback_clients_only():
+    assert _get_client().get("/metrics").status_code == 404
+    local = TestClient(app, raise_server_exceptions=False, client=("127.0.0.1", 50000))
+    assert local.get("/metrics").status_code == 200
+
+
 # ── Page templates ──────────────────────────────────────────────────
 
 
@@ -169,6 +217,16 @@ def test_insights_tab_routes_render_with_active_tab():
             assert f'data-active-tab="{tab}"' in resp.text
 
 
+def test_insights_tab_waits_only_for_its_own_aggregates():
+    ready = {"trends": True, "reportes": False}
+    with patch("main.is_data_ready", return_value=True), patch("main.is_insights_tab_ready", side_effect=ready.get):
+        client = _get_client()
+        assert client.get("/insights").status_code == 200
+        resp = client.get("/insights/reportes")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "5"
+
+
 def test_insights_unknown_tab_returns_404():
     with patch("main.is_data_ready", return_value=True):
         resp = _get_client().get("/insights/nonsense")
@@ -313,6 +371,19 @@ def test_zones_districts_endpoint(mock_service):
     assert resp.json()["items"][0]["district"] == "Centro"
 
 
+@patch("api.router.get_barrio_price_map")
+def test_zones_barrios_endpoint(mock_service):
+    from api.schemas import BarrioPriceResult
+    from api.schemas import FuelType
+
+    mock_service.return_value = [BarrioPriceResult(barrio="Sol", district="Centro", avg_price=1.50, station_count=4)]
+    resp = _get_client().get("/api/v1/zones/barrios?province=madrid&fuel_type=diesel_a_price&district=Centro")
+    assert resp.status_code == 200
+    assert resp.json()["items"][0]["barrio"] == "Sol"
+    assert resp.json()["district"] == "Centro"
+    mock_service.assert_called_once_with("madrid", FuelType.diesel_a_price, "Centro")
+
+
 @patch("api.router.get_province_price_map_filtered")
 def test_zones_province_map_endpoint(mock_service):
     from api.schemas import ProvincePriceResult
@@ -339,6 +410,32 @@ def test_zones_district_geojson_endpoint(mock_service):
     assert resp.json()["geojson"]["features"][0]["properties"]["district"] == "Centro"
 
 
+@patch("api.router.get_district_price_geojson")
+def test_zones_district_geojson_selects_detail_from_zoom(mock_service):
+    from api.schemas import FuelType
+    from api.schemas import GeometryDetail
+
+    mock_service.return_value = {"type": "FeatureCollection", "features": []}
+    url = "/api/v1/zones/district-geojson?province=madrid&fuel_type=diesel_a_price"
+    for query in ("&zoom=9", "&zoom=9&detail=high", ""):
+        assert _get_client().get(url + query).status_code == 200
+
+    assert [call.args for call in mock_service.call_args_list] == [
+        ("madrid", FuelType.diesel_a_price, GeometryDetail.medium),
+        ("madrid", FuelType.diesel_a_price, GeometryDetail.high),
+        ("madrid", FuelType.diesel_a_price, GeometryDetail.full),
+    ]
+
+
+@patch("api.router.load_postal_codes_for_zip_list")
+def test_zones_postal_geojson_passes_detail(mock_load):
+    mock_load.return_value = {"type": "FeatureCollection", "features": []}
+    resp = _get_client().get("/api/v1/zones/postal-geojson?zip_codes=28001&zip_codes=28002&detail=low")
+    assert resp.status_code == 200
+    mock_load.assert_called_once_with(["28001", "28002"], "low")
+    assert _get_client().get("/api/v1/zones/postal-geojson?zip_codes=28001&detail=tiny").status_code == 422
+
+
 @patch("api.router.get_municipalities")
 def test_zones_municipalities_endpoint(mock_service):
     mock_service.return_value = ["Getafe", "Leganés"]
@@ -371,6 +468,20 @@ def test_zones_district_zips_endpoint(mock_zip_codes, mock_service):
     assert resp.json()["zones"][0]["zip_code"] == "28001"
 
 
+@patch("api.router.get_zip_code_price_map_for_zips")
+@patch("api.router.get_zip_codes_for_barrio")
+def test_zones_barrio_zips_endpoint(mock_zip_codes, mock_service):
+    from api.schemas import FuelType
+    from api.schemas import ZoneResult
+
+    mock_zip_codes.return_value = ["28013"]
+    mock_service.return_value = [ZoneResult(zip_code="28013", avg_price=1.50, min_price=1.47, station_count=2)]
+    resp = _get_client().get("/api/v1/zones/barrio-zips?province=madrid&barrio=Sol&fuel_type=diesel_a_price")
+    assert resp.status_code == 200
+    assert resp.json()["zones"][0]["zip_code"] == "28013"
+    mock_service.assert_called_once_with("madrid", FuelType.diesel_a_price, ["28013"])
+
+
 @patch("api.router.get_day_of_week_pattern")
 def test_historical_day_of_week_endpoint(mock_service):
     mock_service.return_value = pd.DataFrame([{"day_of_week": i, "avg_price": 1.4 + i * 0.01} for i in range(7)])
@@ -638,6 +749,59 @@ def test_rows_handles_none_and_empty():
     assert _rows(pd.DataFrame()) == []
 
 
+def test_arrow_rows_json_matches_rows_encoding():
+    import json
+
+    import pyarrow as pa
+    from api.arrow_json import arrow_rows_json
+    from api.router import _rows
+
+    df = pd.DataFrame(
+        {
+            "a": [1, 2],
+            "b": [1.5, np.nan],
+            "d": [pd.Timestamp("2026-04-15"), pd.Timestamp("2026-04-16 10:30:00")],
+            "e": ['say "hi"', "tab\there"],
+        }
+    )
+
+    assert json.loads(arrow_rows_json(pa.Table.from_pandas(df, preserve_index=False))) == _rows(df)
+
+
+def test_arrow_rows_json_encodes_dates_and_empty_tables():
+    import datetime
+
+    import pyarrow as pa
+    from api.arrow_json import arrow_rows_json
+
+    table = pa.table({"date": [datetime.date(2026, 4, 15)], "province": ["álava"], "n": pa.array([3], pa.int32())})
+
+    assert arrow_rows_json(table) == '[{"date":"2026-04-15","province":"álava","n":3}]'
+    assert arrow_rows_json(table.slice(0, 0)) == "[]"
+
+
+def test_arrow_json_response_nests_tables_models_and_scalars():
+    import pyarrow as pa
+    from api.arrow_json import arrow_json_response
+    from api.schemas import TrendPoint
+
+    resp = arrow_json_response(
+        {
+            "series": {
+                "a": pa.table({"avg_price": [1.25]}),
+                "b": [TrendPoint(date="2026-04-01", avg_price=1.5, min_price=1.4, max_price=1.6)],
+            },
+            "zip_code": None,
+        }
+    )
+
+    assert resp.media_type == "application/json"
+    assert resp.body == (
+        b'{"series":{"a":[{"avg_price":1.25}],'
+        b'"b":[{"date":"2026-04-01","avg_price":1.5,"min_price":1.4,"max_price":1.6}]},"zip_code":null}'
+    )
+
+
 def test_trip_plan_rejects_out_of_bounds_consumption():
     body = {
         "origin": "Madrid",
@@ -657,58 +821,86 @@ _GCS_FILE = "spain_fuel_prices_2026-04-16T120000Z.parquet"
 _STALE_FILE = "spain_fuel_prices_2025-01-01T120000Z.parquet"
 
 
-@patch("main.get_latest_data_timestamp")
-@patch("main.get_latest_parquet_file")
+def _health(latest_file, data_datetime=None, loaded_file=None):
+    from data.cache import DataHealth
+
+    file_date = latest_file.removeprefix("spain_fuel_prices_")[:10] if latest_file else "unknown"
+    return DataHealth(
+        latest_file=latest_file,
+        file_date=file_date,
+        loaded_file=loaded_file or latest_file,
+        data_datetime=data_datetime or file_date,
+        aggregates={},
+        insights_ready={"trends": True},
+        computed_at=1.0,
+    )
+
+
+@patch("main.get_data_health")
 @patch("main.get_realtime_status")
-def test_health_data_realtime_returns_prices_timestamp(mock_rt, mock_file, mock_ts):
+def test_health_data_realtime_returns_prices_timestamp(mock_rt, mock_health):
     mock_rt.return_value = _RT_ACTIVE
-    mock_file.return_value = _GCS_FILE
-    mock_ts.return_value = "2026-04-16T21:56:13+00:00"
+    mock_health.return_value = _health(_GCS_FILE, "2026-04-16T21:56:13+00:00")
     resp = _get_client().get("/health/data")
     assert resp.status_code == 200
     data = resp.json()
     assert data["source"] == "realtime"
     assert data["data_datetime"] == "2026-04-16T21:56:13+00:00"
+    assert data["insights_ready"] == {"trends": True}
 
 
 @patch("main.datetime")
-@patch("main.get_latest_data_timestamp")
-@patch("main.get_latest_parquet_file")
+@patch("main.get_data_health")
 @patch("main.get_realtime_status")
-def test_health_data_gcs_returns_prices_timestamp(mock_rt, mock_file, mock_ts, mock_dt):
+def test_health_data_gcs_returns_prices_timestamp(mock_rt, mock_health, mock_dt):
     mock_dt.now.return_value = _dt.datetime(2026, 4, 16, tzinfo=_dt.timezone.utc)
     mock_rt.return_value = _RT_INACTIVE
-    mock_file.return_value = _GCS_FILE
-    mock_ts.return_value = "2026-04-16T10:00:00+00:00"
+    mock_health.return_value = _health(_GCS_FILE, "2026-04-16T10:00:00+00:00")
     resp = _get_client().get("/health/data")
     assert resp.status_code == 200
     data = resp.json()
     assert data["source"] == "gcs"
+    assert data["file_date"] == "2026-04-16"
     assert data["data_datetime"] == "2026-04-16T10:00:00+00:00"
 
 
 @patch("main.datetime")
-@patch("main.get_latest_data_timestamp")
-@patch("main.get_latest_parquet_file")
+@patch("main.get_data_health")
 @patch("main.get_realtime_status")
-def test_health_data_falls_back_to_file_date_when_snapshot_unavailable(mock_rt, mock_file, mock_ts, mock_dt):
+def test_health_data_gcs_is_fresh_when_the_bucket_has_todays_file_before_it_is_loaded(mock_rt, mock_health, mock_dt):
+    mock_dt.now.return_value = _dt.datetime(2026, 4, 17, 1, tzinfo=_dt.timezone.utc)
+    mock_rt.return_value = _RT_INACTIVE
+    newest = "spain_fuel_prices_2026-04-17T003000Z.parquet"
+    mock_health.return_value = _health(newest, "2026-04-16T10:00:00+00:00", loaded_file=_GCS_FILE)
+    resp = _get_client().get("/health/data")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["source"] == "gcs"
+    assert data["latest_file"] == newest
+    assert data["file_date"] == "2026-04-17"
+    assert data["loaded_file"] == _GCS_FILE
+
+
+@patch("main.datetime")
+@patch("main.get_data_health")
+@patch("main.get_realtime_status")
+def test_health_data_reports_warm_started_snapshot(mock_rt, mock_health, mock_dt):
     mock_dt.now.return_value = _dt.datetime(2026, 4, 16, tzinfo=_dt.timezone.utc)
     mock_rt.return_value = _RT_INACTIVE
-    mock_file.return_value = _GCS_FILE
-    mock_ts.return_value = None
+    mock_health.return_value = _health(None, "2026-04-16T10:00:00+00:00")._replace(file_date="2026-04-16")
     resp = _get_client().get("/health/data")
     assert resp.status_code == 200
     data = resp.json()
-    assert data["data_datetime"] == "2026-04-16"
+    assert data["source"] == "warm_start"
+    assert data["latest_file"] is None
+    assert data["file_date"] == "2026-04-16"
 
 
-@patch("main.get_latest_data_timestamp")
-@patch("main.get_latest_parquet_file")
+@patch("main.get_data_health")
 @patch("main.get_realtime_status")
-def test_health_data_stale_includes_data_datetime(mock_rt, mock_file, mock_ts):
+def test_health_data_stale_includes_data_datetime(mock_rt, mock_health):
     mock_rt.return_value = _RT_INACTIVE
-    mock_file.return_value = _STALE_FILE
-    mock_ts.return_value = "2025-01-01T10:00:00+00:00"
+    mock_health.return_value = _health(_STALE_FILE, "2025-01-01T10:00:00+00:00")
     resp = _get_client().get("/health/data")
     assert resp.status_code == 503
     data = resp.json()
@@ -716,12 +908,21 @@ def test_health_data_stale_includes_data_datetime(mock_rt, mock_file, mock_ts):
     assert data["data_datetime"] == "2025-01-01T10:00:00+00:00"
 
 
-@patch("main.get_latest_parquet_file")
+@patch("main.get_data_health")
 @patch("main.get_realtime_status")
-def test_health_data_no_file_no_realtime_returns_error(mock_rt, mock_file):
+def test_health_data_no_file_no_realtime_returns_error(mock_rt, mock_health):
     mock_rt.return_value = {"realtime_enabled": False, "realtime_active": False, "last_realtime_refresh": None}
-    mock_file.return_value = None
+    mock_health.return_value = _health(None)
     resp = _get_client().get("/health/data")
     assert resp.status_code == 503
     data = resp.json()
     assert data["status"] == "error"
+
+
+@patch("main.get_data_health", return_value=None)
+@patch("main.get_realtime_status")
+def test_health_data_before_first_refresh_returns_error(mock_rt, _mock_health):
+    mock_rt.return_value = _RT_ACTIVE
+    resp = _get_client().get("/health/data")
+    assert resp.status_code == 503
+    assert resp.json()["detail"] == "Data status not computed yet"
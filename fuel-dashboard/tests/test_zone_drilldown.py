@@ -13,7 +13,9 @@ SAMPLE_FUEL_TYPE = "diesel_a_price"
 
 
 def _setup_test_table(conn):
-    df = pd.DataFrame(  # noqa: F841
+    from data.duckdb_engine import replace_latest_stations
+
+    df = pd.DataFrame(
         {
             "label": ["s1", "s2", "s3", "s4"],
             "address": ["a1", "a2", "a3", "a4"],
@@ -25,8 +27,8 @@ def _setup_test_table(conn):
             "diesel_a_price": [1.40, 1.45, 1.50, 1.55],
         }
     )
-    conn.execute("DROP TABLE IF EXISTS latest_stations")
-    conn.execute("CREATE TABLE latest_stations AS SELECT * FROM df")
+    with patch("data.duckdb_engine.get_connection", return_value=conn):
+        replace_latest_stations(df)
 
 
 @patch("data.duckdb_engine.get_connection")
@@ -87,11 +89,42 @@ def test_query_zip_codes_by_district(mock_conn):
     _setup_test_table(conn)
     mock_conn.return_value = conn
 
-    result = query_zip_codes_by_district("MADRID", SAMPLE_FUEL_TYPE)
-    assert len(result) == 4
-    assert "zip_code" in result.columns
-    assert "latitude" in result.columns
-    assert "price" in result.columns
+    assert query_zip_codes_by_district("MADRID", SAMPLE_FUEL_TYPE, "Centro") == ["28001"]
+    assert query_zip_codes_by_district("MADRID", SAMPLE_FUEL_TYPE, "Retiro") == []
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_assigns_madrid_districts(mock_conn):
+    from data.duckdb_engine import query_avg_price_by_district
+
+    conn = duckdb.connect(":memory:")
+    _setup_test_table(conn)
+    mock_conn.return_value = conn
+
+    districts = conn.execute("SELECT label, district FROM latest_stations ORDER BY label").fetchall()
+    assert districts == [("s1", None), ("s2", None), ("s3", None), ("s4", "Centro")]
+    result = query_avg_price_by_district("MADRID", SAMPLE_FUEL_TYPE)
+    assert result.to_dict("records") == [{"district": "Centro", "avg_price": 1.55, "station_count": 1}]
+
+
+@patch("data.duckdb_engine.get_connection")
+def test_replace_latest_stations_assigns_madrid_barrios(mock_conn):
+    from data.duckdb_engine import query_avg_price_by_barrio
+    from data.duckdb_engine import query_zip_codes_by_barrio
+
+    conn = duckdb.connect(":memory:")
+    _setup_test_table(conn)
+    mock_conn.return_value = conn
+
+    barrios = conn.execute("SELECT label, district, barrio FROM latest_stations ORDER BY label").fetchall()
+    assert barrios[3] == ("s4", "Centro", "Justicia")
+    assert all(barrio is None for _, _, barrio in barrios[:3])
+    expected = [{"barrio": "Justicia", "district": "Centro", "avg_price": 1.55, "station_count": 1}]
+    assert query_avg_price_by_barrio("MADRID", SAMPLE_FUEL_TYPE).to_dict("records") == expected
+    assert query_avg_price_by_barrio("MADRID", SAMPLE_FUEL_TYPE, "Centro").to_dict("records") == expected
+    assert query_avg_price_by_barrio("MADRID", SAMPLE_FUEL_TYPE, "Retiro").empty
+    assert query_zip_codes_by_barrio("MADRID", SAMPLE_FUEL_TYPE, "Justicia") == ["28001"]
+    assert query_zip_codes_by_barrio("MADRID", SAMPLE_FUEL_TYPE, "Sol") == []
 
 
 # ── Service layer tests ─────────────────────────────────────────────
@@ -184,7 +217,7 @@ def test_get_province_price_geojson_merges_metrics(mock_load_geojson, mock_map):
     assert geojson["features"][1]["properties"]["avg_price"] is None
 
 
-@patch("services.station_service.query_stations_by_province")
+@patch("services.station_service.query_avg_price_by_district")
 def test_get_district_price_map_non_madrid_returns_empty(mock_query):
     from services.station_service import get_district_price_map
 
@@ -193,6 +226,31 @@ def test_get_district_price_map_non_madrid_returns_empty(mock_query):
     mock_query.assert_not_called()
 
 
+@patch("services.station_service.query_avg_price_by_barrio")
+def test_get_barrio_price_geojson_keeps_district_barrios(mock_query):
+    from services.station_service import get_barrio_price_geojson
+
+    mock_query.return_value = pd.DataFrame(
+        [{"barrio": "Sol", "district": "Centro", "avg_price": 1.44, "station_count": 3}]
+    )
+    geojson = get_barrio_price_geojson("MADRID", FuelType.diesel_a_price, "Centro")
+
+    properties = {feature["properties"]["barrio"]: feature["properties"] for feature in geojson["features"]}
+    assert {props["district"] for props in properties.values()} == {"Centro"}
+    assert properties["Sol"]["avg_price"] == 1.44
+    assert properties["Sol"]["station_count"] == 3
+    assert properties["Cortes"]["avg_price"] is None
+    mock_query.assert_called_once_with("MADRID", "diesel_a_price", "Centro")
+
+
+@patch("services.station_service.query_avg_price_by_barrio")
+def test_get_barrio_price_map_non_madrid_returns_empty(mock_query):
+    from services.station_service import get_barrio_price_map
+
+    assert get_barrio_price_map("SEVILLA", FuelType.diesel_a_price) == []
+    mock_query.assert_not_called()
+
+
 @patch("services.station_service.load_postal_codes_for_zip_list")
 def test_get_postal_code_geojson(mock_load):
     from services.station_service import get_postal_code_geojson
@@ -201,45 +259,16 @@ def test_get_postal_code_geojson(mock_load):
     mock_load.return_value = expected
     result = get_postal_code_geojson(["28001"])
     assert result == expected
-    mock_load.assert_called_once_with(["28001"])
+    mock_load.assert_called_once_with(["28001"], "full")
 
 
-@patch("services.station_service.query_zip_codes_by_district")
-@patch("services.station_service.load_madrid_districts")
-def test_get_zip_codes_for_district(mock_districts, mock_query):
+@patch("services.station_service.query_zip_codes_by_district", return_value=["28001"])
+def test_get_zip_codes_for_district(mock_query):
     from services.station_service import get_zip_codes_for_district
 
-    mock_districts.return_value = {
-        "type": "FeatureCollection",
-        "features": [
-            {
-                "type": "Feature",
-                "properties": {"nombre": "Centro"},
-                "geometry": {
-                    "type": "Polygon",
-                    "coordinates": [[[-3.72, 40.40], [-3.68, 40.40], [-3.68, 40.44], [-3.72, 40.44], [-3.72, 40.40]]],
-                },
-            },
-            {
-                "type": "Feature",
-                "properties": {"nombre": "Retiro"},
-                "geometry": {
-                    "type": "Polygon",
-                    "coordinates": [[[-3.68, 40.40], [-3.64, 40.40], [-3.64, 40.44], [-3.68, 40.44], [-3.68, 40.40]]],
-                },
-            },
-        ],
-    }
-    mock_query.return_value = pd.DataFrame(
-        {
-            "latitude": [40.42, 40.42],
-            "longitude": [-3.70, -3.66],
-            "zip_code": ["28001", "28009"],
-            "price": [1.50, 1.55],
-        }
-    )
     result = get_zip_codes_for_district("MADRID", FuelType.diesel_a_price, "Centro")
     assert result == ["28001"]
+    mock_query.assert_called_once_with("MADRID", "diesel_a_price", "Centro")
 
 
 def test_get_zip_codes_for_district_non_madrid_returns_empty():
@@ -247,14 +276,3 @@ def test_get_zip_codes_for_district_non_madrid_returns_empty():
 
     result = get_zip_codes_for_district("BARCELONA", FuelType.diesel_a_price, "Eixample")
     assert result == []
-
-
-@patch("services.station_service.query_zip_codes_by_district")
-@patch("services.station_service.load_madrid_districts")
-def test_get_zip_codes_for_district_empty(mock_districts, mock_query):
-    from services.station_service import get_zip_codes_for_district
-
-    mock_districts.return_value = {"type": "FeatureCollection", "features": []}
-    mock_query.return_value = pd.DataFrame()
-    result = get_zip_codes_for_district("MADRID", FuelType.diesel_a_price, "Centro")
-    assert result == []
@@ -9,6 +9,7 @@ from aggregator.main import _get_bucket
 from aggregator.main import _latest_raw_file_per_day
 from aggregator.main import _list_raw_parquet_files
 from aggregator.main import _most_recent_raw_files
+from aggregator.main import _publish_aggregate_manifest
 from aggregator.main import _upload_parquet_to_gcs
 from aggregator.main import BRAND_DAILY_STATS_BLOB
 from aggregator.main import DAILY_INGESTION_STATS_BLOB
@@ -61,6 +62,7 @@ def backfill():
     logger.info(f"Zip-code daily stats: {len(zip_code_daily_df)} rows")
     _upload_parquet_to_gcs(bucket, ZIP_CODE_DAILY_STATS_BLOB, zip_code_daily_df)
 
+    _publish_aggregate_manifest(bucket)
     logger.info("Backfill complete!")
 
 
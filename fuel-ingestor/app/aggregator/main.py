@@ -5,6 +5,7 @@ from datetime import datetime
 from datetime import timezone
 
 import pandas as pd
+from aggregator.manifest import publish_aggregate_manifest
 from aggregator.pipeline.runner import TaskRunner
 from aggregator.pipeline.runner import write_step_summary
 from aggregator.pipelines import brand_stats
@@ -252,6 +253,14 @@ def _build_zip_code_daily_stats_from_raw_files(bucket, parquet_files):
     return zip_code_daily_df
 
 
+def _publish_aggregate_manifest(bucket):
+    try:
+        publish_aggregate_manifest(bucket)
+    except Exception as exc:
+        # Consumers fall back to checking each aggregate on its own TTL.
+        _log_event(logger.warning, "aggregate_manifest_publish_failed", error=str(exc))
+
+
 def _bootstrap_aggregates(bucket):
     _log_event(logger.info, "bootstrap_aggregation_start")
     parquet_files = _list_raw_parquet_files(bucket)
@@ -324,11 +333,16 @@ def _backfill_zip_code_daily_stats(bucket):
 
 
 def run_aggregation(bucket=None):
-    """Run incremental aggregation for today's data."""
+    """Run incremental aggregation for today's data, then publish the aggregate manifest."""
     _log_event(logger.info, "aggregation_start", bucket_provided=bucket is not None)
     if bucket is None:
         bucket = _get_bucket()
 
+    _aggregate(bucket)
+    _publish_aggregate_manifest(bucket)
+
+
+def _aggregate(bucket):
     missing_aggregate_blobs = [
         blob_name for blob_name in REQUIRED_AGGREGATE_BLOBS if not _blob_exists(bucket, blob_name)
     ]
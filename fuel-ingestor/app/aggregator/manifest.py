@@ -0,0 +1,101 @@
+import hashlib
+import io
+import json
+import logging
+from datetime import datetime
+from datetime import timezone
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from aggregator.shared import _log_event
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES_PREFIX = "aggregates/"
+AGGREGATE_MANIFEST_BLOB = "aggregates/manifest.json"
+# First column found is reported as the aggregate's date range.
+DATE_RANGE_COLUMNS = ["date", "year_month", "last_updated"]
+
+
+def _blob_version(blob):
+    return getattr(blob, "generation", None), getattr(blob, "md5_hash", None)
+
+
+def _read_manifest(bucket):
+    blob = bucket.blob(AGGREGATE_MANIFEST_BLOB)
+    if not blob.exists():
+        return {"version": 0, "aggregates": {}}
+    return json.loads(blob.download_as_bytes())
+
+
+def _describe_aggregate(blob):
+    """Return the manifest entry of an aggregate blob: version, size, row count, date range and hashes."""
+    data = blob.download_as_bytes()
+    parquet_file = pq.ParquetFile(io.BytesIO(data))
+    schema = parquet_file.schema_arrow
+    generation, md5_hash = _blob_version(blob)
+    entry = {
+        "generation": generation,
+        "md5_hash": md5_hash,
+        "size_bytes": len(data),
+        "rows": parquet_file.metadata.num_rows,
+        "schema_hash": hashlib.sha256(
+            "\n".join(f"{field.name}:{field.type}" for field in schema).encode("utf-8")
+        ).hexdigest(),
+        "content_hash": hashlib.sha256(data).hexdigest(),
+        "date_min": None,
+        "date_max": None,
+    }
+    date_column = next((name for name in DATE_RANGE_COLUMNS if name in schema.names), None)
+    if date_column is not None and entry["rows"]:
+        bounds = pc.min_max(parquet_file.read(columns=[date_column]).column(0))
+        entry["date_min"] = None if bounds["min"].as_py() is None else str(bounds["min"].as_py())
+        entry["date_max"] = None if bounds["max"].as_py() is None else str(bounds["max"].as_py())
+    return entry
+
+
+def publish_aggregate_manifest(bucket):
+    """Write ``aggregates/manifest.json`` describing every aggregate blob, if any of them changed.
+
+    Consumers poll this one small object instead of checking each aggregate. Entries of blobs whose
+    generation/md5 is unchanged since the previous manifest are carried over; only new or rewritten
+    blobs are downloaded to be described. ``version`` increases by one whenever the set changes.
+    """
+    previous = _read_manifest(bucket)
+    previous_entries = previous.get("aggregates", {})
+    entries = {}
+    for blob in bucket.list_blobs(prefix=AGGREGATES_PREFIX):
+        if not blob.name.endswith(".parquet"):
+            continue
+        name = blob.name.removeprefix(AGGREGATES_PREFIX)
+        known = previous_entries.get(name)
+        version = _blob_version(blob)
+        if known is not None and any(version) and (known["generation"], known["md5_hash"]) == version:
+            entries[name] = known
+        else:
+            entries[name] = _describe_aggregate(blob)
+
+    if not entries:
+        _log_event(logger.warning, "aggregate_manifest_skipped_no_aggregates")
+        return None
+    if entries == previous_entries:
+        _log_event(logger.info, "aggregate_manifest_unchanged", version=previous["version"], aggregates=len(entries))
+        return previous
+
+    changed = sorted(name for name, entry in entries.items() if previous_entries.get(name) != entry)
+    manifest = {
+        "version": previous.get("version", 0) + 1,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "aggregates": entries,
+    }
+    bucket.blob(AGGREGATE_MANIFEST_BLOB).upload_from_string(
+        json.dumps(manifest, indent=2, sort_keys=True), "application/json"
+    )
+    _log_event(
+        logger.info,
+        "aggregate_manifest_published",
+        version=manifest["version"],
+        aggregates=len(entries),
+        changed=changed,
+    )
+    return manifest
@@ -0,0 +1,106 @@
+import io
+import json
+from types import SimpleNamespace
+from unittest import TestCase
+
+import pandas as pd
+from aggregator.manifest import AGGREGATE_MANIFEST_BLOB
+from aggregator.manifest import publish_aggregate_manifest
+
+
+class _VersionedBucket:
+    """In-memory bucket whose blobs carry a generation that increases on every upload."""
+
+    def __init__(self):
+        self._data = {}
+        self._generations = {}
+        self.downloads = []
+
+    def put(self, blob_name, data):
+        self._data[blob_name] = data
+        self._generations[blob_name] = self._generations.get(blob_name, 0) + 1
+
+    def _blob(self, blob_name):
+        def _download():
+            self.downloads.append(blob_name)
+            return self._data[blob_name]
+
+        return SimpleNamespace(
+            name=blob_name,
+            generation=self._generations.get(blob_name),
+            md5_hash=None,
+            exists=lambda: blob_name in self._data,
+            download_as_bytes=_download,
+            upload_from_string=lambda data, content_type=None: self.put(blob_name, data),
+        )
+
+    def blob(self, blob_name):
+        return self._blob(blob_name)
+
+    def list_blobs(self, prefix=""):
+        return [self._blob(name) for name in sorted(self._data) if name.startswith(prefix)]
+
+    def manifest(self):
+        return json.loads(self._data[AGGREGATE_MANIFEST_BLOB])
+
+
+def _parquet(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+class TestPublishAggregateManifest(TestCase):
+    def setUp(self):
+        self.bucket = _VersionedBucket()
+        self.bucket.put(
+            "aggregates/province_daily_stats.parquet",
+            _parquet(
+                pd.DataFrame({"date": pd.to_datetime(["2026-03-20", "2026-03-22"]).date, "avg_price": [1.5, 1.6]})
+            ),
+        )
+        self.bucket.put(
+            "aggregates/reports/brand_win_rate.parquet",
+            _parquet(pd.DataFrame({"brand": ["repsol"], "win_rate_pct": [40.0]})),
+        )
+
+    def test_describes_every_aggregate(self):
+        manifest = publish_aggregate_manifest(self.bucket)
+
+        self.assertEqual(manifest["version"], 1)
+        self.assertEqual(self.bucket.manifest(), manifest)
+        entry = manifest["aggregates"]["province_daily_stats.parquet"]
+        self.assertEqual(entry["generation"], 1)
+        self.assertEqual(entry["rows"], 2)
+        self.assertEqual((entry["date_min"], entry["date_max"]), ("2026-03-20", "2026-03-22"))
+        self.assertEqual(len(entry["schema_hash"]), 64)
+        self.assertEqual(len(entry["content_hash"]), 64)
+        report = manifest["aggregates"]["reports/brand_win_rate.parquet"]
+        self.assertIsNone(report["date_min"])
+
+    def test_unchanged_aggregates_keep_the_version_and_are_not_downloaded(self):
+        publish_aggregate_manifest(self.bucket)
+        self.bucket.downloads.clear()
+
+        manifest = publish_aggregate_manifest(self.bucket)
+
+        self.assertEqual(manifest["version"], 1)
+        self.assertEqual(self.bucket.downloads, [AGGREGATE_MANIFEST_BLOB])
+
+    def test_rewritten_aggregate_bumps_the_version_once(self):
+        publish_aggregate_manifest(self.bucket)
+        self.bucket.put(
+            "aggregates/province_daily_stats.parquet",
+            _parquet(pd.DataFrame({"date": pd.to_datetime(["2026-03-23"]).date, "avg_price": [1.7]})),
+        )
+        self.bucket.downloads.clear()
+
+        manifest = publish_aggregate_manifest(self.bucket)
+
+        self.assertEqual(manifest["version"], 2)
+        self.assertEqual(manifest["aggregates"]["province_daily_stats.parquet"]["generation"], 2)
+        self.assertEqual(manifest["aggregates"]["province_daily_stats.parquet"]["rows"], 1)
+        self.assertEqual(self.bucket.downloads, [AGGREGATE_MANIFEST_BLOB, "aggregates/province_daily_stats.parquet"])
+
+    def test_skips_publishing_without_aggregates(self):
+        self.assertIsNone(publish_aggregate_manifest(_VersionedBucket()))
@@ -0,0 +1,93 @@
+"""Build ``fuel-dashboard/app/data/geojson/barrios-madrid.geojson`` from the barrio files in ``maps/``.
+
+The Ayuntamiento's barrio GeoJSON carries bare geometries. Names come from the CSV's label point of
+each barrio (the one polygon that contains it), and the district and barrio code from the shapefile
+attribute table (.dbf) in the zip. The output has one Feature per barrio with ``nombre``,
+``distrito`` (as in ``distritos-madrid.geojson``) and ``codbarrio`` properties.
+
+    uv run python scripts/build_madrid_barrios_geojson.py
+"""
+
+import csv
+import json
+import struct
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MAPS_DIR = ROOT / "maps"
+SOURCE_NAME = "Límites de los Barrios Administrativos de Madrid"
+OUTPUT = ROOT / "fuel-dashboard" / "app" / "data" / "geojson" / "barrios-madrid.geojson"
+
+
+def point_in_ring(lat: float, lon: float, ring: list) -> bool:
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if ((yi > lat) != (yj > lat)) and (lon < (xj - xi) * (lat - yi) / (yj - yi) + xi):
+            inside = not inside
+        j = i
+    return inside
+
+
+def read_dbf(data: bytes) -> list[dict[str, str]]:
+    """Records of a dBase III table, every field as a stripped string."""
+    count = struct.unpack("<I", data[4:8])[0]
+    header_length, record_length = struct.unpack("<HH", data[8:12])
+    fields = []
+    offset = 32
+    while data[offset] != 0x0D:
+        fields.append((data[slice(offset, offset + 11)].split(b"\0")[0].decode("ascii"), data[offset + 16]))
+        offset += 32
+    records = []
+    for index in range(count):
+        position = header_length + index * record_length + 1  # skip the deletion flag
+        record = {}
+        for name, length in fields:
+            record[name] = data[slice(position, position + length)].decode("latin-1").strip()
+            position += length
+        records.append(record)
+    return records
+
+
+def main() -> None:
+    geometries = json.loads((MAPS_DIR / f"{SOURCE_NAME}.geojson").read_text(encoding="utf-8"))["features"]
+    with open(MAPS_DIR / f"{SOURCE_NAME}.csv", encoding="utf-8", newline="") as f:
+        labels = list(csv.DictReader(f))
+    with zipfile.ZipFile(MAPS_DIR / f"{SOURCE_NAME}.zip") as archive:
+        dbf_name = next(name for name in archive.namelist() if name.endswith(".dbf"))
+        attributes = {record["NOMBRE"]: record for record in read_dbf(archive.read(dbf_name))}
+
+    features = []
+    for geometry in geometries:
+        ring = geometry["coordinates"][0]
+        names = [
+            label["Name"]
+            for label in labels
+            if point_in_ring(float(label["Latitude"]), float(label["Longitude"]), ring)
+        ]
+        if len(names) != 1:
+            raise SystemExit(f"Expected one label point per barrio polygon, found {names}")
+        record = attributes[names[0]]
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {"nombre": names[0], "distrito": record["NOMDIS"], "codbarrio": record["CODBARRIO"]},
+                "geometry": geometry,
+            }
+        )
+    if len({feature["properties"]["nombre"] for feature in features}) != len(labels):
+        raise SystemExit("Some barrios have no polygon")
+
+    features.sort(key=lambda feature: tuple(int(part) for part in feature["properties"]["codbarrio"].split("-")))
+    OUTPUT.write_text(
+        json.dumps({"type": "FeatureCollection", "features": features}, ensure_ascii=False, separators=(",", ":")),
+        encoding="utf-8",
+    )
+    print(f"Wrote {len(features)} barrios to {OUTPUT.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()